@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# CORRELATION ENGINE
+# Shared by Auto-EDA, feature selection and multicollinearity checks.
+# Numeric correlations are accumulated over row chunks in float32
+# column blocks with pairwise-complete (NaN-aware) statistics, so
+# neither rows nor p x p temporaries have to fit in one allocation.
+# ---------------------------------------------------------
+CHUNK_ROWS = 200_000
+BLOCK_COLS = 256
+MAX_CATEGORIES = 200
+METHODS = ["pearson", "spearman"]
+
+
+def _chunks(n_rows: int, chunk_rows: int):
+    for start in range(0, n_rows, chunk_rows):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def _prepare(df: pd.DataFrame, cols: list, method: str) -> pd.DataFrame:
+    """Numeric view of the columns; Spearman works on average ranks."""
+    data = df[cols]
+    if method == "spearman":
+        # Ranks over each column's observed values (NaN stays NaN)
+        data = data.rank(method="average")
+    elif method != "pearson":
+        raise ValueError(f"Unknown correlation method: {method}")
+    return data
+
+
+def _column_means(data: pd.DataFrame, chunk_rows: int) -> np.ndarray:
+    total = np.zeros(data.shape[1])
+    count = np.zeros(data.shape[1])
+    for start, stop in _chunks(len(data), chunk_rows):
+        x = data.iloc[start:stop].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = np.isfinite(x)
+        total += np.where(present, x, 0.0).sum(axis=0)
+        count += present.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, 0.0)
+
+
+def _centered_block(data, idx, means, start, stop):
+    """float32 centred values (NaN -> 0) and presence mask for a column block."""
+    # Centre in float64 first: casting a large-offset column (epoch seconds,
+    # ids) to float32 before subtracting the mean would erase its variance
+    x = data.iloc[start:stop, idx].to_numpy(dtype=np.float64, na_value=np.nan)
+    present = np.isfinite(x)
+    x = np.where(present, x - means[idx], 0.0).astype(np.float32)
+    return x, present.astype(np.float32)
+
+
+def _block_corr(data, idx_a, idx_b, means, chunk_rows):
+    """
+    Pairwise-complete correlation between two column blocks.
+    Centering on the global means keeps the float32 products well conditioned;
+    accumulation happens in float64.
+    """
+    shape = (len(idx_a), len(idx_b))
+    n = np.zeros(shape)
+    sa = np.zeros(shape)
+    sb = np.zeros(shape)
+    saa = np.zeros(shape)
+    sbb = np.zeros(shape)
+    sab = np.zeros(shape)
+    same = idx_a is idx_b
+
+    for start, stop in _chunks(len(data), chunk_rows):
+        xa, ma = _centered_block(data, idx_a, means, start, stop)
+        xb, mb = (xa, ma) if same else _centered_block(data, idx_b, means, start, stop)
+        n += ma.T @ mb
+        sa += xa.T @ mb
+        sb += ma.T @ xb
+        saa += (xa * xa).T @ mb
+        sbb += ma.T @ (xb * xb)
+        sab += xa.T @ xb
+
+    cov = n * sab - sa * sb
+    var = np.clip(n * saa - sa * sa, 0, None) * np.clip(n * sbb - sb * sb, 0, None)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var)
+    corr[(n < 2) | (var <= 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def _blocks(p: int, block_cols: int):
+    return [np.arange(s, min(s + block_cols, p)) for s in range(0, p, block_cols)]
+
+
+def correlation_matrix(df: pd.DataFrame, cols: list = None, method: str = "pearson",
+                       chunk_rows: int = CHUNK_ROWS, block_cols: int = BLOCK_COLS) -> pd.DataFrame:
+    """
+    Full p x p Pearson/Spearman matrix with pairwise-complete observations.
+    Use top_correlated_pairs() when p is in the thousands.
+    """
+    cols = cols if cols is not None else df.select_dtypes(include=["number"]).columns.tolist()
+    if not cols:
+        return pd.DataFrame()
+
+    data = _prepare(df, cols, method)
+    means = _column_means(data, chunk_rows)
+    p = len(cols)
+    out = np.empty((p, p), dtype=np.float64)
+
+    blocks = _blocks(p, block_cols)
+    for i, a in enumerate(blocks):
+        for b in blocks[i:]:
+            corr, _ = _block_corr(data, a, b, means, chunk_rows)
+            out[np.ix_(a, b)] = corr
+            out[np.ix_(b, a)] = corr.T
+
+    np.fill_diagonal(out, 1.0)
+    return pd.DataFrame(out, index=cols, columns=cols)
+
+
+def top_correlated_pairs(df: pd.DataFrame, cols: list = None, method: str = "pearson", k: int = 50,
+                         min_abs: float = 0.0, chunk_rows: int = CHUNK_ROWS,
+                         block_cols: int = BLOCK_COLS) -> pd.DataFrame:
+    """
+    Strongest |r| pairs without materialising the full matrix.
+    Each block pair is reduced to its own top-k before merging, so memory
+    is bounded by block_cols^2 regardless of the number of columns.
+    """
+    cols = cols if cols is not None else df.select_dtypes(include=["number"]).columns.tolist()
+    empty = pd.DataFrame(columns=["feature_a", "feature_b", "corr", "abs_corr", "n"])
+    if len(cols) < 2:
+        return empty
+
+    data = _prepare(df, cols, method)
+    means = _column_means(data, chunk_rows)
+    blocks = _blocks(len(cols), block_cols)
+
+    found_i, found_j, found_r, found_n = [], [], [], []
+    for i, a in enumerate(blocks):
+        for b in blocks[i:]:
+            same = b is a
+            corr, n = _block_corr(data, a, b, means, chunk_rows)
+            strength = np.abs(np.nan_to_num(corr, nan=0.0))
+            if same:
+                # Upper triangle only: skip self-pairs and mirrored duplicates
+                strength[np.tril_indices_from(strength)] = 0.0
+            flat = strength.ravel()
+            take = min(k, flat.size)
+            top = np.argpartition(flat, -take)[-take:]
+            top = top[flat[top] > max(min_abs, 0.0)]
+            ra, rb = np.unravel_index(top, strength.shape)
+            found_i.append(a[ra])
+            found_j.append(b[rb])
+            found_r.append(corr[ra, rb])
+            found_n.append(n[ra, rb])
+
+    if not found_i:
+        return empty
+    ii, jj = np.concatenate(found_i), np.concatenate(found_j)
+    rr, nn = np.concatenate(found_r), np.concatenate(found_n)
+    order = np.argsort(-np.abs(rr))[:k]
+
+    cols_arr = np.asarray(cols, dtype=object)
+    return pd.DataFrame({
+        "feature_a": cols_arr[ii[order]],
+        "feature_b": cols_arr[jj[order]],
+        "corr": rr[order],
+        "abs_corr": np.abs(rr[order]),
+        "n": nn[order].astype(np.int64),
+    }).reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# CATEGORICAL ASSOCIATIONS
+# Contingency tables and group sums come from factorized codes
+# and np.bincount - no Python loops over rows or categories.
+# ---------------------------------------------------------
+def cramers_v(a: pd.Series, b: pd.Series, bias_correction: bool = True) -> float:
+    """Cramér's V between two categorical series (rows with NaN dropped)."""
+    ca, ua = pd.factorize(a, sort=False)
+    cb, ub = pd.factorize(b, sort=False)
+    ok = (ca >= 0) & (cb >= 0)
+    ca, cb = ca[ok], cb[ok]
+    n = len(ca)
+    r, k = len(ua), len(ub)
+    if n == 0 or r < 2 or k < 2:
+        return np.nan
+
+    table = np.bincount(ca * k + cb, minlength=r * k).reshape(r, k).astype(np.float64)
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        chi2 = np.nansum((table - expected) ** 2 / expected)
+    phi2 = chi2 / n
+
+    if bias_correction and n > 1:
+        # Bergsma (2013) correction
+        phi2 = max(0.0, phi2 - (k - 1) * (r - 1) / (n - 1))
+        r = r - (r - 1) ** 2 / (n - 1)
+        k = k - (k - 1) ** 2 / (n - 1)
+    denom = min(k - 1, r - 1)
+    return float(np.sqrt(phi2 / denom)) if denom > 0 else np.nan
+
+
+def correlation_ratio(categories: pd.Series, values: pd.Series) -> float:
+    """Correlation ratio (eta) of a numeric series explained by a categorical one."""
+    codes, uniques = pd.factorize(categories, sort=False)
+    v = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = (codes >= 0) & np.isfinite(v)
+    codes, v = codes[ok], v[ok]
+    if v.size == 0:
+        return np.nan
+
+    counts = np.bincount(codes, minlength=len(uniques))
+    sums = np.bincount(codes, weights=v, minlength=len(uniques))
+    grand = v.mean()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        group_means = np.where(counts > 0, sums / counts, 0.0)
+    ss_between = np.sum(counts * (group_means - grand) ** 2)
+    ss_total = np.sum((v - grand) ** 2)
+    return float(np.sqrt(ss_between / ss_total)) if ss_total > 0 else 0.0
+
+
+def association_matrix(df: pd.DataFrame, cols: list = None, max_categories: int = MAX_CATEGORIES) -> pd.DataFrame:
+    """
+    Mixed-type association matrix:
+    numeric-numeric -> |Pearson|, categorical-categorical -> Cramér's V,
+    categorical-numeric -> correlation ratio. High-cardinality categoricals are skipped.
+    """
+    cols = cols if cols is not None else df.columns.tolist()
+    num = [c for c in cols if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    cat = [c for c in cols if c not in num and df[c].nunique(dropna=True) <= max_categories]
+    keep = num + cat
+    out = pd.DataFrame(np.eye(len(keep)), index=keep, columns=keep)
+
+    if len(num) > 1:
+        out.loc[num, num] = correlation_matrix(df, num).abs().values
+    for i, a in enumerate(cat):
+        for b in cat[i + 1:]:
+            out.loc[a, b] = out.loc[b, a] = cramers_v(df[a], df[b])
+        for c in num:
+            out.loc[a, c] = out.loc[c, a] = correlation_ratio(df[a], df[c])
+    return out
+
+
+def compute_correlations(df: pd.DataFrame, method: str = "pearson", top_k: int = None, cols: list = None) -> dict:
+    """
+    Reusable entry point, cached per dataset version.
+    Returns {"method", "columns", "matrix" (None in top-k mode), "pairs"}.
+    """
+    from core.utils.caching import dataset_version, cached_compute
+
+    cols = cols if cols is not None else df.select_dtypes(include=["number"]).columns.tolist()
+    key = (dataset_version(df), method, top_k, tuple(cols))
+
+    def _build():
+        if top_k is not None:
+            return {"method": method, "columns": cols, "matrix": None,
+                    "pairs": top_correlated_pairs(df, cols, method=method, k=top_k)}
+        matrix = correlation_matrix(df, cols, method=method)
+        return {"method": method, "columns": cols, "matrix": matrix, "pairs": pairs_from_matrix(matrix)}
+
+    return cached_compute("correlation", key, _build)
+
+
+def pairs_from_matrix(matrix: pd.DataFrame, k: int = None, min_abs: float = 0.0) -> pd.DataFrame:
+    """Upper-triangle pairs of a correlation matrix sorted by |r|."""
+    if matrix is None or matrix.empty:
+        return pd.DataFrame(columns=["feature_a", "feature_b", "corr", "abs_corr"])
+    values = matrix.to_numpy()
+    iu, ju = np.triu_indices_from(values, k=1)
+    r = values[iu, ju]
+    ok = np.isfinite(r) & (np.abs(r) > min_abs)
+    iu, ju, r = iu[ok], ju[ok], r[ok]
+    order = np.argsort(-np.abs(r))
+    if k is not None:
+        order = order[:k]
+    cols = np.asarray(matrix.columns, dtype=object)
+    return pd.DataFrame({
+        "feature_a": cols[iu[order]],
+        "feature_b": cols[ju[order]],
+        "corr": r[order],
+        "abs_corr": np.abs(r[order]),
+    }).reset_index(drop=True)
@@ -3,8 +3,14 @@ import pandas as pd
 import streamlit as st
 import datetime
 import glob
+import pyarrow as pa
+import pyarrow.parquet as pq
+from core.pipeline.feature_pipeline import FeaturePipeline, pipeline_path
+from core.utils.caching import stamp_version
 
 DATA_DIR = os.path.join(os.getcwd(), "data")
+# Session map: dataset name (cloud_datasets key) -> its latest saved version
+DATASET_FILES_KEY = "dataset_files"
 
 class DataManager:
     @staticmethod
@@ -12,20 +18,23 @@ class DataManager:
         if not os.path.exists(DATA_DIR):
             os.makedirs(DATA_DIR)
 
-    def save_dataset(df: pd.DataFrame, filename: str, version_note: str = "initial", action_description: str = None):
+    def save_dataset(df: pd.DataFrame, filename: str, version_note: str = "initial", action_description: str = None,
+                     pipeline: FeaturePipeline = None):
         """
         Save dataframe as parquet and log the action.
+        If a fitted FeaturePipeline is given it is persisted alongside this version.
         """
-        DataManager._ensure_data_dir()
-        
-        # Clean filename
-        clean_name = filename.split(".")[0]
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        save_name = f"{clean_name}_v{timestamp}_{version_note}.parquet"
-        file_path = os.path.join(DATA_DIR, save_name)
+        file_path = DataManager._version_path(filename, version_note)
+        save_name = os.path.basename(file_path)
         
         df.to_parquet(file_path, index=False)
+        # Version stamp used by the dataset-version caches (core.utils.caching)
+        stamp_version(df, save_name)
+        DataManager._record_version(filename, file_path)
+        
+        if pipeline is not None:
+            DataManager.save_pipeline(pipeline, file_path)
+            st.session_state.setdefault("feature_pipelines", {})[filename] = pipeline
         
         # Update session state to reflect this as active
         st.session_state["active_dataset_path"] = file_path
@@ -43,6 +52,117 @@ class DataManager:
         
         return file_path
 
+    @staticmethod
+    def _version_path(filename: str, version_note: str) -> str:
+        """Path of a new timestamped version of a dataset."""
+        DataManager._ensure_data_dir()
+        
+        # Clean filename
+        clean_name = filename.split(".")[0]
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        save_name = f"{clean_name}_v{timestamp}_{version_note}.parquet"
+        return os.path.join(DATA_DIR, save_name)
+
+    @staticmethod
+    def _record_version(filename: str, file_path: str):
+        st.session_state.setdefault(DATASET_FILES_KEY, {})[filename] = file_path
+
+    # ---------------------------
+    # STREAMING (OUT-OF-CORE)
+    # ---------------------------
+    @staticmethod
+    def resolve_path(file_name: str):
+        """
+        Latest on-disk parquet for a dataset name, or None if it only lives in memory.
+        Versions saved this session come from the session map; otherwise the newest
+        "<name>_v*" version on disk, then the imported file itself.
+        """
+        recorded = st.session_state.get(DATASET_FILES_KEY, {}).get(file_name)
+        if recorded and os.path.exists(recorded):
+            return recorded
+        versions = DataManager.version_paths(file_name)
+        return versions[0] if versions else None
+
+    @staticmethod
+    def version_paths(file_name: str) -> list:
+        """On-disk parquet versions of a dataset, newest first, ending with the imported file itself."""
+        versions = sorted(glob.glob(os.path.join(DATA_DIR, f"{file_name.split('.')[0]}_v*.parquet")), reverse=True)
+        path = os.path.join(DATA_DIR, file_name)
+        return versions + [path] if os.path.exists(path) else versions
+
+    @staticmethod
+    def row_group_sizes(file_path: str) -> list:
+        """Rows per parquet row group, from the footer (no data is read)."""
+        meta = pq.ParquetFile(file_path).metadata
+        return [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+
+    @staticmethod
+    def iter_row_groups(file_path: str, columns: list = None):
+        """Yield a parquet file one row group at a time as DataFrames."""
+        pf = pq.ParquetFile(file_path)
+        for i in range(pf.num_row_groups):
+            yield pf.read_row_group(i, columns=columns).to_pandas()
+
+    @staticmethod
+    def stream_transform(file_path: str, transformer, filename: str, version_note: str,
+                         pipeline: FeaturePipeline = None, action_description: str = None) -> str:
+        """
+        Apply a fitted transformer row group by row group and write the result
+        straight to a new dataset version; only one row group is held in memory.
+        """
+        out_path = DataManager._version_path(filename, version_note)
+        writer = None
+        try:
+            for chunk in DataManager.iter_row_groups(file_path):
+                table = pa.Table.from_pandas(transformer.transform(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        except Exception:
+            if writer is not None:
+                writer.close()
+                os.remove(out_path)
+            raise
+        if writer is None:
+            return None
+        writer.close()
+        DataManager._record_version(filename, out_path)
+        
+        if pipeline is not None:
+            DataManager.save_pipeline(pipeline, out_path)
+            st.session_state.setdefault("feature_pipelines", {})[filename] = pipeline
+        
+        st.session_state["active_dataset_path"] = out_path
+        st.session_state["active_dataset"] = os.path.basename(out_path)
+        
+        if action_description:
+            if "action_log" not in st.session_state: st.session_state["action_log"] = []
+            time_str = datetime.datetime.now().strftime("%H:%M:%S")
+            st.session_state["action_log"].append(f"[{time_str}] {action_description}")
+        
+        return out_path
+
+    @staticmethod
+    def save_pipeline(pipeline: FeaturePipeline, dataset_path: str) -> str:
+        """Persist the fitted transformers that produced a dataset version."""
+        return pipeline.save(pipeline_path(dataset_path))
+
+    @staticmethod
+    def load_pipeline(file_name: str):
+        """Load the pipeline saved with a dataset version (None if there is none)."""
+        path = pipeline_path(os.path.join(DATA_DIR, file_name))
+        if os.path.exists(path):
+            return FeaturePipeline.load(path)
+        return None
+
+    @staticmethod
+    def get_feature_pipeline(dataset_name: str) -> FeaturePipeline:
+        """Working copy of the session pipeline for a dataset (empty if none yet)."""
+        pipelines = st.session_state.get("feature_pipelines", {})
+        current = pipelines.get(dataset_name)
+        return current.copy() if current is not None else FeaturePipeline()
+
     @staticmethod
     def list_datasets():
         """List all available parquet datasets in data dir."""
@@ -79,6 +199,8 @@ class DataManager:
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
+                if os.path.exists(pipeline_path(file_path)):
+                    os.remove(pipeline_path(file_path))
                 return True
             except Exception as e:
                 print(f"Error deleting file: {e}")
@@ -0,0 +1,378 @@
+import numpy as np
+import pandas as pd
+
+from modules.feature_engineering.transformers.scaling import TDigest
+
+# ---------------------------------------------------------
+# STREAMING EVALUATION METRICS
+# Metrics are accumulated batch by batch into fixed-size summaries,
+# so a test set of any size is evaluated in bounded memory and the
+# evaluation pages plot the summaries, never the raw points:
+#   - classification: confusion counts, plus per-class histograms of
+#     predicted scores (positives / negatives) from which ROC and PR
+#     curves, calibration, lift and threshold sweeps are read at every
+#     bin edge (one cumulative sum per class, memoized). Score bins are
+#     evenly spaced in logit, so they get finer towards 0 and 1, where a
+#     confident model puts most of its scores,
+#   - regression: error moments, t-digest quantiles of the residuals,
+#     and binned histograms of residuals and (actual, predicted) whose
+#     range doubles whenever a batch falls outside it.
+# ---------------------------------------------------------
+SCORE_BINS = 4096
+# Score bins span logits in [-SCORE_LOGIT_RANGE, SCORE_LOGIT_RANGE] (scores ~1.5e-8 to 1 - 1.5e-8)
+SCORE_LOGIT_RANGE = 18.0
+GRID_BINS = 64
+RESIDUAL_BINS = 128
+EVAL_BATCH_ROWS = 50_000
+RESIDUAL_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+class BinnedHistogram:
+    """
+    N-d histogram with a fixed number of bins per axis and a growing range:
+    values outside the current range merge bins pairwise (width doubles) until they fit.
+    """
+
+    def __init__(self, n_dims: int = 1, bins: int = GRID_BINS):
+        if bins % 2:
+            raise ValueError("bins must be even")
+        self.bins = bins
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros((bins,) * n_dims, dtype=np.int64)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, points: np.ndarray):
+        points = np.asarray(points, dtype=np.float64).reshape(len(points), -1)
+        points = points[np.isfinite(points).all(axis=1)]
+        if not len(points):
+            return self
+        if self.lo is None:
+            lo, hi = points.min(axis=0), points.max(axis=0)
+            self.lo = lo
+            self.width = np.where(hi > lo, (hi - lo) / (self.bins - 1), np.maximum(np.abs(lo), 1.0) / self.bins)
+        for d in range(self.counts.ndim):
+            while points[:, d].min() < self.lo[d]:
+                self._grow(d, down=True)
+            while points[:, d].max() >= self.lo[d] + self.bins * self.width[d]:
+                self._grow(d, down=False)
+        idx = ((points - self.lo) / self.width).astype(np.int64).clip(0, self.bins - 1)
+        flat = np.ravel_multi_index(tuple(idx.T), self.counts.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        return self
+
+    def _grow(self, d: int, down: bool):
+        c = np.moveaxis(self.counts, d, 0)
+        half = c.reshape(self.bins // 2, 2, *c.shape[1:]).sum(axis=1)
+        empty = np.zeros_like(half)
+        self.counts = np.moveaxis(np.concatenate([empty, half] if down else [half, empty]), 0, d)
+        if down:
+            self.lo[d] -= self.bins * self.width[d]
+        self.width[d] *= 2
+
+    def edges(self, d: int = 0) -> np.ndarray:
+        return self.lo[d] + self.width[d] * np.arange(self.bins + 1)
+
+    def centers(self, d: int = 0) -> np.ndarray:
+        return self.lo[d] + self.width[d] * (np.arange(self.bins) + 0.5)
+
+
+def score_bin_edges(bins: int = SCORE_BINS) -> np.ndarray:
+    """bins + 1 increasing score edges from 0 to 1, evenly spaced in logit."""
+    edges = 1 / (1 + np.exp(-np.linspace(-SCORE_LOGIT_RANGE, SCORE_LOGIT_RANGE, bins + 1)))
+    edges[0], edges[-1] = 0.0, 1.0
+    return edges
+
+
+def score_bin(proba: np.ndarray, bins: int = SCORE_BINS) -> np.ndarray:
+    """Index of the logit-spaced bin holding every score."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logit = np.log(proba) - np.log1p(-proba)
+    logit = np.where(np.isnan(logit), -SCORE_LOGIT_RANGE, logit).clip(-SCORE_LOGIT_RANGE, SCORE_LOGIT_RANGE)
+    scaled = (logit + SCORE_LOGIT_RANGE) * (bins / (2 * SCORE_LOGIT_RANGE))
+    return np.floor(scaled).astype(np.int64).clip(0, bins - 1)
+
+
+class ClassificationMetrics:
+    """Running confusion matrix and one-vs-rest score histograms."""
+
+    task = "Classification"
+
+    def __init__(self, classes, score_bins: int = SCORE_BINS):
+        self.classes = np.asarray(classes)
+        k = len(self.classes)
+        self.score_bins = score_bins
+        self.edges = score_bin_edges(score_bins)
+        self.n, self.unseen = 0, 0
+        self.confusion = np.zeros((k, k), dtype=np.int64)
+        self.pos_hist = np.zeros((k, score_bins), dtype=np.int64)
+        self.neg_hist = np.zeros((k, score_bins), dtype=np.int64)
+        self._tables = {}
+
+    @property
+    def has_scores(self) -> bool:
+        return bool(self.pos_hist.any())
+
+    @property
+    def positive_class(self):
+        """Class whose curves are shown by default (the second class of a binary task)."""
+        return self.classes[-1]
+
+    def update(self, y_true, y_pred, proba: np.ndarray = None):
+        y_true = np.asarray(y_true)
+        k = len(self.classes)
+        self.n += len(y_true)
+        t = np.searchsorted(self.classes, y_true).clip(0, k - 1)
+        seen = self.classes[t] == y_true  # labels never seen in training count as misses
+        p = np.searchsorted(self.classes, np.asarray(y_pred)).clip(0, k - 1)
+        self.confusion += np.bincount(t[seen] * k + p[seen], minlength=k * k).reshape(k, k)
+        self.unseen += int((~seen).sum())
+        if proba is not None:
+            self._tables = {}
+            proba = np.asarray(proba, dtype=np.float64)[seen]
+            b = score_bin(proba, self.score_bins)
+            is_pos = t[seen][:, None] == np.arange(k)
+            offset = np.arange(k) * self.score_bins + b
+            size = k * self.score_bins
+            self.pos_hist += np.bincount(offset[is_pos], minlength=size).reshape(k, -1)
+            self.neg_hist += np.bincount(offset[~is_pos], minlength=size).reshape(k, -1)
+        return self
+
+    def report(self) -> pd.DataFrame:
+        """Per-class precision / recall / F1 / support with accuracy and averages (classification_report layout)."""
+        tp = np.diag(self.confusion).astype(np.float64)
+        predicted, support = self.confusion.sum(axis=0), self.confusion.sum(axis=1)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp),
+                       where=precision + recall > 0)
+        df = pd.DataFrame({"precision": precision, "recall": recall, "f1-score": f1, "support": support},
+                          index=[str(c) for c in self.classes])
+        weights = support / max(support.sum(), 1)
+        df.loc["accuracy"] = [np.nan, np.nan, self.accuracy, self.n]
+        df.loc["macro avg"] = [precision.mean(), recall.mean(), f1.mean(), self.n]
+        df.loc["weighted avg"] = [precision @ weights, recall @ weights, f1 @ weights, self.n]
+        return df
+
+    @property
+    def accuracy(self) -> float:
+        return np.trace(self.confusion) / self.n if self.n else np.nan
+
+    def summary(self) -> dict:
+        if self.n == 0:
+            return {}
+        report = self.report()
+        out = {"accuracy": self.accuracy, "confusion": self.confusion, "classes": self.classes,
+               "f1_weighted": report.loc["weighted avg", "f1-score"],
+               "precision_weighted": report.loc["weighted avg", "precision"]}
+        if self.has_scores:
+            # Binary: AUC of the positive class; multiclass: macro one-vs-rest
+            classes = self.classes if len(self.classes) > 2 else [self.positive_class]
+            out["auc"] = float(np.mean([self.roc_auc(c) for c in classes]))
+        return out
+
+    def _class_index(self, cls) -> int:
+        return int(np.flatnonzero(self.classes == (self.positive_class if cls is None else cls))[0])
+
+    def threshold_table(self, cls=None) -> pd.DataFrame:
+        """
+        One row per bin edge, from the highest threshold down: counts and rates when
+        predicting cls for scores >= threshold. Built once per class (two cumulative
+        sums over the histograms) and reused by every curve and threshold slider.
+        """
+        cls = self.positive_class if cls is None else cls
+        if cls not in self._tables:
+            i = self._class_index(cls)
+            tp = np.concatenate([[0], np.cumsum(self.pos_hist[i, ::-1])])
+            fp = np.concatenate([[0], np.cumsum(self.neg_hist[i, ::-1])])
+            P, N = tp[-1], fp[-1]
+            flagged = tp + fp
+            precision = np.divide(tp, flagged, out=np.ones(len(tp)), where=flagged > 0)
+            recall = tp / max(P, 1)
+            self._tables[cls] = pd.DataFrame({
+                "threshold": self.edges[::-1],
+                "tp": tp, "fp": fp, "fn": P - tp, "tn": N - fp,
+                "precision": precision, "recall": recall, "fpr": fp / max(N, 1),
+                "f1": np.divide(2 * precision * recall, precision + recall, out=np.zeros(len(tp)),
+                                where=precision + recall > 0),
+                "flagged_share": flagged / max(P + N, 1),
+            })
+        return self._tables[cls]
+
+    def roc(self, cls=None) -> pd.DataFrame:
+        table = self.threshold_table(cls)
+        return table[["fpr", "recall", "threshold"]].rename(columns={"recall": "tpr"})
+
+    def roc_auc(self, cls=None) -> float:
+        curve = self.roc(cls)
+        return float(np.trapz(curve["tpr"], curve["fpr"]))
+
+    def pr(self, cls=None) -> pd.DataFrame:
+        table = self.threshold_table(cls)
+        return table.loc[table["tp"] + table["fp"] > 0, ["recall", "precision", "threshold"]]
+
+    def average_precision(self, cls=None) -> float:
+        curve = self.pr(cls)
+        recall = np.concatenate([[0.0], curve["recall"].to_numpy()])
+        return float(np.sum(np.diff(recall) * curve["precision"].to_numpy()))
+
+    def at_threshold(self, threshold: float, cls=None) -> pd.Series:
+        """Table row for the bin edge closest to threshold."""
+        table = self.threshold_table(cls)
+        return table.iloc[self.score_bins - int(np.abs(self.edges - threshold).argmin())]
+
+    def cost_curve(self, cost_fp: float = 1.0, cost_fn: float = 1.0, cls=None) -> pd.DataFrame:
+        """Total misclassification cost at every threshold."""
+        table = self.threshold_table(cls)
+        return pd.DataFrame({"threshold": table["threshold"], "cost": cost_fp * table["fp"] + cost_fn * table["fn"]})
+
+    def gains(self, cls=None) -> pd.DataFrame:
+        """Cumulative gain and lift, scanning rows from the highest score down."""
+        table = self.threshold_table(cls)
+        table = table[table["flagged_share"] > 0].drop_duplicates("flagged_share")
+        return pd.DataFrame({"population": table["flagged_share"], "gain": table["recall"],
+                             "lift": table["recall"] / table["flagged_share"], "threshold": table["threshold"]})
+
+    def calibration(self, cls=None, n_bins: int = 10) -> pd.DataFrame:
+        """Reliability curve: mean predicted score vs observed positive rate per score band."""
+        i = self._class_index(cls)
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        band = np.minimum((centers * n_bins).astype(np.int64), n_bins - 1)
+        pos = np.bincount(band, weights=self.pos_hist[i], minlength=n_bins)
+        rows = pos + np.bincount(band, weights=self.neg_hist[i], minlength=n_bins)
+        predicted = np.bincount(band, weights=centers * (self.pos_hist[i] + self.neg_hist[i]), minlength=n_bins)
+        keep = rows > 0
+        return pd.DataFrame({"mean_predicted": predicted[keep] / rows[keep],
+                             "fraction_positive": pos[keep] / rows[keep], "rows": rows[keep].astype(np.int64)})
+
+    def calibration_error(self, cls=None) -> dict:
+        """Brier score and expected calibration error, at score-bin resolution."""
+        i = self._class_index(cls)
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        pos, neg = self.pos_hist[i], self.neg_hist[i]
+        total = max(pos.sum() + neg.sum(), 1)
+        curve = self.calibration(cls)
+        ece = np.sum(curve["rows"] * np.abs(curve["mean_predicted"] - curve["fraction_positive"])) / total
+        return {"brier": float((pos * (1 - centers) ** 2 + neg * centers ** 2).sum() / total), "ece": float(ece)}
+
+
+class RunningMoments:
+    """Count, mean and centred sum of squares (M2), merged batch by batch (Chan et al.)."""
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        n_b = len(values)
+        if not n_b:
+            return self
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        # Merging centred sums avoids the cancellation of sum(y^2) - sum(y)^2 / n for large means
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+        return self
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation."""
+        return float(np.sqrt(self.m2 / self.n)) if self.n else np.nan
+
+
+class RegressionMetrics:
+    """Running error moments, residual quantiles and binned (actual, predicted) counts."""
+
+    task = "Regression"
+
+    def __init__(self, grid_bins: int = GRID_BINS, residual_bins: int = RESIDUAL_BINS):
+        self.n = 0
+        self.sums = np.zeros(3)  # error, |error|, error^2
+        self.target = RunningMoments()
+        self.max_abs_error = 0.0
+        self.residuals = TDigest()
+        self.abs_errors = TDigest()
+        self.grid = BinnedHistogram(2, grid_bins)
+        self.residual_hist = BinnedHistogram(1, residual_bins)
+
+    def update(self, y_true, y_pred, proba=None):
+        y = np.asarray(y_true, dtype=np.float64)
+        p = np.asarray(y_pred, dtype=np.float64).ravel()
+        ok = np.isfinite(y) & np.isfinite(p)
+        y, p = y[ok], p[ok]
+        if not len(y):
+            return self
+        e = y - p
+        self.n += len(y)
+        self.sums += [e.sum(), np.abs(e).sum(), (e ** 2).sum()]
+        self.target.update(y)
+        self.max_abs_error = max(self.max_abs_error, float(np.abs(e).max()))
+        self.residuals.update(e)
+        self.abs_errors.update(np.abs(e))
+        self.grid.update(np.column_stack([y, p]))
+        self.residual_hist.update(e)
+        return self
+
+    def summary(self) -> dict:
+        if self.n == 0:
+            return {}
+        se, sae, sse = self.sums
+        sst = self.target.m2
+        return {"rmse": np.sqrt(sse / self.n), "mae": sae / self.n, "r2": 1 - sse / sst if sst > 0 else np.nan,
+                "bias": se / self.n, "median_ae": float(self.abs_errors.quantile(0.5)),
+                "p95_ae": float(self.abs_errors.quantile(0.95)), "max_ae": self.max_abs_error,
+                "residual_quantiles": dict(zip(RESIDUAL_QUANTILES, self.residuals.quantile(RESIDUAL_QUANTILES)))}
+
+
+def _rows(X, start: int, stop: int):
+    if isinstance(X, (pd.DataFrame, pd.Series)):
+        return X.iloc[start:stop]
+    return X[start:stop]
+
+
+def _classes(model, y, preds) -> np.ndarray:
+    classes = getattr(model, "classes_", None)
+    if classes is not None:
+        return np.asarray(classes)
+    labels = pd.Series(np.concatenate([np.asarray(y), np.asarray(preds)])).dropna().unique()
+    return np.sort(labels)
+
+
+def evaluate_model(model, X, y, task: str, preds=None, batch_rows: int = EVAL_BATCH_ROWS):
+    """
+    Stream (X, y) through the model in batches into a metrics accumulator.
+    preds, when already computed, are reused; classifiers add predict_proba scores when available.
+    """
+    y = np.asarray(y)
+    if task != "Classification":
+        metrics = RegressionMetrics()
+        for start in range(0, len(y), batch_rows):
+            stop = start + batch_rows
+            p = preds[start:stop] if preds is not None else model.predict(_rows(X, start, stop))
+            metrics.update(y[start:stop], p)
+        return metrics
+
+    if preds is None and getattr(model, "classes_", None) is None:
+        preds = model.predict(X)
+    metrics = ClassificationMetrics(_classes(model, y, preds if preds is not None else []))
+    scores = hasattr(model, "predict_proba")
+    for start in range(0, len(y), batch_rows):
+        stop = start + batch_rows
+        Xb = _rows(X, start, stop)
+        proba = model.predict_proba(Xb) if scores else None
+        if proba is not None and np.shape(proba)[1:] != (len(metrics.classes),):
+            proba = None
+        if preds is not None:
+            p = np.asarray(preds)[start:stop]
+        elif proba is not None:
+            p = metrics.classes[np.argmax(proba, axis=1)]
+        else:
+            p = model.predict(Xb)
+        metrics.update(y[start:stop], p, proba)
+    return metrics
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# MISSINGNESS ANALYZER
+# One pass over row chunks packs each row's null mask into bits and
+# hashes it. Everything else (per-column counts, co-occurrence,
+# nullity correlation) is derived from the distinct-pattern table,
+# which is tiny compared to the frame (D patterns << n rows).
+# ---------------------------------------------------------
+CHUNK_ROWS = 500_000
+MATRIX_ROW_BINS = 200
+MATRIX_MAX_COLS = 100
+TOP_PATTERNS = 20
+
+# 64-bit mixing constants (splitmix64)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_rows(packed: np.ndarray) -> np.ndarray:
+    """64-bit hash of each row of a packed bitmap (uint8, rows x nbytes)."""
+    n, nbytes = packed.shape
+    pad = (-nbytes) % 8
+    if pad:
+        packed = np.hstack([packed, np.zeros((n, pad), dtype=np.uint8)])
+    words = np.ascontiguousarray(packed).view(np.uint64)
+
+    h = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for w in range(words.shape[1]):
+            z = words[:, w] + _GOLDEN * np.uint64(w + 1)
+            z = (z ^ (z >> np.uint64(30))) * _MIX_1
+            z = (z ^ (z >> np.uint64(27))) * _MIX_2
+            z ^= z >> np.uint64(31)
+            h = (h ^ z) * _MIX_2 + _GOLDEN
+    return h
+
+
+def analyze_missingness(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS,
+                        row_bins: int = MATRIX_ROW_BINS) -> dict:
+    """
+    Pattern-level missingness report.
+    Returns counts per column, the distinct row patterns, nullity
+    co-occurrence / correlation between columns and a bounded
+    (row_bins x columns) matrix view of where nulls sit in the file.
+    """
+    cols = df.columns.tolist()
+    n, p = len(df), len(cols)
+
+    bin_size = max(1, -(-n // row_bins))
+    n_bins = -(-n // bin_size) if n else 0
+    matrix = np.zeros((n_bins, p), dtype=np.float64)
+
+    pattern_counts = pd.Series(dtype=np.int64)
+    seen_hashes = np.array([], dtype=np.uint64)
+    rep_hashes, rep_rows = [], []
+
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        mask = df.iloc[start:stop].isna().to_numpy()
+
+        # Bounded matrix view: null fraction per row bin
+        first_bin = start // bin_size
+        local_starts = np.arange(first_bin * bin_size, stop, bin_size) - start
+        local_starts[0] = 0
+        sums = np.add.reduceat(mask.astype(np.float32), local_starts, axis=0)
+        matrix[first_bin:first_bin + len(sums)] += sums
+
+        packed = np.packbits(mask, axis=1)
+        hashes = _hash_rows(packed)
+        codes, uniques = pd.factorize(hashes)
+        counts = np.bincount(codes, minlength=len(uniques))
+        pattern_counts = pattern_counts.add(pd.Series(counts, index=uniques), fill_value=0)
+
+        # Keep one packed row per new pattern for decoding
+        _, first_pos = np.unique(codes, return_index=True)
+        is_new = ~np.isin(uniques, seen_hashes)
+        rep_hashes.append(uniques[is_new])
+        rep_rows.append(packed[first_pos[is_new]])
+        seen_hashes = np.concatenate([seen_hashes, uniques[is_new]])
+
+    sizes = np.diff(np.append(np.arange(0, n, bin_size), n)) if n else np.array([])
+    if n_bins:
+        matrix /= sizes[:, None]
+
+    # Decode the distinct patterns -> (D x p) boolean table
+    pattern_counts = pattern_counts.astype(np.int64).sort_values(ascending=False)
+    if len(pattern_counts):
+        all_rows = np.vstack(rep_rows)
+        lookup = pd.Index(np.concatenate(rep_hashes)).get_indexer(pattern_counts.index)
+        packed_table = all_rows[lookup]
+        table = np.unpackbits(packed_table, axis=1, count=p).astype(bool)
+    else:
+        table = np.zeros((0, p), dtype=bool)
+    weights = pattern_counts.to_numpy().astype(np.float64)
+
+    null_counts = weights @ table
+    tw = table.astype(np.float64)
+    cooc = tw.T @ (tw * weights[:, None])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = null_counts * (n - null_counts)
+        nullity_corr = (n * cooc - np.outer(null_counts, null_counts)) / np.sqrt(np.outer(var, var)) if n else cooc
+    nullity_corr[~np.isfinite(nullity_corr)] = np.nan
+
+    has_missing = null_counts > 0
+    miss_cols = [c for c, m in zip(cols, has_missing) if m]
+    cols_arr = np.asarray(cols, dtype=object)
+
+    top = min(TOP_PATTERNS, len(pattern_counts))
+    patterns = pd.DataFrame({
+        "rows": pattern_counts.to_numpy()[:top],
+        "share": weights[:top] / n if n else weights[:top],
+        "n_missing_cols": table[:top].sum(axis=1),
+        "missing_columns": [", ".join(cols_arr[row]) or "(complete)" for row in table[:top]],
+    })
+
+    # Matrix view keeps the columns with the most nulls
+    order = np.argsort(-null_counts)[:MATRIX_MAX_COLS]
+    order = order[null_counts[order] > 0]
+
+    return {
+        "n_rows": n,
+        "null_counts": pd.Series(null_counts.astype(np.int64), index=cols),
+        "complete_rows": int(weights[~table.any(axis=1)].sum()) if len(weights) else n,
+        "n_patterns": len(pattern_counts),
+        "patterns": patterns,
+        "cooccurrence": pd.DataFrame(cooc, index=cols, columns=cols).loc[miss_cols, miss_cols],
+        "nullity_corr": pd.DataFrame(nullity_corr, index=cols, columns=cols).loc[miss_cols, miss_cols],
+        "matrix": pd.DataFrame(matrix[:, order], columns=cols_arr[order]),
+        "matrix_row_bin": bin_size,
+    }
+
+
+def suggest_imputation(df: pd.DataFrame, report: dict, corr_threshold: float = 0.7) -> list:
+    """
+    Rule-based suggestions for the imputation expander.
+    Returns dicts with column(s), IMPUTATION_CATALOG category/method and a reason.
+    """
+    n = report["n_rows"]
+    counts = report["null_counts"]
+    counts = counts[counts > 0]
+    if n == 0 or counts.empty:
+        return []
+
+    suggestions = []
+    share = counts / n
+    rows_with_missing = n - report["complete_rows"]
+
+    if rows_with_missing / n < 0.05:
+        suggestions.append({
+            "columns": counts.index.tolist(), "category": "1. Deletion-based", "method": "Listwise (Drop Rows)",
+            "reason": f"Only {rows_with_missing / n:.1%} of rows have any missing value.",
+        })
+
+    mostly_empty = share[share > 0.5].index.tolist()
+    if mostly_empty:
+        suggestions.append({
+            "columns": mostly_empty, "category": "1. Deletion-based", "method": "Drop Columns (> Ratio)",
+            "reason": "More than half of these columns is missing.",
+        })
+
+    # Columns that go missing together suggest structural (non-random) missingness
+    corr = report["nullity_corr"]
+    if corr.shape[0] > 1:
+        vals = corr.to_numpy().copy()
+        np.fill_diagonal(vals, 0.0)
+        linked = corr.index[(np.abs(np.nan_to_num(vals)) >= corr_threshold).any(axis=1)].tolist()
+        if linked:
+            suggestions.append({
+                "columns": linked, "category": "4. Indicator-based", "method": "Add Missing Indicator",
+                "reason": "These columns are missing together (nullity correlation ≥ "
+                          f"{corr_threshold}); the missingness itself is likely informative.",
+            })
+
+    rest = [c for c in counts.index if c not in mostly_empty]
+    num_rest = [c for c in rest if pd.api.types.is_numeric_dtype(df[c])]
+    cat_rest = [c for c in rest if c not in num_rest]
+    n_numeric = len(df.select_dtypes(include=np.number).columns)
+
+    if num_rest:
+        if n_numeric >= 3 and share[num_rest].max() > 0.05 and n <= 200_000:
+            suggestions.append({
+                "columns": num_rest, "category": "5. Distance-based", "method": "KNN Imputation",
+                "reason": "Moderate gaps in numeric columns with enough numeric neighbours to borrow from.",
+            })
+        else:
+            suggestions.append({
+                "columns": num_rest, "category": "2. Simple Deterministic", "method": "Median",
+                "reason": "Few gaps (or a large frame): the median is robust and fast.",
+            })
+    if cat_rest:
+        suggestions.append({
+            "columns": cat_rest, "category": "2. Simple Deterministic", "method": "Mode",
+            "reason": "Categorical columns: fill with the most frequent value.",
+        })
+    return suggestions
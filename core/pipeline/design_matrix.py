@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.model_selection import train_test_split
+
+from core.data_manager import DATA_DIR
+from core.utils.caching import cached_compute, dataset_version, prune_disk_cache, set_cached, touch_entry
+from modules.feature_engineering.transformers.encoding import encode_features
+
+# ---------------------------------------------------------
+# DESIGN MATRIX CACHE
+# The encoded model input for one (dataset version, target, features,
+# encoding) is built once and written under data/design/<key>/ as
+# float32 .npy files (dense, or CSR data/indices/indptr) plus the
+# train/test row indices, the target and the fitted encoder. Reads
+# are memory-mapped, so training, evaluation, explainability and
+# export share one copy, and new data is encoded to the same columns.
+# Native categorical columns are stored as float codes and restored
+# to pandas categories on read. The directory keeps the MAX_DESIGNS
+# most recently used matrices.
+# ---------------------------------------------------------
+DESIGN_DIR = os.path.join(DATA_DIR, "design")
+MAX_DESIGNS = 16
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+SCHEMA_FILE = "schema.json"
+
+
+def design_key(version: str, target: str, features: list, encoding: dict) -> str:
+    payload = json.dumps({"version": version, "target": target, "features": list(features),
+                          "encoding": encoding}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+
+def _pack(X: pd.DataFrame, categories: dict = None) -> tuple:
+    """Encoded frame -> (float32 ndarray, {column: categories}); categoricals become codes."""
+    if categories is None:
+        categories = {c: X[c].astype("category").cat.categories.tolist()
+                      for c in X.columns if not pd.api.types.is_numeric_dtype(X[c])}
+    out = np.empty((len(X), X.shape[1]), dtype=np.float32)
+    for j, c in enumerate(X.columns):
+        if c in categories:
+            codes = pd.Categorical(X[c], categories=categories[c]).codes.astype(np.float32)
+            codes[codes < 0] = np.nan
+            out[:, j] = codes
+        else:
+            out[:, j] = X[c].to_numpy(dtype=np.float32, na_value=np.nan)
+    return out, categories
+
+
+class DesignMatrix:
+    """Read side of a cached design matrix; arrays are memory-mapped from disk."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.key = os.path.basename(path)
+        with open(os.path.join(path, SCHEMA_FILE)) as f:
+            self.schema = json.load(f)
+        self._split = None
+        self._encoder = None
+
+    @property
+    def columns(self) -> list:
+        return self.schema["columns"]
+
+    @property
+    def features(self) -> list:
+        return self.schema["features"]
+
+    @property
+    def target(self) -> str:
+        return self.schema["target"]
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.schema["sparse"]
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    @property
+    def values(self):
+        """float32 memmap (dense) or CSR matrix over memmapped buffers (sparse)."""
+        if self.is_sparse:
+            return sp.csr_matrix((self._load("X_data"), self._load("X_indices"), self._load("X_indptr")),
+                                 shape=tuple(self.schema["shape"]))
+        return self._load("X")
+
+    @property
+    def train_idx(self) -> np.ndarray:
+        return self._load("train_idx")
+
+    @property
+    def test_idx(self) -> np.ndarray:
+        return self._load("test_idx")
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = joblib.load(os.path.join(self.path, "encoder.joblib"))
+        return self._encoder
+
+    def _frame(self, block, index) -> pd.DataFrame:
+        if sp.issparse(block):
+            return pd.DataFrame.sparse.from_spmatrix(block, index=index, columns=self.columns)
+        X = pd.DataFrame(block, index=index, columns=self.columns, copy=False)
+        for c, cats in self.schema["categories"].items():
+            codes = X[c].to_numpy()
+            codes = np.where(np.isnan(codes), -1, codes).astype(np.int64)
+            X[c] = pd.Categorical.from_codes(codes, categories=cats)
+        return X
+
+    def frame(self, rows=None) -> pd.DataFrame:
+        """Encoded features for positional rows (all rows when None), indexed by position."""
+        values = self.values
+        if rows is None:
+            return self._frame(values, pd.RangeIndex(values.shape[0]))
+        rows = np.asarray(rows)
+        return self._frame(values[rows], pd.Index(rows))
+
+    def target_values(self, rows=None) -> pd.Series:
+        codes = self._load("y")
+        rows = np.arange(len(codes)) if rows is None else np.asarray(rows)
+        y = np.asarray(codes[rows])
+        classes = self.schema["classes"]
+        if classes is not None:
+            # code -1 (missing label) comes back as NaN
+            y = np.asarray(pd.Categorical.from_codes(y, classes), dtype=object)
+        return pd.Series(y, index=pd.Index(rows), name=self.target)
+
+    def split(self) -> tuple:
+        """(X_train, X_test, y_train, y_test); the same frame objects are returned on every call."""
+        if self._split is None:
+            tr, te = self.train_idx, self.test_idx
+            self._split = (self.frame(tr), self.frame(te), self.target_values(tr), self.target_values(te))
+        return self._split
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Encode new raw rows with the stored encoder into the training column schema."""
+        X = self.encoder.transform(df[self.features], sparse=self.is_sparse)
+        if sp.issparse(X):
+            return pd.DataFrame.sparse.from_spmatrix(X.astype(np.float32), index=df.index, columns=self.columns)
+        X = X.reindex(columns=self.columns)
+        values, _ = _pack(X, self.schema["categories"])
+        return self._frame(values, df.index)
+
+    def schema_json(self) -> str:
+        """Input schema for inference: raw features, encoded columns, categories."""
+        keys = ["target", "features", "columns", "categories", "classes", "encoding"]
+        return json.dumps({k: self.schema[k] for k in keys}, indent=2, default=str)
+
+
+def build_design_matrix(df: pd.DataFrame, target: str, features: list, encoding: dict, path: str) -> DesignMatrix:
+    """Encode df[features], split rows and write everything under path."""
+    X, encoder = encode_features(df[features], drop_first=encoding["drop_first"], sparse=encoding["sparse"],
+                                 keep_categorical=encoding["keep_categorical"])
+    tmp = tempfile.mkdtemp(prefix=".tmp_", dir=os.path.dirname(path))
+    try:
+        if sp.issparse(X) or any(isinstance(t, pd.SparseDtype) for t in X.dtypes):
+            # sparse=True gives a CSR matrix, text columns a sparse-backed frame
+            columns = encoder.transformed_columns(df[features]) if sp.issparse(X) else list(X.columns)
+            csr = sp.csr_matrix(X if sp.issparse(X) else X.sparse.to_coo(), dtype=np.float32)
+            for name in ("data", "indices", "indptr"):
+                np.save(os.path.join(tmp, f"X_{name}.npy"), getattr(csr, name))
+            shape, categories, sparse = csr.shape, {}, True
+        else:
+            columns = list(X.columns)
+            values, categories = _pack(X)
+            np.save(os.path.join(tmp, "X.npy"), values)
+            shape, sparse = values.shape, False
+
+        y = df[target]
+        if pd.api.types.is_numeric_dtype(y):
+            np.save(os.path.join(tmp, "y.npy"), y.to_numpy())
+            classes = None
+        else:
+            codes, uniques = pd.factorize(y, sort=True)
+            np.save(os.path.join(tmp, "y.npy"), codes)
+            classes = uniques.tolist()
+
+        train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=encoding["test_size"],
+                                               random_state=encoding["random_state"])
+        np.save(os.path.join(tmp, "train_idx.npy"), train_idx)
+        np.save(os.path.join(tmp, "test_idx.npy"), test_idx)
+        joblib.dump(encoder, os.path.join(tmp, "encoder.joblib"))
+
+        schema = {"target": target, "features": list(features), "columns": [str(c) for c in columns],
+                  "categories": categories, "classes": classes, "shape": list(shape), "sparse": sparse,
+                  "encoding": encoding}
+        with open(os.path.join(tmp, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f, default=str)
+        try:
+            os.rename(tmp, path)
+        except OSError:  # built concurrently by another session
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return DesignMatrix(path)
+
+
+def get_design_matrix(df: pd.DataFrame, target: str, features: list, keep_categorical: bool = False,
+                      sparse: bool = False, drop_first: bool = True, test_size: float = TEST_SIZE,
+                      random_state: int = RANDOM_STATE) -> DesignMatrix:
+    """Cached design matrix for a dataset version: built on first use, memory-mapped afterwards."""
+    encoding = {"drop_first": drop_first, "keep_categorical": keep_categorical, "sparse": sparse,
+                "test_size": test_size, "random_state": random_state}
+    key = design_key(dataset_version(df), target, features, encoding)
+    path = os.path.join(DESIGN_DIR, key)
+
+    def load():
+        if os.path.exists(os.path.join(path, SCHEMA_FILE)):
+            return DesignMatrix(path)
+        os.makedirs(DESIGN_DIR, exist_ok=True)
+        design = build_design_matrix(df, target, features, encoding, path)
+        prune_disk_cache(DESIGN_DIR, MAX_DESIGNS, keep=path)
+        return design
+
+    design = cached_compute("design_matrix", key, load)
+    if not os.path.exists(os.path.join(path, SCHEMA_FILE)):
+        # Evicted from disk since this session cached it
+        design = set_cached("design_matrix", key, load())
+    touch_entry(path)
+    return design
@@ -0,0 +1,66 @@
+import pickle
+
+import pandas as pd
+
+# ---------------------------------------------------------
+# FEATURE PIPELINE
+# Ordered list of fitted transformers recorded as the user engineers
+# a dataset. It is pickled next to the dataset version it produced,
+# so scoring data goes through exactly the same fitted statistics.
+# ---------------------------------------------------------
+PIPELINE_SUFFIX = ".pipeline.pkl"
+
+
+class FeaturePipeline:
+    """Append-only chain of fitted transformers (each exposes transform(df))."""
+
+    def __init__(self, steps=None):
+        self.steps = list(steps or [])
+
+    def add(self, name: str, transformer):
+        """Record an already-fitted transformer."""
+        self.steps.append((name, transformer))
+        return self
+
+    def fit_apply(self, name: str, transformer, df: pd.DataFrame) -> pd.DataFrame:
+        """Fit a transformer on df, record it and return the transformed frame."""
+        out = transformer.fit_transform(df)
+        self.add(name, transformer)
+        return out
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Replay every recorded step on new data (no refitting)."""
+        for _, transformer in self.steps:
+            df = transformer.transform(df)
+        return df
+
+    def describe(self) -> list:
+        return [f"{name}: {type(t).__name__}" for name, t in self.steps]
+
+    def copy(self):
+        return FeaturePipeline(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    # ---------------------------
+    # PERSISTENCE
+    # ---------------------------
+    def dumps(self) -> bytes:
+        return pickle.dumps(self)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+        return path
+
+    @staticmethod
+    def load(path: str):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+def pipeline_path(dataset_path: str) -> str:
+    """Sidecar file holding the pipeline for a saved dataset version."""
+    base = dataset_path[:-len(".parquet")] if dataset_path.endswith(".parquet") else dataset_path
+    return base + PIPELINE_SUFFIX
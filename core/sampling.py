@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.data_manager import DATA_DIR, DataManager
+from core.utils.caching import cached_compute, dataset_version, prune_disk_cache, set_cached, stamp_version, touch_entry
+
+# ---------------------------------------------------------
+# SAMPLING
+# Every row gets a seeded uniform key and a sample is the n smallest
+# keys (the quota smallest per stratum when stratified). Bottom-k
+# sets merge chunk by chunk, so a parquet file is sampled one row
+# group at a time. Stratified quotas are proportional to stratum
+# sizes, with a floor so rare classes survive. Samples are cached on disk per dataset version,
+# keeping the MAX_SAMPLES most recently used.
+# ---------------------------------------------------------
+SAMPLE_DIR = os.path.join(DATA_DIR, "samples")
+MAX_SAMPLES = 16
+DEFAULT_SAMPLE_ROWS = 100_000
+# Pages offer "sample first" above this many rows
+LARGE_DATASET_ROWS = 500_000
+MIN_PER_STRATUM = 20
+
+
+def stratum_quotas(counts: pd.Series, n: int, min_per_stratum: int = MIN_PER_STRATUM) -> pd.Series:
+    """Proportional allocation (largest remainder), at least min_per_stratum, never above the stratum size."""
+    c = counts.to_numpy(dtype=np.int64)
+    total = c.sum()
+    if n >= total:
+        return counts.copy()
+    exact = c * (n / total)
+    quotas = np.floor(exact).astype(np.int64)
+    remainder = int(n - quotas.sum())
+    quotas[np.argsort(quotas - exact, kind="stable")[:remainder]] += 1
+    return pd.Series(np.minimum(np.maximum(quotas, min_per_stratum), c), index=counts.index)
+
+
+class _BottomK:
+    """Running per-stratum bottom-k of (key, row) pairs."""
+
+    def __init__(self, quotas: np.ndarray):
+        self.quotas = quotas
+        self.keys = np.empty(0)
+        self.codes = np.empty(0, dtype=np.int64)
+        self.rows = None
+
+    def update(self, rows: pd.DataFrame, codes: np.ndarray, keys: np.ndarray):
+        if self.rows is not None:
+            rows = pd.concat([self.rows, rows], copy=False)
+            codes = np.concatenate([self.codes, codes])
+            keys = np.concatenate([self.keys, keys])
+        order = np.lexsort((keys, codes))
+        sorted_codes = codes[order]
+        # Rank of each row inside its stratum
+        starts = np.searchsorted(sorted_codes, sorted_codes, side="left")
+        rank = np.arange(len(order)) - starts
+        keep = np.sort(order[rank < self.quotas[sorted_codes]])
+        self.rows, self.codes, self.keys = rows.iloc[keep], codes[keep], keys[keep]
+
+    def result(self) -> pd.DataFrame:
+        return self.rows if self.rows is not None else pd.DataFrame()
+
+
+def _strata(values: pd.Series, index: pd.Index) -> np.ndarray:
+    return index.get_indexer(values)
+
+
+def sample_frame(df: pd.DataFrame, n: int, by: str = None, seed: int = 42,
+                 min_per_stratum: int = MIN_PER_STRATUM) -> pd.DataFrame:
+    """Uniform (by=None) or stratified sample of an in-memory frame, original index kept."""
+    if n >= len(df):
+        return df
+    keys = np.random.default_rng(seed).random(len(df))
+    if by is None:
+        return df.iloc[np.sort(np.argpartition(keys, n)[:n])]
+    counts = df[by].value_counts(dropna=False)
+    picker = _BottomK(stratum_quotas(counts, n, min_per_stratum).to_numpy())
+    picker.update(df, _strata(df[by], counts.index), keys)
+    return picker.result()
+
+
+def sample_parquet(file_path: str, n: int, seed: int = 42) -> pd.DataFrame:
+    """Uniform sample of a parquet file read row group by row group; index = file row number."""
+    picker = _BottomK(np.array([n]))
+    offset = 0
+    for g, chunk in enumerate(DataManager.iter_row_groups(file_path)):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        picker.update(chunk, np.zeros(len(chunk), dtype=np.int64), np.random.default_rng([seed, g]).random(len(chunk)))
+    return picker.result()
+
+
+def _sample_key(parent: str, n: int, by, columns, seed: int) -> str:
+    payload = json.dumps([parent, n, by, columns, seed], default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+
+def get_sample(df: pd.DataFrame, n: int = DEFAULT_SAMPLE_ROWS, by: str = None, columns: list = None,
+               seed: int = 42) -> pd.DataFrame:
+    """
+    Cached sample of a dataset version.
+    The sample carries its own version_id, so downstream caches key on it cleanly.
+    """
+    if n >= len(df):
+        return df
+    key = _sample_key(dataset_version(df), n, by, columns, seed)
+    path = os.path.join(SAMPLE_DIR, f"{key}.parquet")
+
+    def load():
+        if os.path.exists(path):
+            sample = pd.read_parquet(path)
+        else:
+            sample = sample_frame(df if columns is None else df[columns], n, by, seed)
+            os.makedirs(SAMPLE_DIR, exist_ok=True)
+            sample.to_parquet(path)
+            prune_disk_cache(SAMPLE_DIR, MAX_SAMPLES, keep=path)
+        stamp_version(sample, f"sample:{key}")
+        return sample
+
+    sample = cached_compute("samples", key, load)
+    if os.path.exists(path):
+        touch_entry(path)
+    else:
+        # Evicted from disk since this session cached it: write it back
+        sample = set_cached("samples", key, load())
+    return sample
+
+
+# ---------------------------
+# LEARNING-CURVE TIME ESTIMATE
+# ---------------------------
+def time_curve(run, sizes: list) -> list:
+    """[(n, seconds)] from calling run(n) at each size (smallest first)."""
+    points = []
+    for n in sorted(sizes):
+        t0 = time.perf_counter()
+        run(int(n))
+        points.append((int(n), time.perf_counter() - t0))
+    return points
+
+
+def extrapolate_time(points: list, n: int) -> float:
+    """
+    Fit seconds = a * n^b on the measured points (log-log least squares) and
+    evaluate at n. The exponent is kept in [0.5, 2.5]; one point assumes linear cost.
+    """
+    pts = [(m, t) for m, t in points if m > 0 and t > 0]
+    if not pts:
+        return float("nan")
+    if len(pts) == 1:
+        b = 1.0
+    else:
+        x, y = np.log([m for m, _ in pts]), np.log([t for _, t in pts])
+        b = float(np.clip(np.polyfit(x, y, 1)[0], 0.5, 2.5))
+    m, t = pts[-1]
+    return float(t * (n / m) ** b)
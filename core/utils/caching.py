@@ -0,0 +1,153 @@
+import hashlib
+import os
+import shutil
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ---------------------------------------------------------
+# DATASET-VERSION CACHE
+# Expensive artefacts (reports, matrices, fitted objects) are keyed
+# by the dataset version so they survive reruns without recomputing.
+# A version is minted whenever a frame is created or edited through
+# DataManager (every save stamps the new frame), so reading it on a
+# rerun costs only a cheap fingerprint: shape, dtypes and a fixed
+# sample of rows. Frames nobody stamped (e.g. derived ones) are
+# hashed in full once and stamped with that hash. Stamps belong to
+# the frame object itself, not to pandas attrs, which derived frames
+# inherit.
+# ---------------------------------------------------------
+CACHE_STATE_KEY = "_autods_cache"
+MAX_ENTRIES_PER_NAMESPACE = 8
+FINGERPRINT_ROWS = 1_000
+
+# id(frame) -> (weak reference to the frame, version)
+_VERSIONS = {}
+
+
+def stamp_version(df: pd.DataFrame, version_id: str) -> pd.DataFrame:
+    """Mint a new version for a frame that was just created or edited."""
+    key = id(df)
+    _VERSIONS[key] = (weakref.ref(df, lambda _: _VERSIONS.pop(key, None)), str(version_id))
+    df.attrs["version_id"] = str(version_id)
+    return df
+
+
+def _stamp(df: pd.DataFrame):
+    entry = _VERSIONS.get(id(df))
+    return entry[1] if entry is not None and entry[0]() is df else None
+
+
+def _hash_rows(df: pd.DataFrame) -> bytes:
+    try:
+        return pd.util.hash_pandas_object(df, index=False).values.tobytes()
+    except TypeError:
+        # Unhashable cells (lists/dicts): fall back to their repr
+        return pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes()
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """
+    Stable identifier for a dataframe's contents: its stamped version plus
+    shape, schema and a fixed sample of rows. An unstamped frame is hashed
+    in full on first use and stamped with the result.
+    """
+    version = _stamp(df)
+    if version is None:
+        h = hashlib.blake2b(digest_size=12)
+        h.update(_hash_rows(df) if len(df) else b"")
+        version = stamp_version(df, f"content:{h.hexdigest()}").attrs["version_id"]
+
+    h = hashlib.blake2b(digest_size=12)
+    h.update(version.encode())
+    h.update(str(df.shape).encode())
+    h.update("|".join(f"{c}:{t}" for c, t in df.dtypes.items()).encode())
+    if len(df):
+        rows = np.unique(np.linspace(0, len(df) - 1, min(FINGERPRINT_ROWS, len(df))).astype(np.int64))
+        h.update(_hash_rows(df.iloc[rows]))
+    return h.hexdigest()
+
+
+def _namespace(name: str) -> OrderedDict:
+    store = st.session_state.setdefault(CACHE_STATE_KEY, {})
+    return store.setdefault(name, OrderedDict())
+
+
+def get_cached(namespace: str, key):
+    """Return a cached value or None. Marks the entry as recently used."""
+    ns = _namespace(namespace)
+    if key in ns:
+        ns.move_to_end(key)
+        return ns[key]
+    return None
+
+
+def set_cached(namespace: str, key, value):
+    """Store a value, evicting the least recently used entries."""
+    ns = _namespace(namespace)
+    ns[key] = value
+    ns.move_to_end(key)
+    while len(ns) > MAX_ENTRIES_PER_NAMESPACE:
+        ns.popitem(last=False)
+    return value
+
+
+def cached_compute(namespace: str, key, builder):
+    """get-or-build helper: builder() is only called on a cache miss."""
+    value = get_cached(namespace, key)
+    if value is None:
+        value = set_cached(namespace, key, builder())
+    return value
+
+
+def clear_cache(namespace: str = None):
+    """Drop one namespace, or everything when namespace is None."""
+    store = st.session_state.get(CACHE_STATE_KEY, {})
+    if namespace is None:
+        store.clear()
+    else:
+        store.pop(namespace, None)
+
+
+# ---------------------------------------------------------
+# DISK CACHE EVICTION
+# Artefacts written under data/ (design matrices, samples, tuning
+# histories) are bounded per directory. Every use touches the entry's
+# mtime and, after a new entry is written, the least recently used
+# ones beyond the limit are deleted.
+# ---------------------------------------------------------
+def touch_entry(path: str):
+    """Mark an on-disk cache entry as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_disk_cache(directory: str, max_entries: int, keep: str = None):
+    """Delete all but the max_entries most recently used entries of directory (never keep)."""
+    if not os.path.isdir(directory):
+        return
+    entries = []
+    for name in os.listdir(directory):
+        if name.startswith(".") or name.endswith(".tmp"):  # being written
+            continue
+        path = os.path.join(directory, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -10,6 +10,7 @@ from sklearn.neighbors import KNeighborsRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import TruncatedSVD
 import warnings
+from core.sampling import sample_frame
 
 # Suppress experimental warnings
 warnings.filterwarnings("ignore")
@@ -61,13 +62,25 @@ IMPUTATION_CATALOG = {
     ]
 }
 
+# Categories that fit a model on the numeric columns (fit_rows applies)
+MODEL_BASED_CATEGORIES = ["5. Distance-based", "6. Regression / Predictive", "7. Tree / Ensemble",
+                          "8. Iterative / Multivariate", "11. Deep Learning"]
+
 # ---------------------------------------------------------
 # IMPLEMENTATION LOGIC
 # ---------------------------------------------------------
 
+def _fit_transform(imputer, numeric_data: pd.DataFrame, fit_rows: int = None):
+    """Fit on a uniform sample of fit_rows rows (all rows when None), then impute every row."""
+    if fit_rows and len(numeric_data) > fit_rows:
+        return imputer.fit(sample_frame(numeric_data, fit_rows)).transform(numeric_data)
+    return imputer.fit_transform(numeric_data)
+
+
 def apply_imputation(df: pd.DataFrame, target_cols: list, category: str, method: str, **params) -> pd.DataFrame:
     """
     Apply the selected imputation method to the target columns.
+    Model-based methods accept fit_rows: the imputer is fitted on a sample of that size.
     Returns a COPY of the dataframe.
     """
     df_new = df.copy()
@@ -140,7 +153,7 @@ def apply_imputation(df: pd.DataFrame, target_cols: list, category: str, method:
         numeric_data = df_new.select_dtypes(include=np.number)
         if not numeric_data.empty:
             imputer = KNNImputer(n_neighbors=k)
-            imputed_data = imputer.fit_transform(numeric_data)
+            imputed_data = _fit_transform(imputer, numeric_data, params.get("fit_rows"))
             df_new[numeric_data.columns] = imputed_data
 
     # ---------------------------
@@ -162,7 +175,7 @@ def apply_imputation(df: pd.DataFrame, target_cols: list, category: str, method:
         numeric_data = df_new.select_dtypes(include=np.number)
         if not numeric_data.empty and estimator:
             imputer = IterativeImputer(estimator=estimator, max_iter=10, random_state=0)
-            imputed_data = imputer.fit_transform(numeric_data)
+            imputed_data = _fit_transform(imputer, numeric_data, params.get("fit_rows"))
             df_new[numeric_data.columns] = imputed_data
 
     # ---------------------------
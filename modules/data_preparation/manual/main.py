@@ -141,20 +141,52 @@ def render_manual_cleaning():
         # ---------------------------------------------------------
         # 3. ADVANCED MISSING VALUE ENGINE (70+ Techniques)
         # ---------------------------------------------------------
-        from .imputation_strategies import IMPUTATION_CATALOG, apply_imputation
+        from .imputation_strategies import IMPUTATION_CATALOG, MODEL_BASED_CATEGORIES, apply_imputation
+        from core.sampling import DEFAULT_SAMPLE_ROWS, LARGE_DATASET_ROWS
+        from core.missingness import analyze_missingness, suggest_imputation
+        from core.utils.caching import dataset_version, cached_compute
         
         with st.expander("🧩 Advanced Missing Value Imputation", expanded=False):
-            missing = df.isnull().sum()[lambda x: x > 0]
+            miss_report = cached_compute("missingness", dataset_version(df), lambda: analyze_missingness(df))
+            missing = miss_report["null_counts"][lambda x: x > 0]
             if missing.empty:
                 st.success("No missing values detected! 🎉")
             else:
                 st.write("### Missingness Report")
                 st.dataframe(missing.to_frame("Count").T)
                 
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Complete Rows", f"{miss_report['complete_rows']:,}")
+                m2.metric("Rows with Gaps", f"{miss_report['n_rows'] - miss_report['complete_rows']:,}")
+                m3.metric("Distinct Patterns", miss_report["n_patterns"])
+                
+                with st.popover("🔎 Missingness Patterns"):
+                    st.dataframe(miss_report["patterns"])
+                
+                # Smart suggestions pre-fill the selectors below
+                suggestions = suggest_imputation(df, miss_report)
+                if suggestions:
+                    st.write("#### 💡 Suggested Strategies")
+                    
+                    def _use_suggestion(sug):
+                        st.session_state["adv_miss_cols"] = sug["columns"]
+                        st.session_state["adv_miss_cat"] = sug["category"]
+                        st.session_state["adv_miss_meth"] = sug["method"]
+                    
+                    for i, sug in enumerate(suggestions):
+                        c_txt, c_btn = st.columns([5, 1])
+                        c_txt.write(f"**{sug['method']}** on `{', '.join(map(str, sug['columns']))}` — {sug['reason']}")
+                        c_btn.button("Use", key=f"adv_miss_sug_{i}", on_click=_use_suggestion, args=(sug,))
+                
                 c_sel, c_cat = st.columns(2)
                 
                 # 1. Select Columns
-                cols_miss = c_sel.multiselect("Select Target Columns", missing.index, default=missing.index, key="adv_miss_cols")
+                # Drop stale selections (e.g. columns removed by a previous step)
+                if "adv_miss_cols" in st.session_state:
+                    st.session_state["adv_miss_cols"] = [c for c in st.session_state["adv_miss_cols"] if c in missing.index]
+                    cols_miss = c_sel.multiselect("Select Target Columns", missing.index, key="adv_miss_cols")
+                else:
+                    cols_miss = c_sel.multiselect("Select Target Columns", missing.index, default=missing.index, key="adv_miss_cols")
                 
                 # 2. Select Category
                 cat_options = list(IMPUTATION_CATALOG.keys())
@@ -174,6 +206,11 @@ def render_manual_cleaning():
                     params["ratio"] = p_conf.slider("Missing Ratio Threshold", 0.1, 1.0, 0.5)
                 elif "Rolling" in method:
                     params["window"] = p_conf.slider("Window Size", 1, 20, 3)
+                if category in MODEL_BASED_CATEGORIES and len(df) > LARGE_DATASET_ROWS:
+                    # Fit the imputer on a sample, then impute every row
+                    params["fit_rows"] = int(p_conf.number_input("Fit imputer on rows", min_value=1_000,
+                                                                 max_value=len(df), value=min(DEFAULT_SAMPLE_ROWS, len(df)),
+                                                                 step=10_000))
                     
                 st.info(f"ℹ️ Selected: **{method}**")
                 
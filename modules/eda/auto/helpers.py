@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# ---------------------------------------------------------
+# AUTO-EDA REPORT ENGINE
+# All numeric statistics are produced from row chunks of one float
+# matrix: a moments pass (counts, sums, min/max) and a binning pass
+# that fills every column's histogram with a single np.bincount.
+# Correlations come from core.correlation (cached separately).
+# ---------------------------------------------------------
+CHUNK_ROWS = 250_000
+DISPLAY_BINS = 32
+SKETCH_BINS = DISPLAY_BINS * 64  # fine histogram used as the quantile sketch
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+EXACT_QUANTILE_COL_BLOCK = 32
+
+
+def _chunks(n_rows: int, chunk_rows: int):
+    for start in range(0, n_rows, chunk_rows):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def _block(df: pd.DataFrame, cols: list, start: int, stop: int) -> np.ndarray:
+    return df[cols].iloc[start:stop].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _moments_pass(df, cols, chunk_rows):
+    """Counts, means, centred sums of squares (M2) and min/max for every column."""
+    p = len(cols)
+    count = np.zeros(p)
+    mean = np.zeros(p)
+    m2 = np.zeros(p)
+    vmin = np.full(p, np.inf)
+    vmax = np.full(p, -np.inf)
+
+    for start, stop in _chunks(len(df), chunk_rows):
+        x = _block(df, cols, start, stop)
+        present = np.isfinite(x)
+        n_b = present.sum(axis=0)
+        has = n_b > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(has, np.where(present, x, 0.0).sum(axis=0) / n_b, 0.0)
+        m2_b = (np.where(present, x - mean_b, 0.0) ** 2).sum(axis=0)
+
+        # Chan et al. merge of (count, mean, M2): no sum-of-squares cancellation
+        # for columns with a large offset (epoch seconds, ids)
+        n = count + n_b
+        delta = mean_b - mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(has, mean + delta * n_b / n, mean)
+            m2 = np.where(has, m2 + m2_b + delta ** 2 * count * n_b / n, m2)
+        count = n
+        vmin = np.minimum(vmin, np.where(present, x, np.inf).min(axis=0, initial=np.inf))
+        vmax = np.maximum(vmax, np.where(present, x, -np.inf).max(axis=0, initial=-np.inf))
+
+    return {"count": count, "mean": mean, "m2": m2, "min": vmin, "max": vmax}
+
+
+def _binning_pass(df, cols, vmin, vmax, chunk_rows):
+    """Fill a SKETCH_BINS histogram for every column at once."""
+    p = len(cols)
+    lo = np.where(np.isfinite(vmin), vmin, 0.0)
+    span = np.where(np.isfinite(vmax) & (vmax > lo), vmax - lo, 1.0)
+    offsets = np.arange(p) * SKETCH_BINS
+    counts = np.zeros(p * SKETCH_BINS, dtype=np.int64)
+
+    for start, stop in _chunks(len(df), chunk_rows):
+        x = _block(df, cols, start, stop)
+        present = np.isfinite(x)
+        idx = np.floor((x - lo) / span * SKETCH_BINS)
+        idx = np.clip(np.nan_to_num(idx, nan=0.0), 0, SKETCH_BINS - 1).astype(np.int64)
+        flat = (idx + offsets)[present]
+        counts += np.bincount(flat, minlength=p * SKETCH_BINS)
+
+    return counts.reshape(p, SKETCH_BINS), lo, span
+
+
+def _sketch_quantiles(hist, lo, span, qs) -> np.ndarray:
+    """Quantiles by linear interpolation inside the fine histogram's CDF."""
+    p, nb = hist.shape
+    cdf = np.cumsum(hist, axis=1)
+    total = cdf[:, -1:]
+    out = np.full((p, len(qs)), np.nan)
+    width = span / nb
+    for j, q in enumerate(qs):
+        target = q * total[:, 0]
+        b = np.minimum((cdf < target[:, None]).sum(axis=1), nb - 1)
+        prev = np.where(b > 0, cdf[np.arange(p), b - 1], 0)
+        inside = hist[np.arange(p), b]
+        frac = np.where(inside > 0, (target - prev) / np.maximum(inside, 1), 0.5)
+        out[:, j] = lo + (b + frac) * width
+    out[total[:, 0] == 0] = np.nan
+    return out
+
+
+def _exact_quantiles(df, cols, qs) -> np.ndarray:
+    """np.nanpercentile over column blocks to bound the temporary copy."""
+    out = np.empty((len(cols), len(qs)))
+    for i in range(0, len(cols), EXACT_QUANTILE_COL_BLOCK):
+        block_cols = cols[i:i + EXACT_QUANTILE_COL_BLOCK]
+        x = df[block_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(all="ignore"):
+            out[i:i + len(block_cols)] = np.nanpercentile(x, np.array(qs) * 100, axis=0).T
+    return out
+
+
+def build_eda_report(df: pd.DataFrame, approximate: bool = False, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Compute the full Auto-EDA report in chunked, vectorized passes.
+    approximate=True reads quantiles from the histogram sketch and
+    counts duplicates from row hashes instead of exact comparisons.
+    """
+    num_cols = df.select_dtypes(include=["number"]).columns.tolist()
+    n_rows = len(df)
+
+    if approximate:
+        duplicates = int(pd.util.hash_pandas_object(df, index=False).duplicated().sum())
+    else:
+        duplicates = int(df.duplicated().sum())
+
+    missing = df.isnull().sum()
+    report = {
+        "overview": {"rows": n_rows, "columns": df.shape[1], "duplicates": duplicates},
+        "dtypes": df.dtypes.astype(str).value_counts(),
+        "missing": missing[missing > 0].sort_values(ascending=False),
+        "approximate": approximate,
+        "numeric_columns": num_cols,
+        "stats": pd.DataFrame(),
+        "histograms": {},
+        "figures": {},
+    }
+    if not num_cols or n_rows == 0:
+        return report
+
+    mom = _moments_pass(df, num_cols, chunk_rows)
+    hist, lo, span = _binning_pass(df, num_cols, mom["min"], mom["max"], chunk_rows)
+
+    if approximate:
+        quant = _sketch_quantiles(hist, lo, span, QUANTILES)
+    else:
+        quant = _exact_quantiles(df, num_cols, QUANTILES)
+
+    count = mom["count"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, mom["mean"], np.nan)
+        var = np.where(count > 1, mom["m2"] / (count - 1), np.nan)
+
+    stats = pd.DataFrame({
+        "count": count.astype(np.int64),
+        "mean": mean,
+        "std": np.sqrt(np.clip(var, 0, None)),
+        "min": np.where(np.isfinite(mom["min"]), mom["min"], np.nan),
+        "max": np.where(np.isfinite(mom["max"]), mom["max"], np.nan),
+    }, index=num_cols)
+    for j, q in enumerate(QUANTILES):
+        stats[f"p{int(q * 100)}"] = quant[:, j]
+    report["stats"] = stats
+
+    # Display histograms are the sketch folded down to DISPLAY_BINS
+    display = hist.reshape(len(num_cols), DISPLAY_BINS, -1).sum(axis=2)
+    for i, col in enumerate(num_cols):
+        edges = lo[i] + span[i] * np.linspace(0, 1, DISPLAY_BINS + 1)
+        report["histograms"][col] = (display[i], edges)
+
+    return report
+
+
+def distribution_figure(report: dict, col: str) -> go.Figure:
+    """Histogram + box (from precomputed quantiles). Memoized on the report."""
+    if col in report["figures"]:
+        return report["figures"][col]
+
+    counts, edges = report["histograms"][col]
+    row = report["stats"].loc[col]
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    fig.add_trace(go.Box(
+        name=col, q1=[row["p25"]], median=[row["p50"]], q3=[row["p75"]],
+        lowerfence=[row["min"]], upperfence=[row["max"]], mean=[row["mean"]],
+        orientation="h", boxpoints=False, showlegend=False,
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(x=centers, y=counts, width=np.diff(edges), showlegend=False), row=2, col=1)
+    fig.update_layout(title=f"Distribution of {col}", bargap=0, height=380)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+
+    report["figures"][col] = fig
+    return fig
@@ -1,49 +1,128 @@
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from core.utils.caching import dataset_version, cached_compute
+from core.sampling import extrapolate_time
+from core.correlation import METHODS, compute_correlations, association_matrix
+from core.missingness import analyze_missingness
+from modules.utils import render_sample_controls
+from .helpers import build_eda_report, distribution_figure
+
+DISTRIBUTIONS_PER_PAGE = 12
+# Above this many numeric columns only the strongest pairs are computed
+FULL_MATRIX_MAX_COLS = 200
+TOP_K_PAIRS = 100
+
+def _timed_report(df, approximate, full_rows):
+    """Build the report; on a sample, record the linear full-data estimate for the sample controls."""
+    t0 = time.perf_counter()
+    report = build_eda_report(df, approximate=approximate)
+    if len(df) < full_rows:
+        st.session_state["auto_eda_full_estimate"] = extrapolate_time([(len(df), time.perf_counter() - t0)], full_rows)
+    return report
 
 def render_auto_eda():
     st.header("🤖 Auto-EDA Report")
-    
+
     if "active_dataset" not in st.session_state:
         st.warning("Please import a dataset first.")
         return
 
     df = st.session_state["cloud_datasets"][st.session_state["active_dataset"]]
-    num_cols = df.select_dtypes(include=['number']).columns.tolist()
-    
+    # Large data: profile a cached sample first
+    full_rows = len(df)
+    df = render_sample_controls(df, "auto_eda")
+
+    approximate = st.checkbox("⚡ Approximate mode (sketch quantiles, faster on large data)",
+                              value=len(df) > 1_000_000, key="auto_eda_approx")
+    report_key = (dataset_version(df), approximate)
+
     if st.button("Generate Smart Report"):
-        st.write("### 1. Dataset Overview")
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Rows", df.shape[0])
-        col2.metric("Columns", df.shape[1])
-        col3.metric("Duplicates", df.duplicated().sum())
-        
-        st.write("### 2. Column Types")
-        st.write(df.dtypes.value_counts())
-        
-        st.write("### 3. Missing Values Pattern")
-        missing_df = df.isnull().sum().reset_index()
+        st.session_state["auto_eda_report_key"] = report_key
+
+    # Report persists across reruns for the same dataset version
+    if st.session_state.get("auto_eda_report_key") != report_key:
+        return
+
+    with st.spinner("Profiling dataset..."):
+        report = cached_compute("auto_eda_report", report_key, lambda: _timed_report(df, approximate, full_rows))
+
+    st.write("### 1. Dataset Overview")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows", report["overview"]["rows"])
+    col2.metric("Columns", report["overview"]["columns"])
+    col3.metric("Duplicates", report["overview"]["duplicates"])
+
+    st.write("### 2. Column Types")
+    st.write(report["dtypes"])
+
+    st.write("### 3. Missing Values Pattern")
+    missing = report["missing"]
+    if not missing.empty:
+        missing_df = missing.reset_index()
         missing_df.columns = ["Column", "Missing Count"]
-        missing_df = missing_df[missing_df["Missing Count"] > 0]
-        if not missing_df.empty:
-            fig_miss = px.bar(missing_df, x="Column", y="Missing Count", title="Missing Values per Column")
-            st.plotly_chart(fig_miss)
+        fig_miss = px.bar(missing_df, x="Column", y="Missing Count", title="Missing Values per Column")
+        st.plotly_chart(fig_miss)
+
+        miss = cached_compute("missingness", report_key[0], lambda: analyze_missingness(df))
+        st.caption(f"{miss['n_patterns']} distinct missingness patterns; "
+                   f"{miss['complete_rows']:,} of {miss['n_rows']:,} rows are complete.")
+        st.dataframe(miss["patterns"])
+
+        c_mat, c_corr = st.columns(2)
+        fig_mat = px.imshow(miss["matrix"], aspect="auto", color_continuous_scale="Greys", zmin=0, zmax=1,
+                            labels=dict(y=f"Row block (×{miss['matrix_row_bin']:,} rows)", color="Null share"),
+                            title="Missingness Matrix")
+        c_mat.plotly_chart(fig_mat, use_container_width=True)
+        if miss["nullity_corr"].shape[0] > 1:
+            fig_ncorr = px.imshow(miss["nullity_corr"], color_continuous_scale='RdBu_r', zmin=-1, zmax=1,
+                                  title="Nullity Correlation")
+            c_corr.plotly_chart(fig_ncorr, use_container_width=True)
+    else:
+        st.success("No missing values detected.")
+
+    num_cols = report["numeric_columns"]
+    st.write("### 4. Distributions (Numeric)")
+    if num_cols:
+        with st.expander("Summary Statistics", expanded=False):
+            st.dataframe(report["stats"])
+
+        n_pages = (len(num_cols) - 1) // DISTRIBUTIONS_PER_PAGE + 1
+        page = 1
+        if n_pages > 1:
+            page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="auto_eda_page")
+
+        page_cols = num_cols[(page - 1) * DISTRIBUTIONS_PER_PAGE: page * DISTRIBUTIONS_PER_PAGE]
+        for col in page_cols:
+            st.plotly_chart(distribution_figure(report, col), use_container_width=True)
+    else:
+        st.info("No numeric columns to profile.")
+
+    st.write("### 5. Correlation Matrix")
+    if len(num_cols) > 1:
+        method = st.selectbox("Method", METHODS, key="auto_eda_corr_method", format_func=str.title)
+        if len(num_cols) > FULL_MATRIX_MAX_COLS:
+            st.caption(f"{len(num_cols)} numeric columns: showing the {TOP_K_PAIRS} strongest pairs.")
+            result = compute_correlations(df, method=method, top_k=TOP_K_PAIRS, cols=num_cols)
+            st.dataframe(result["pairs"])
         else:
-            st.success("No missing values detected.")
-            
-        st.write("### 4. Distributions (Numeric)")
-        for col in num_cols:
-            try:
-                fig = px.histogram(df, x=col, title=f"Distribution of {col}", marginal="box")
-                st.plotly_chart(fig, use_container_width=True)
-            except: pass
-            
-        st.write("### 5. Correlation Matrix")
-        try:
-            numeric_df = df.select_dtypes(include=['number'])
-            if not numeric_df.empty:
-                corr = numeric_df.corr()
-                fig_corr = px.imshow(corr, title="Correlation Matrix", color_continuous_scale='RdBu_r')
-                st.plotly_chart(fig_corr, use_container_width=True)
-        except: pass
+            result = compute_correlations(df, method=method, cols=num_cols)
+            fig_corr = px.imshow(result["matrix"], title=f"Correlation Matrix ({method.title()})",
+                                 color_continuous_scale='RdBu_r', zmin=-1, zmax=1)
+            st.plotly_chart(fig_corr, use_container_width=True)
+            with st.expander("Strongest Pairs", expanded=False):
+                st.dataframe(result["pairs"].head(TOP_K_PAIRS))
+
+    cat_cols = df.select_dtypes(exclude=['number']).columns.tolist()
+    if cat_cols:
+        with st.expander("🔗 Categorical Associations (Cramér's V / Correlation Ratio)", expanded=False):
+            if not st.checkbox("Compute associations", key="auto_eda_assoc_on"):
+                return
+            assoc = cached_compute("auto_eda_assoc", report_key[0], lambda: association_matrix(df))
+            if assoc.shape[0] > 1:
+                fig_assoc = px.imshow(assoc, title="Association Matrix (0 = none, 1 = perfect)",
+                                      color_continuous_scale='Blues', zmin=0, zmax=1)
+                st.plotly_chart(fig_assoc, use_container_width=True)
+            else:
+                st.info("Not enough low-cardinality columns for associations.")
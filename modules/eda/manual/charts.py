@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# ---------------------------------------------------------
+# LARGE-DATA RENDERING
+# Above the point budget we never hand the raw frame to plotly.
+# Everything is reduced server-side (binning, LTTB, quantiles)
+# so the figure payload stays bounded regardless of row count.
+# ---------------------------------------------------------
+DEFAULT_POINT_BUDGET = 50_000
+MAX_GROUPS = 20
+
+
+def needs_aggregation(df: pd.DataFrame, budget: int) -> bool:
+    """True when the frame is too large to ship point-by-point."""
+    return budget is not None and len(df) > budget
+
+
+def _sample(df: pd.DataFrame, budget: int) -> pd.DataFrame:
+    """Uniform random sample capped at the budget (deterministic)."""
+    if len(df) <= budget:
+        return df
+    return df.sample(n=budget, random_state=42)
+
+
+def _as_float(series: pd.Series) -> np.ndarray:
+    """Numeric view of a column (datetimes become int64 ns)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        out = series.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+        out[series.isna().to_numpy()] = np.nan
+        return out
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _groups(df: pd.DataFrame, color):
+    """
+    Yields (label, positional index array) for each colour group.
+    Low-frequency groups beyond MAX_GROUPS are folded into 'Other'.
+    """
+    if not color:
+        yield None, np.arange(len(df))
+        return
+
+    codes, uniques = pd.factorize(df[color], sort=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    order = np.argsort(counts)[::-1]
+    keep = order[:MAX_GROUPS]
+
+    for code in keep:
+        yield str(uniques[code]), np.flatnonzero(codes == code)
+
+    rest = np.isin(codes, keep, invert=True)
+    if rest.any():
+        yield "Other", np.flatnonzero(rest)
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the visual shape of a line with n_out points. x must be sorted.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    # Bucket boundaries for the inner points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or last point)
+        nxt_start, nxt_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        if nxt_end <= nxt_start:
+            nxt_end = nxt_start + 1
+        avg_x = x[nxt_start:nxt_end].mean()
+        avg_y = y[nxt_start:nxt_end].mean()
+
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area)) if len(area) else start
+        idx[i + 1] = a
+
+    return x[idx], y[idx]
+
+
+def bin_2d(x: np.ndarray, y: np.ndarray, bins: int = 200, weights: np.ndarray = None):
+    """
+    2-D histogram over finite pairs. Returns (z, x_centers, y_centers)
+    with z shaped (y, x) as plotly heatmaps expect.
+    """
+    ok = np.isfinite(x) & np.isfinite(y)
+    if weights is not None:
+        ok &= np.isfinite(weights)
+        weights = weights[ok]
+    z, xe, ye = np.histogram2d(x[ok], y[ok], bins=bins, weights=weights)
+    xc = (xe[:-1] + xe[1:]) / 2
+    yc = (ye[:-1] + ye[1:]) / 2
+    return z.T, xc, yc
+
+
+def box_quantiles(values: np.ndarray) -> dict:
+    """Five-number summary with Tukey fences, computed in NumPy."""
+    v = values[np.isfinite(values)]
+    if v.size == 0:
+        return None
+    q1, med, q3 = np.percentile(v, [25, 50, 75])
+    iqr = q3 - q1
+    lo_lim, hi_lim = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = v[(v >= lo_lim) & (v <= hi_lim)]
+    return {
+        "q1": q1, "median": med, "q3": q3,
+        "lowerfence": inside.min() if inside.size else q1,
+        "upperfence": inside.max() if inside.size else q3,
+        "mean": v.mean(),
+    }
+
+
+# ---------------------------------------------------------
+# AGGREGATED RENDERERS (one per PLOT_CONFIG entry)
+# Signature: (df, budget, **plot_args) -> go.Figure
+# ---------------------------------------------------------
+def aggregate_scatter(df, budget, x, y, color=None, size=None, hover_name=None, **_):
+    if color:
+        # Colour needs individual marks: fall back to a sample instead of binning
+        sample = _sample(df, budget)
+        fig = px.scatter(sample, x=x, y=y, color=color, size=size, hover_name=hover_name)
+        fig.update_layout(title=f"{y} vs {x} (sample of {len(sample):,} / {len(df):,} rows)")
+        return fig
+
+    bins = int(min(400, max(50, np.sqrt(budget))))
+    z, xc, yc = bin_2d(_as_float(df[x]), _as_float(df[y]), bins=bins)
+    # Log scale keeps sparse regions visible next to dense cores
+    z = np.where(z > 0, np.log1p(z), np.nan)
+    fig = go.Figure(go.Heatmap(x=xc, y=yc, z=z, colorscale="Viridis", colorbar=dict(title="log(1+n)")))
+    fig.update_layout(title=f"{y} vs {x} (binned density, {len(df):,} rows)", xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def aggregate_scatter_3d(df, budget, x, y, z, color=None, size=None, **_):
+    sample = _sample(df, budget)
+    fig = px.scatter_3d(sample, x=x, y=y, z=z, color=color, size=size)
+    fig.update_layout(title=f"3D Scatter (sample of {len(sample):,} / {len(df):,} rows)")
+    return fig
+
+
+def aggregate_line(df, budget, x, y, color=None, **_):
+    fig = go.Figure()
+    groups = list(_groups(df, color))
+    per_line = max(3, budget // max(1, len(groups)))
+
+    x_is_numeric = pd.api.types.is_numeric_dtype(df[x]) or pd.api.types.is_datetime64_any_dtype(df[x])
+    for label, pos in groups:
+        sub = df.iloc[pos]
+        if x_is_numeric:
+            sub = sub.sort_values(x)
+            xs = _as_float(sub[x])
+        else:
+            # Categorical sequence: use row order as the axis
+            xs = np.arange(len(sub), dtype=np.float64)
+        ys = _as_float(sub[y])
+        ok = np.isfinite(xs) & np.isfinite(ys)
+        xs_d, ys_d = lttb_downsample(xs[ok], ys[ok], per_line)
+
+        if pd.api.types.is_datetime64_any_dtype(df[x]):
+            xs_d = pd.to_datetime(xs_d.astype(np.int64))
+        elif not x_is_numeric:
+            xs_d = sub[x].to_numpy()[xs_d.astype(np.int64)]
+        fig.add_trace(go.Scattergl(x=xs_d, y=ys_d, mode="lines", name=label or y))
+
+    fig.update_layout(title=f"{y} over {x} (LTTB, {len(df):,} rows)", xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def aggregate_bar(df, budget, x, y, color=None, barmode="group", **_):
+    # px.bar stacks one mark per row; summing per category renders the same bars
+    keys = [x] + ([color] if color and color != x else [])
+    agg = df.groupby(keys, observed=True, sort=False)[y].sum().reset_index()
+    if len(agg) > budget:
+        agg = agg.nlargest(budget, y)
+    return px.bar(agg, x=x, y=y, color=color, barmode=barmode,
+                  title=f"Sum of {y} by {x} ({len(df):,} rows aggregated)")
+
+
+def aggregate_histogram(df, budget, x, color=None, nbins=30, **_):
+    values = _as_float(df[x])
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return go.Figure()
+    edges = np.histogram_bin_edges(finite, bins=nbins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+
+    fig = go.Figure()
+    for label, pos in _groups(df, color):
+        counts, _ = np.histogram(values[pos], bins=edges)
+        fig.add_trace(go.Bar(x=centers, y=counts, width=widths, name=label or x))
+
+    fig.update_layout(barmode="overlay" if color else "relative", bargap=0,
+                      title=f"Distribution of {x} ({len(df):,} rows, pre-binned)",
+                      xaxis_title=x, yaxis_title="count")
+    if color:
+        fig.update_traces(opacity=0.6)
+    return fig
+
+
+def aggregate_box(df, budget, y, x=None, color=None, **_):
+    split = color or x
+    values = _as_float(df[y])
+
+    fig = go.Figure()
+    for label, pos in _groups(df, split):
+        stats = box_quantiles(values[pos])
+        if stats is None:
+            continue
+        fig.add_trace(go.Box(
+            name=label or y,
+            q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+            mean=[stats["mean"]], boxpoints=False,
+        ))
+    fig.update_layout(title=f"Box Plot of {y} ({len(df):,} rows, quantiles)", yaxis_title=y)
+    return fig
+
+
+def aggregate_sampled(func):
+    """Fallback for plots whose marks are inherently per-row (parallel coords, pair plot)."""
+    def _render(df, budget, **plot_args):
+        sample = _sample(df, budget)
+        fig = func(sample, **plot_args)
+        fig.update_layout(title=f"Sample of {len(sample):,} / {len(df):,} rows")
+        return fig
+    return _render
+
+
+def aggregate_density_heatmap(df, budget, x, y, z=None, **_):
+    weights = _as_float(df[z]) if z else None
+    zz, xc, yc = bin_2d(_as_float(df[x]), _as_float(df[y]), bins=100, weights=weights)
+    fig = go.Figure(go.Heatmap(x=xc, y=yc, z=np.where(zz > 0, zz, np.nan), colorscale="Viridis",
+                               colorbar=dict(title=f"sum of {z}" if z else "count")))
+    fig.update_layout(title=f"Density of {y} vs {x} ({len(df):,} rows, pre-binned)", xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+def render_plot(config: dict, df: pd.DataFrame, plot_args: dict, budget: int = DEFAULT_POINT_BUDGET):
+    """
+    Build a figure for a PLOT_CONFIG entry.
+    Small frames go straight to plotly express; large ones use the
+    entry's 'aggregate' renderer so the payload is independent of row count.
+    Returns (fig, aggregated_flag).
+    """
+    aggregate = config.get("aggregate")
+    if aggregate is not None and needs_aggregation(df, budget):
+        return aggregate(df, budget, **plot_args), True
+    return config["func"](df, **plot_args), False
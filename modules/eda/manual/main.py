@@ -1,15 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from .charts import (
+    DEFAULT_POINT_BUDGET, render_plot,
+    aggregate_scatter, aggregate_scatter_3d, aggregate_line, aggregate_bar,
+    aggregate_histogram, aggregate_box, aggregate_sampled, aggregate_density_heatmap
+)
 
 # ---------------------------------------------------------
 # PLOT CONFIGURATION
 # Defines the rules for each plot type: what data it needs.
+# "aggregate" is the server-side renderer used above the point budget.
 # ---------------------------------------------------------
 PLOT_CONFIG = {
     "Scatter (2D)": {
         "description": "Analyze relationship between two numerical variables.",
         "func": px.scatter,
+        "aggregate": aggregate_scatter,
         "params": [
             {"arg": "x", "label": "X Axis", "type": "numeric", "req": True},
             {"arg": "y", "label": "Y Axis", "type": "numeric", "req": True},
@@ -21,6 +28,7 @@ PLOT_CONFIG = {
     "Scatter (3D)": {
         "description": "Analyze relationship between three numerical variables in 3D space.",
         "func": px.scatter_3d,
+        "aggregate": aggregate_scatter_3d,
         "params": [
             {"arg": "x", "label": "X Axis", "type": "numeric", "req": True},
             {"arg": "y", "label": "Y Axis", "type": "numeric", "req": True},
@@ -32,6 +40,7 @@ PLOT_CONFIG = {
     "Line Chart": {
         "description": "View trends over a sequence (usually time or index).",
         "func": px.line,
+        "aggregate": aggregate_line,
         "params": [
             {"arg": "x", "label": "X Axis (Time/seq)", "type": "all", "req": True},
             {"arg": "y", "label": "Y Axis (Value)", "type": "numeric", "req": True},
@@ -41,6 +50,7 @@ PLOT_CONFIG = {
     "Bar Chart": {
         "description": "Compare categories using numeric values.",
         "func": px.bar,
+        "aggregate": aggregate_bar,
         "params": [
             {"arg": "x", "label": "Category (X)", "type": "all", "req": True},
             {"arg": "y", "label": "Value (Y)", "type": "numeric", "req": True},
@@ -51,6 +61,7 @@ PLOT_CONFIG = {
     "Histogram (Distribution)": {
         "description": "View the frequency distribution of a variable.",
         "func": px.histogram,
+        "aggregate": aggregate_histogram,
         "params": [
             {"arg": "x", "label": "Variable", "type": "numeric", "req": True},
             {"arg": "color", "label": "Split by", "type": "all", "req": False},
@@ -60,6 +71,7 @@ PLOT_CONFIG = {
     "Box Plot": {
         "description": "Analyze statistical distribution and outliers.",
         "func": px.box,
+        "aggregate": aggregate_box,
         "params": [
             {"arg": "x", "label": "Category (X)", "type": "all", "req": False},
             {"arg": "y", "label": "Value (Y)", "type": "numeric", "req": True},
@@ -69,6 +81,7 @@ PLOT_CONFIG = {
     "Parallel Coordinates": {
         "description": "Compare many numeric variables side-by-side (High Dimensional).",
         "func": px.parallel_coordinates,
+        "aggregate": aggregate_sampled(px.parallel_coordinates),
         "params": [
             {"arg": "dimensions", "label": "Select Variables (Multi)", "type": "multiselect_numeric", "req": True},
             {"arg": "color", "label": "Color Scale Variable", "type": "numeric", "req": True}
@@ -77,6 +90,7 @@ PLOT_CONFIG = {
     "Scatter Matrix (Pair Plot)": {
         "description": "View all pairwise relationships in a grid.",
         "func": px.scatter_matrix,
+        "aggregate": aggregate_sampled(px.scatter_matrix),
         "params": [
             {"arg": "dimensions", "label": "Select Variables (Multi)", "type": "multiselect_numeric", "req": True},
             {"arg": "color", "label": "Color (Group)", "type": "all", "req": False}
@@ -85,6 +99,7 @@ PLOT_CONFIG = {
      "Density Heatmap": {
         "description": "2D Distribution density (useful for large data).",
         "func": px.density_heatmap,
+        "aggregate": aggregate_density_heatmap,
         "params": [
             {"arg": "x", "label": "X Axis", "type": "numeric", "req": True},
             {"arg": "y", "label": "Y Axis", "type": "numeric", "req": True},
@@ -176,6 +191,13 @@ def render_manual_eda():
         
         col_idx += 1
 
+    # Rendering budget: above this many rows charts are aggregated server-side
+    point_budget = DEFAULT_POINT_BUDGET
+    if len(df) > DEFAULT_POINT_BUDGET:
+        point_budget = st.number_input("Max points to render", min_value=1_000, max_value=1_000_000,
+                                       value=DEFAULT_POINT_BUDGET, step=10_000, key="eda_point_budget")
+        st.caption(f"{len(df):,} rows exceed the budget: charts will be binned / downsampled before rendering.")
+
     st.divider()
 
     # 3. Plot & AI
@@ -185,16 +207,17 @@ def render_manual_eda():
         else:
             try:
                 # Generate Plot
-                func = config["func"]
                 clean_args = {k: v for k, v in plot_args.items() if v is not None}
                 
-                fig = func(df, **clean_args)
+                fig, aggregated = render_plot(config, df, clean_args, budget=point_budget)
                 
                 # Store in Session State
                 st.session_state["eda_fig"] = fig
                 
                 # Store Context for AI
                 details = [f"{k}: {v}" for k, v in clean_args.items()]
+                if aggregated:
+                    details.append(f"Rendered from an aggregated view of {len(df)} rows")
                 st.session_state["eda_context"] = f"Plot Type: {selected_plot_name}\nConfiguration:\n" + "\n".join(details)
                 
             except Exception as e:
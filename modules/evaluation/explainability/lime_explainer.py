@@ -0,0 +1,199 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from joblib import Parallel, delayed
+
+from core.utils.caching import cached_compute, dataset_version
+from modules.evaluation.explainability.shap_explainer import _Codec, _predict_fn, _sample_positions, model_token
+
+# ---------------------------------------------------------
+# LIME EXPLANATIONS
+# The lime package (pinned in requirements.txt) explains one instance
+# per call, with a separate predict call on that instance's
+# perturbations, so explaining thousands of rows means thousands of
+# predicts. The same tabular LIME is implemented here for batches:
+# quartile discretisation, each feature of a perturbed row drawn from
+# the feature's empirical distribution, the interpretable
+# representation "same bin as the instance", an exponential kernel
+# and a ridge surrogate. The per-column pools and bin edges are built
+# once per dataset version and cached. Perturbations for a whole batch
+# of instances are drawn as one array, scored in ONE predict call, and
+# the locally weighted ridge fits of the batch are solved together.
+# Batches run on a process pool; results are cached per
+# (fitted model, dataset version).
+# ---------------------------------------------------------
+LIME_SAMPLE_ROWS = 1_000
+NUM_SAMPLES = 1_000
+STATS_ROWS = 10_000
+# Columns with at most this many distinct values are binned by value
+CATEGORICAL_LEVELS = 10
+# Perturbed cells (instances x samples x features) per predict call
+PERTURB_BATCH_CELLS = 4_000_000
+RIDGE_ALPHA = 1.0
+TOP_FEATURES = 15
+
+
+class PerturbationStats:
+    """Per-column value pools (sorted sample of observed values) and bin edges."""
+
+    def __init__(self, X: pd.DataFrame, seed: int = 42):
+        self.codec = _Codec(X)
+        values = self.encode(X.iloc[_sample_positions(len(X), STATS_ROWS, seed)])
+        self.pools, self.edges, self.labels = [], [], []
+        for j, name in enumerate(self.codec.columns):
+            pool = np.sort(values[:, j])  # NaN sorts last
+            observed = np.unique(pool[~np.isnan(pool)])
+            if name in self.codec.categories or len(observed) <= CATEGORICAL_LEVELS:
+                edges = (observed[:-1] + observed[1:]) / 2  # one bin per value
+                levels = self.codec.categories[name][observed.astype(np.int64)] if name in self.codec.categories \
+                    else [f"{v:.4g}" for v in observed]
+                labels = [f"{name} = {v}" for v in levels]
+            else:
+                edges = np.unique(np.quantile(observed, [0.25, 0.5, 0.75]))
+                labels = ([f"{name} <= {edges[0]:.4g}"]
+                          + [f"{lo:.4g} < {name} <= {hi:.4g}" for lo, hi in zip(edges[:-1], edges[1:])]
+                          + [f"{name} > {edges[-1]:.4g}"])
+            self.pools.append(pool)
+            self.edges.append(edges)
+            self.labels.append(labels + [f"{name} is missing"])
+
+    def encode(self, X: pd.DataFrame) -> np.ndarray:
+        """Float matrix of X; missing categories become NaN rather than code -1."""
+        values = self.codec.to_array(X)
+        for j, name in enumerate(self.codec.columns):
+            if name in self.codec.categories:
+                values[values[:, j] < 0, j] = np.nan
+        return values
+
+    @property
+    def n_features(self) -> int:
+        return len(self.pools)
+
+    def bins(self, values: np.ndarray) -> np.ndarray:
+        """Bin index of every cell; the extra last bin of each column holds missing values."""
+        out = np.empty(values.shape, dtype=np.int32)
+        for j, edges in enumerate(self.edges):
+            col = values[..., j]
+            out[..., j] = np.where(np.isnan(col), len(edges) + 1, np.searchsorted(edges, col, side="left"))
+        return out
+
+    def sample(self, shape: tuple, rng: np.random.Generator) -> np.ndarray:
+        """Rows drawn feature-by-feature from the empirical marginals (bin by frequency, value within bin)."""
+        out = np.empty(shape + (self.n_features,), dtype=np.float64)
+        for j, pool in enumerate(self.pools):
+            out[..., j] = pool[rng.integers(len(pool), size=shape)]
+        return out
+
+    def conditions(self, bins: np.ndarray) -> np.ndarray:
+        """Readable condition ("a <= 1.5", "c = red") for every bin index in a (rows, features) array."""
+        return np.array([[self.labels[j][b] for j, b in enumerate(row)] for row in bins], dtype=object)
+
+
+def perturbation_stats(X: pd.DataFrame, version: str = None, seed: int = 42) -> PerturbationStats:
+    """Cached sampler statistics for one dataset version."""
+    return cached_compute("lime_stats", (version or dataset_version(X), seed), lambda: PerturbationStats(X, seed))
+
+
+def _lime_batch(predict, stats: PerturbationStats, x: np.ndarray, num_samples: int, seed: int) -> dict:
+    """Local surrogate coefficients for one batch of instances."""
+    n, p = x.shape
+    rng = np.random.default_rng(seed)
+    rows = stats.sample((n, num_samples), rng)
+    rows[:, 0, :] = x  # the first sample of every instance is the instance itself
+    out = predict(rows.reshape(-1, p)).reshape(n, num_samples, -1)
+
+    # Explain the output the model predicts for the instance
+    label = out[:, 0, :].argmax(axis=1) if out.shape[2] > 1 else np.zeros(n, dtype=np.int64)
+    y = np.take_along_axis(out, label[:, None, None], axis=2)[:, :, 0]
+
+    # Binary representation (same bin as the instance) and LIME's exponential kernel on it
+    z = (stats.bins(rows) == stats.bins(x)[:, None, :]).astype(np.float64)
+    width = 0.75 * np.sqrt(p)
+    distance2 = p - z.sum(axis=2)
+    w = np.sqrt(np.exp(-distance2 / width ** 2))
+
+    # Weighted ridge per instance (unpenalised intercept), solved as one stacked system.
+    # Batched matmuls (BLAS) rather than einsum, which loops the three-operand products in C.
+    w_sum = w.sum(axis=1, keepdims=True)
+    z_mean = (w[:, None, :] @ z)[:, 0, :] / w_sum
+    y_mean = (w * y).sum(axis=1, keepdims=True) / w_sum
+    zc, yc = z - z_mean[:, None, :], y - y_mean
+    zw_t = (zc * w[..., None]).transpose(0, 2, 1)
+    A = zw_t @ zc + RIDGE_ALPHA * np.eye(p)
+    coef = np.linalg.solve(A, zw_t @ yc[:, :, None])[:, :, 0]
+    intercept = y_mean[:, 0] - (z_mean * coef).sum(axis=1)
+
+    fitted = intercept[:, None] + (z @ coef[:, :, None])[:, :, 0]
+    ss_res = (w * (y - fitted) ** 2).sum(axis=1)
+    ss_tot = (w * yc ** 2).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 1.0)
+    return {"weights": coef, "intercept": intercept, "score": score, "local_pred": fitted[:, 0],
+            "prediction": y[:, 0], "label": label}
+
+
+def tabular_lime(model, X: pd.DataFrame, task: str, stats: PerturbationStats, num_samples: int = NUM_SAMPLES,
+                 n_jobs: int = -1, seed: int = 42) -> dict:
+    """LIME weights (rows, features) and per-row fit diagnostics for every row of X."""
+    values = stats.encode(X)
+    predict = _predict_fn(model, stats.codec, task)
+    # The normal matrices are (rows, features, features), so wide designs also bound the batch by p^2
+    p = stats.n_features
+    batch_rows = max(1, PERTURB_BATCH_CELLS // max(num_samples * p, p * p))
+    starts = range(0, len(values), batch_rows)
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_lime_batch)(predict, stats, values[s:s + batch_rows], num_samples, seed + i)
+        for i, s in enumerate(starts)
+    )
+    result = {k: np.concatenate([part[k] for part in parts]) for k in parts[0]}
+    result["bins"] = stats.bins(values)
+    return result
+
+
+def explain(model, X: pd.DataFrame, task: str, version: str = None, max_rows: int = None,
+            num_samples: int = NUM_SAMPLES, n_jobs: int = -1, seed: int = 42) -> dict:
+    """
+    Cached LIME explanation of up to max_rows rows of X.
+    Returns {"weights" (rows, features), "intercept", "score", "local_pred", "prediction",
+    "outputs" (explained output per row), "conditions" (rows, features), "X", "seconds"}.
+    """
+    version = version or dataset_version(X)
+
+    def build():
+        t0 = time.perf_counter()
+        stats = perturbation_stats(X, version, seed)
+        rows = X.iloc[_sample_positions(len(X), max_rows or LIME_SAMPLE_ROWS, seed)]
+        result = tabular_lime(model, rows, task, stats, num_samples=num_samples, n_jobs=n_jobs, seed=seed)
+        if task == "Classification" and hasattr(model, "predict_proba"):
+            classes = [str(c) for c in getattr(model, "classes_", range(result["label"].max() + 1))]
+            result["outputs"] = [f"P({classes[k]})" for k in result["label"]]
+        else:
+            result["outputs"] = ["prediction"] * len(rows)
+        result["conditions"] = stats.conditions(result.pop("bins"))
+        result.update({"X": rows, "seconds": time.perf_counter() - t0})
+        return result
+
+    return cached_compute("lime", (model_token(model), version, max_rows, num_samples, seed), build)
+
+
+# ---------------------------
+# PLOTS
+# ---------------------------
+def importance_frame(expl: dict) -> pd.DataFrame:
+    return (pd.DataFrame({"Feature": expl["X"].columns, "Mean |weight|": np.abs(expl["weights"]).mean(axis=0)})
+            .sort_values("Mean |weight|", ascending=False).reset_index(drop=True))
+
+
+def instance_figure(expl: dict, i: int, top: int = TOP_FEATURES):
+    """Signed local weights of one explained row, labelled with the row's bin conditions."""
+    weights = expl["weights"][i]
+    order = np.argsort(-np.abs(weights))[:top][::-1]
+    df = pd.DataFrame({"Condition": expl["conditions"][i, order], "Weight": weights[order]})
+    df["Effect"] = np.where(df["Weight"] >= 0, "raises", "lowers")
+    fig = px.bar(df, x="Weight", y="Condition", color="Effect", orientation="h",
+                 color_discrete_map={"raises": "#d62728", "lowers": "#1f77b4"},
+                 title=f"LIME: {expl['outputs'][i]} = {expl['prediction'][i]:.4g}")
+    fig.update_yaxes(title=None)
+    return fig
@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import stats
+
+from core.utils.caching import cached_compute, dataset_version
+from modules.evaluation.explainability.shap_explainer import _sample_positions, model_token
+
+# ---------------------------------------------------------
+# PERMUTATION IMPORTANCE
+# Model-agnostic importance: the drop in test score when a feature
+# (or a whole one-hot family, shuffled jointly so every row stays a
+# valid encoding) is permuted. Each worker owns ONE working copy of
+# the evaluation rows per repeat; a group's columns are swapped for
+# their permuted values, scored and swapped back, so no feature ever
+# copies the full frame. Groups are split across a process pool, and
+# every repeat draws its own evaluation subsample, so the spread of
+# the repeats gives a confidence interval for each importance.
+# ---------------------------------------------------------
+EVAL_ROWS = 5_000
+N_REPEATS = 5
+CONFIDENCE = 0.95
+TOP_FEATURES = 20
+
+
+def feature_groups(columns: list, features: list = None) -> dict:
+    """
+    {group: [column positions]}. With the raw feature names of the design
+    matrix, encoded columns ("city_Paris", "city_Rome") join the longest raw
+    feature they extend; otherwise every column is its own group.
+    """
+    groups = {}
+    by_length = sorted(features or [], key=len, reverse=True)
+    for j, col in enumerate(columns):
+        owner = next((f for f in by_length if col == f or col.startswith(f"{f}_")), col)
+        groups.setdefault(owner, []).append(j)
+    return groups
+
+
+def score(model, X: pd.DataFrame, y: np.ndarray, task: str) -> float:
+    """Accuracy for classification, R² for regression."""
+    pred = np.asarray(model.predict(X))
+    if task == "Classification":
+        if pred.dtype.kind not in "biuf" or y.dtype.kind not in "biuf":
+            pred, y = pred.astype(str), y.astype(str)
+        return float(np.mean(pred == y))
+    y = y.astype(np.float64)
+    ss_tot = np.sum((y - y.mean()) ** 2)
+    return float(1 - np.sum((y - pred.astype(np.float64)) ** 2) / ss_tot) if ss_tot > 0 else 0.0
+
+
+def _permute_groups(model, X: pd.DataFrame, y: np.ndarray, task: str, groups: list, repeats: list) -> np.ndarray:
+    """Score drops (groups, repeats) for one worker's share of the groups."""
+    drops = np.empty((len(groups), len(repeats)))
+    for r, (rows, baseline, seed) in enumerate(repeats):
+        work = X.iloc[rows].reset_index(drop=True)  # the worker's working copy for this repeat
+        y_r = y[rows]
+        rng = np.random.default_rng(seed)
+        for g, positions in enumerate(groups):
+            original = [work.iloc[:, j].array for j in positions]
+            perm = rng.permutation(len(work))
+            for j, values in zip(positions, original):
+                work.isetitem(j, values.take(perm))
+            drops[g, r] = baseline - score(model, work, y_r, task)
+            for j, values in zip(positions, original):
+                work.isetitem(j, values)
+    return drops
+
+
+def permutation_importance(model, X: pd.DataFrame, y, task: str, features: list = None,
+                           max_rows: int = EVAL_ROWS, n_repeats: int = N_REPEATS, n_jobs: int = -1,
+                           seed: int = 42) -> dict:
+    """
+    Mean score drop per feature group over n_repeats subsamples of up to max_rows rows.
+    Returns {"table", "metric", "baseline", "rows"}.
+    """
+    y = np.asarray(y)
+    groups = feature_groups(list(X.columns), features)
+    names, positions = list(groups), list(groups.values())
+
+    repeats = []
+    for r in range(n_repeats):
+        rows = _sample_positions(len(X), max_rows, seed + r)
+        repeats.append((rows, score(model, X.iloc[rows], y[rows], task), seed + 1000 + r))
+
+    # Workers receive only the rows some repeat evaluates on
+    used = np.unique(np.concatenate([rows for rows, _, _ in repeats]))
+    X, y = X.iloc[used], y[used]
+    repeats = [(np.searchsorted(used, rows), baseline, s) for rows, baseline, s in repeats]
+
+    # One task per worker, so each worker builds its working copies once
+    n_chunks = max(1, min(effective_n_jobs(n_jobs), len(positions)))
+    chunks = np.array_split(np.arange(len(positions)), n_chunks)
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_permute_groups)(model, X, y, task, [positions[g] for g in chunk], repeats) for chunk in chunks
+    )
+    drops = np.concatenate(parts)
+
+    mean = drops.mean(axis=1)
+    std = drops.std(axis=1, ddof=1) if n_repeats > 1 else np.zeros(len(mean))
+    half = stats.t.ppf((1 + CONFIDENCE) / 2, n_repeats - 1) * std / np.sqrt(n_repeats) if n_repeats > 1 else 0.0
+    table = pd.DataFrame({"Feature": names, "Columns": [len(p) for p in positions], "Importance": mean,
+                          "Std": std, "CI low": mean - half, "CI high": mean + half})
+    return {"table": table.sort_values("Importance", ascending=False).reset_index(drop=True),
+            "metric": "accuracy" if task == "Classification" else "R²",
+            "baseline": float(np.mean([b for _, b, _ in repeats])),
+            "rows": len(repeats[0][0])}
+
+
+def explain(model, X: pd.DataFrame, y, task: str, version: str = None, features: list = None,
+            max_rows: int = EVAL_ROWS, n_repeats: int = N_REPEATS, n_jobs: int = -1, seed: int = 42) -> dict:
+    """Cached permutation importance; adds "seconds" to the result."""
+    version = version or dataset_version(X)
+    grouped = tuple(features) if features else None
+
+    def build():
+        t0 = time.perf_counter()
+        result = permutation_importance(model, X, y, task, features=features, max_rows=max_rows,
+                                        n_repeats=n_repeats, n_jobs=n_jobs, seed=seed)
+        result["seconds"] = time.perf_counter() - t0
+        return result
+
+    return cached_compute("permutation_importance",
+                          (model_token(model), version, grouped, max_rows, n_repeats, seed), build)
+
+
+def importance_figure(result: dict, top: int = TOP_FEATURES):
+    """Horizontal bars of the mean score drop with confidence-interval whiskers."""
+    df = result["table"].head(top).iloc[::-1]
+    fig = go.Figure(go.Bar(
+        x=df["Importance"], y=df["Feature"], orientation="h",
+        error_x=dict(type="data", symmetric=False, array=df["CI high"] - df["Importance"],
+                     arrayminus=df["Importance"] - df["CI low"]),
+    ))
+    fig.update_layout(title=f"Permutation Importance (drop in {result['metric']}, {CONFIDENCE:.0%} CI)",
+                      xaxis_title=f"Drop in {result['metric']}")
+    return fig
@@ -0,0 +1,306 @@
+import time
+from math import comb
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+
+from core.utils.caching import cached_compute, dataset_version
+from modules.ml.algorithms.base import BaseModel
+
+try:
+    import shap
+except ImportError:  # optional: exact TreeSHAP for scikit-learn forests
+    shap = None
+
+# ---------------------------------------------------------
+# SHAP EXPLANATIONS
+# Tree models use exact TreeSHAP: natively for XGBoost / LightGBM /
+# CatBoost (model.contributions), through shap.TreeExplainer for the
+# scikit-learn forests when shap is installed. Every other model gets
+# KernelSHAP: a shared set of Shapley-kernel coalitions, evaluated
+# against a k-means summary of the data, with all synthetic rows of a
+# batch of instances scored in ONE predict call and the weighted
+# regressions of the batch solved together. Explanations cover a
+# bounded row sample, run in parallel batches and are cached per
+# (fitted model, dataset version, background); plots read the cached
+# arrays. A batch scores its coalitions in chunks of bounded size, and
+# designs wider than KERNEL_MAX_FEATURES are refused: the coalition
+# budget can no longer identify that many contributions.
+# ---------------------------------------------------------
+TREE_SAMPLE_ROWS = 1_000
+KERNEL_SAMPLE_ROWS = 200
+BACKGROUND_CLUSTERS = 10
+# Synthetic cells (instances x coalitions x background rows x features) per predict call
+KERNEL_BATCH_CELLS = 4_000_000
+TREE_BATCH_ROWS = 5_000
+MAX_COALITIONS = 2_048
+KERNEL_MAX_FEATURES = 500
+TOP_FEATURES = 15
+
+
+def model_token(model) -> str:
+    """Identity of a fitted state: the wrapper's fit id, else the object id."""
+    return getattr(model, "fit_id_", None) or f"obj:{id(model)}"
+
+
+def _sample_positions(n: int, max_rows: int, seed: int) -> np.ndarray:
+    if n <= max_rows:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, max_rows, replace=False))
+
+
+class _Codec:
+    """Frame <-> float matrix; category columns travel as their integer codes."""
+
+    def __init__(self, X: pd.DataFrame):
+        self.columns = list(X.columns)
+        self.categories = {c: X[c].cat.categories for c in X.columns if isinstance(X[c].dtype, pd.CategoricalDtype)}
+
+    def to_array(self, X: pd.DataFrame) -> np.ndarray:
+        out = np.empty(X.shape, dtype=np.float64)
+        for j, c in enumerate(self.columns):
+            out[:, j] = X[c].cat.codes if c in self.categories else X[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        return out
+
+    def to_frame(self, values: np.ndarray) -> pd.DataFrame:
+        X = pd.DataFrame(values, columns=self.columns, copy=False)
+        for c, cats in self.categories.items():
+            X[c] = pd.Categorical.from_codes(np.nan_to_num(X[c].to_numpy(), nan=-1).astype(np.int64), cats)
+        return X
+
+
+def summarize_background(values: np.ndarray, k: int = BACKGROUND_CLUSTERS, seed: int = 42) -> tuple:
+    """
+    k-means centres snapped to observed values per column (so one-hot and code
+    columns stay valid), weighted by cluster size. Returns (rows, weights).
+    """
+    filled = np.where(np.isnan(values), np.nanmean(values, axis=0), values)
+    filled = np.nan_to_num(filled)
+    k = min(k, len(np.unique(filled, axis=0)))
+    km = KMeans(n_clusters=k, n_init=3, random_state=seed).fit(filled)
+    centres = km.cluster_centers_.copy()
+    for j in range(filled.shape[1]):
+        observed = np.unique(filled[:, j])
+        if len(observed) == 1:
+            centres[:, j] = observed[0]
+            continue
+        pos = np.searchsorted(observed, centres[:, j]).clip(1, len(observed) - 1)
+        lower, upper = observed[pos - 1], observed[pos]
+        centres[:, j] = np.where(centres[:, j] - lower <= upper - centres[:, j], lower, upper)
+    weights = np.bincount(km.labels_, minlength=k).astype(np.float64)
+    return centres, weights / weights.sum()
+
+
+def kernel_coalitions(p: int, max_coalitions: int = MAX_COALITIONS, seed: int = 42) -> tuple:
+    """
+    Coalition masks and regression weights: every coalition when 2^p - 2 fits
+    the budget (exact Shapley kernel weights), else 2p + 512 (at most
+    max_coalitions) paired samples from the kernel's size distribution.
+    """
+    if p <= 1:
+        return np.ones((1, p), dtype=bool), np.ones(1)
+    if 2 ** p - 2 <= max_coalitions:
+        codes = np.arange(1, 2 ** p - 1)
+        masks = ((codes[:, None] >> np.arange(p)) & 1).astype(bool)
+        s = masks.sum(axis=1)
+        weights = (p - 1) / (np.array([comb(p, int(k)) for k in s]) * s * (p - s))
+        return masks, weights
+    rng = np.random.default_rng(seed)
+    sizes = np.arange(1, p)
+    prob = (p - 1) / (sizes * (p - sizes))
+    half = min(max_coalitions, 2 * p + 512) // 2
+    drawn = rng.choice(sizes, size=half, p=prob / prob.sum())
+    # The first `size` columns of a random permutation per row form the coalition
+    order = np.argsort(rng.random((half, p)), axis=1)
+    masks = np.zeros((half, p), dtype=bool)
+    np.put_along_axis(masks, order, np.arange(p)[None, :] < drawn[:, None], axis=1)
+    return np.vstack([masks, ~masks]), np.ones(2 * half)
+
+
+def _kernel_batch(predict, x: np.ndarray, background: np.ndarray, bg_weights: np.ndarray,
+                  masks: np.ndarray, weights: np.ndarray, fx: np.ndarray, ex: np.ndarray) -> np.ndarray:
+    """SHAP values (rows, outputs, features) for one batch of instances."""
+    n, p = x.shape
+    m, b = len(masks), len(background)
+    # Coalitions per predict call, so the synthetic rows stay within KERNEL_BATCH_CELLS even for one wide instance
+    step = max(1, KERNEL_BATCH_CELLS // (n * b * p))
+    v = []
+    for c in range(0, m, step):
+        chunk = masks[c:c + step]
+        synthetic = np.where(chunk[None, :, None, :], x[:, None, None, :], background[None, None, :, :])
+        out = predict(synthetic.reshape(-1, p)).reshape(n, len(chunk), b, -1)
+        v.append(np.tensordot(out, bg_weights, axes=([2], [0])))
+    v = np.concatenate(v, axis=1) - ex  # (n, m, outputs)
+    total = fx - ex  # efficiency: contributions sum to f(x) - E[f]
+    if p == 1:
+        return total[:, :, None]
+
+    # Eliminate the last feature with the efficiency constraint, then one weighted
+    # least-squares solve shared by every instance and output of the batch
+    z = masks.astype(np.float64)
+    A = (z[:, :-1] - z[:, -1:]) * np.sqrt(weights)[:, None]
+    target = (v - z[None, :, -1:] * total[:, None, :]) * np.sqrt(weights)[None, :, None]
+    rest, *_ = np.linalg.lstsq(A, target.transpose(1, 0, 2).reshape(m, -1), rcond=None)
+    rest = rest.reshape(p - 1, n, -1).transpose(1, 2, 0)  # (n, outputs, p - 1)
+    return np.concatenate([rest, (total - rest.sum(axis=2))[:, :, None]], axis=2)
+
+
+def _predict_fn(model, codec: _Codec, task: str):
+    if task == "Classification" and hasattr(model, "predict_proba"):
+        return lambda values: np.asarray(model.predict_proba(codec.to_frame(values)), dtype=np.float64)
+    return lambda values: np.asarray(model.predict(codec.to_frame(values)), dtype=np.float64).reshape(-1, 1)
+
+
+def kernel_shap(model, X: pd.DataFrame, background: pd.DataFrame, task: str, n_jobs: int = -1,
+                clusters: int = BACKGROUND_CLUSTERS, max_coalitions: int = MAX_COALITIONS, seed: int = 42) -> tuple:
+    """Model-agnostic SHAP values (rows, outputs, features) and the expected output."""
+    if X.shape[1] > KERNEL_MAX_FEATURES:
+        raise ValueError(f"KernelSHAP supports at most {KERNEL_MAX_FEATURES} features and this design has "
+                         f"{X.shape[1]:,}. Use a tree model (exact TreeSHAP) or permutation importance "
+                         "grouped by raw feature instead.")
+    codec = _Codec(X)
+    values = codec.to_array(X)
+    bg, bg_weights = summarize_background(codec.to_array(background), clusters, seed)
+    predict = _predict_fn(model, codec, task)
+    ex = bg_weights @ predict(bg)
+    fx = predict(values)
+    masks, weights = kernel_coalitions(values.shape[1], max_coalitions, seed)
+    batch_rows = max(1, KERNEL_BATCH_CELLS // (len(masks) * len(bg) * values.shape[1]))
+    starts = range(0, len(values), batch_rows)
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_kernel_batch)(predict, values[s:s + batch_rows], bg, bg_weights, masks, weights,
+                               fx[s:s + batch_rows], ex)
+        for s in starts
+    )
+    return np.concatenate(parts), ex
+
+
+def _sklearn_trees(model):
+    """The fitted scikit-learn tree ensemble inside a wrapper, when shap can explain it."""
+    inner = getattr(model, "model_", None)
+    return inner if shap is not None and inner is not None and hasattr(inner, "estimators_") else None
+
+
+def _native_contributions(model) -> bool:
+    # Backends without native TreeSHAP keep the BaseModel hook
+    return isinstance(model, BaseModel) and type(model)._contributions is not BaseModel._contributions
+
+
+def supports_tree_shap(model) -> bool:
+    return _native_contributions(model) or _sklearn_trees(model) is not None
+
+
+def _tree_explainer_values(inner, X: pd.DataFrame):
+    explainer = shap.TreeExplainer(inner)
+    values = explainer.shap_values(X)
+    values = np.stack(values, axis=1) if isinstance(values, list) else np.asarray(values)
+    if values.ndim == 2:
+        values = values[:, None, :]
+    elif values.shape[1] != len(np.atleast_1d(explainer.expected_value)):
+        values = values.transpose(0, 2, 1)  # (rows, features, outputs) layout of newer shap
+    return values, np.atleast_1d(np.asarray(explainer.expected_value, dtype=np.float64))
+
+
+def tree_shap(model, X: pd.DataFrame, n_jobs: int = -1, batch_rows: int = TREE_BATCH_ROWS):
+    """Exact TreeSHAP (native backends or shap.TreeExplainer); None when the model is not a supported tree model."""
+    if _native_contributions(model):
+        # The libraries release the GIL, so row batches run on threads
+        parts = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(model.contributions)(X.iloc[s:s + batch_rows]) for s in range(0, len(X), batch_rows)
+        )
+        return np.concatenate([v for v, _ in parts]), parts[0][1]
+    inner = _sklearn_trees(model)
+    return _tree_explainer_values(inner, X) if inner is not None else None
+
+
+def output_names(model, task: str, n_outputs: int) -> list:
+    if task != "Classification":
+        return ["prediction"]
+    classes = [str(c) for c in getattr(model, "classes_", range(n_outputs))]
+    if n_outputs == 1:
+        return [f"log-odds of {classes[-1]}"]
+    return classes[:n_outputs]
+
+
+def explain(model, X: pd.DataFrame, task: str, version: str = None, max_rows: int = None,
+            background: pd.DataFrame = None, n_jobs: int = -1, seed: int = 42) -> dict:
+    """
+    Cached SHAP explanation of up to max_rows rows of X.
+    Returns {"values" (rows, outputs, features), "base" (outputs,), "X" (explained rows),
+    "outputs", "method", "seconds"}.
+    """
+    version = version or dataset_version(X)
+
+    def build():
+        t0 = time.perf_counter()
+        rows = X.iloc[_sample_positions(len(X), max_rows or TREE_SAMPLE_ROWS, seed)]
+        result = tree_shap(model, rows, n_jobs=n_jobs)
+        method = "TreeSHAP"
+        if result is None:
+            rows = rows.iloc[:max_rows or KERNEL_SAMPLE_ROWS]
+            bg = background if background is not None else X
+            bg = bg.iloc[_sample_positions(len(bg), 5 * TREE_SAMPLE_ROWS, seed + 1)]
+            result = kernel_shap(model, rows, bg, task, n_jobs=n_jobs, seed=seed)
+            method = "KernelSHAP"
+        values, base = result
+        return {"values": values, "base": base, "X": rows, "outputs": output_names(model, task, values.shape[1]),
+                "method": method, "seconds": time.perf_counter() - t0}
+
+    bg_version = dataset_version(background) if background is not None else None
+    return cached_compute("shap", (model_token(model), version, bg_version, max_rows, seed), build)
+
+
+# ---------------------------
+# PLOTS
+# ---------------------------
+def importance_frame(expl: dict, output: int = 0) -> pd.DataFrame:
+    values = expl["values"][:, output, :]
+    return (pd.DataFrame({"Feature": expl["X"].columns, "Mean |SHAP|": np.abs(values).mean(axis=0)})
+            .sort_values("Mean |SHAP|", ascending=False).reset_index(drop=True))
+
+
+def _scaled(column: pd.Series) -> np.ndarray:
+    """Feature values mapped to [0, 1] by rank, for colouring (categories by code)."""
+    values = column.cat.codes if isinstance(column.dtype, pd.CategoricalDtype) else column
+    ranks = pd.Series(np.asarray(values, dtype=np.float64)).rank(pct=True)
+    return ranks.to_numpy()
+
+
+def summary_figure(expl: dict, output: int = 0, top: int = TOP_FEATURES):
+    """Beeswarm-style summary: one jittered row of points per feature, coloured by feature value."""
+    order = importance_frame(expl, output)["Feature"].head(top).tolist()[::-1]
+    values = expl["values"][:, output, :]
+    cols = list(expl["X"].columns)
+    jitter = np.random.default_rng(0).uniform(-0.3, 0.3, len(values))
+    frames = [pd.DataFrame({"SHAP value": values[:, cols.index(f)], "row": i + jitter, "Feature": f,
+                            "Feature value (rank)": _scaled(expl["X"][f])})
+              for i, f in enumerate(order)]
+    df = pd.concat(frames, ignore_index=True)
+    fig = px.scatter(df, x="SHAP value", y="row", color="Feature value (rank)", hover_data=["Feature"],
+                     color_continuous_scale="RdBu_r", title=f"SHAP Summary ({expl['outputs'][output]})")
+    fig.update_traces(marker=dict(size=4))
+    fig.update_yaxes(tickvals=list(range(len(order))), ticktext=order, title=None)
+    fig.add_vline(x=0, line_dash="dash")
+    return fig
+
+
+def dependence_figure(expl: dict, feature: str, output: int = 0, color_by: str = None):
+    """Feature value vs its SHAP value, coloured by the feature it interacts with most (by default)."""
+    cols = list(expl["X"].columns)
+    shap_values = expl["values"][:, output, cols.index(feature)]
+    if color_by is None and len(cols) > 1:
+        # Strongest |correlation| between another feature's values and this feature's SHAP values
+        ranks = np.column_stack([_scaled(expl["X"][c]) for c in cols])
+        target = pd.Series(shap_values).rank(pct=True).to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.abs([np.corrcoef(ranks[:, j], target)[0, 1] if c != feature else -1 for j, c in enumerate(cols)])
+        color_by = cols[int(np.nanargmax(np.nan_to_num(corr, nan=-1)))]
+    df = pd.DataFrame({feature: expl["X"][feature].to_numpy(), "SHAP value": shap_values})
+    if color_by is not None:
+        df[color_by] = expl["X"][color_by].to_numpy()
+    fig = px.scatter(df, x=feature, y="SHAP value", color=color_by, title=f"SHAP Dependence: {feature}")
+    fig.update_traces(marker=dict(size=5))
+    return fig
@@ -0,0 +1,33 @@
+import streamlit as st
+
+from core.metrics import evaluate_model
+
+SOURCES = {"model_evaluation": "In-memory model", "stream_result": "Out-of-core model"}
+
+
+def session_evaluations() -> dict:
+    """{label: metrics accumulator} for every model trained in this session."""
+    found = {}
+    if "trained_model" in st.session_state:
+        if "model_evaluation" not in st.session_state:
+            # Models trained before summaries were stored: accumulate once from the saved test split
+            st.session_state["model_evaluation"] = evaluate_model(
+                st.session_state["trained_model"], st.session_state["model_X_test"],
+                st.session_state["model_y_test"], st.session_state["model_task"],
+                preds=st.session_state["model_preds"])
+        found[SOURCES["model_evaluation"]] = st.session_state["model_evaluation"]
+    stream = st.session_state.get("stream_result")
+    if stream is not None and stream.get("evaluation") is not None:
+        found[SOURCES["stream_result"]] = stream["evaluation"]
+    return found
+
+
+def pick_evaluation(key: str):
+    """Selector over the session's evaluations; returns (label, accumulator) or (None, None)."""
+    found = session_evaluations()
+    if not found:
+        return None, None
+    label = next(iter(found))
+    if len(found) > 1:
+        label = st.radio("Evaluate", list(found), horizontal=True, key=key)
+    return label, found[label]
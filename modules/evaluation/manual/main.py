@@ -1,49 +1,65 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from sklearn.metrics import confusion_matrix, roc_curve, auc, mean_absolute_error, r2_score
-import numpy as np
+from modules.evaluation.manual.helpers import SOURCES, pick_evaluation
+from modules.evaluation.manual.ui import (
+    render_actual_vs_predicted, render_calibration, render_confusion, render_curves, render_gains, render_residuals,
+    render_lime, render_permutation_importance, render_shap, render_threshold_analysis,
+)
 
 def render_manual_evaluation():
     st.header("📈 Manual Evaluation")
     
-    if "trained_model" not in st.session_state:
+    source, evaluation = pick_evaluation("manual_eval_source")
+    if evaluation is None:
         st.warning("No trained model found. Please train a model in the 'Model Preparation' tab first.")
         return
         
-    task_type = st.session_state["model_task"]
-    y_test = st.session_state["model_y_test"]
-    preds = st.session_state["model_preds"]
+    # Plots are drawn from the accumulated summaries, never from raw per-row points
+    task_type = evaluation.task
+    in_memory = source == SOURCES["model_evaluation"]
+    explanations = ["Feature Importance", "SHAP Explanations", "LIME Explanations"] if in_memory else []
     
-    st.write(f"Evaluating Model for Task: **{task_type}**")
+    st.write(f"Evaluating Model for Task: **{task_type}** ({evaluation.n:,} test rows)")
     
     if task_type == "Classification":
-        option = st.selectbox("Select Plot", ["Confusion Matrix", "Metrics Summary", "Feature Importance"])
+        plots = ["Confusion Matrix", "Metrics Summary", "ROC / PR Curves", "Calibration", "Lift / Gain",
+                 "Threshold Analysis"] + explanations
+        option = st.selectbox("Select Plot", plots)
         
         if option == "Confusion Matrix":
-            cm = confusion_matrix(y_test, preds)
-            fig = px.imshow(cm, text_auto=True, title="Confusion Matrix")
-            st.plotly_chart(fig)
+            render_confusion(evaluation)
             
         elif option == "Metrics Summary":
-            from sklearn.metrics import classification_report
-            report = classification_report(y_test, preds, output_dict=True)
-            df_report = pd.DataFrame(report).transpose()
+            df_report = evaluation.report()
             st.dataframe(df_report)
             
             with st.expander("🤖 Explain Metrics"):
                 if st.button("Analyze Performance"):
-                    summary = f"Accuracy: {report['accuracy']}\nMacro Avg F1: {report['macro avg']['f1-score']}"
+                    summary = f"Accuracy: {evaluation.accuracy}\nMacro Avg F1: {df_report.loc['macro avg', 'f1-score']}"
                     prompt = "Explain these classification metrics. Is the model good?"
                     insight = st.session_state.chat_manager.generate_insight(prompt, summary)
                     st.write(insight)
             
+        elif option == "ROC / PR Curves":
+            render_curves(evaluation, key="manual_eval_curve_class")
+            
+        elif option == "Calibration":
+            render_calibration(evaluation, key="manual_eval_calibration")
+            
+        elif option == "Lift / Gain":
+            render_gains(evaluation, key="manual_eval_gains")
+            
+        elif option == "Threshold Analysis":
+            render_threshold_analysis(evaluation, key="manual_eval_threshold")
+            
         elif option == "Feature Importance":
             model = st.session_state["trained_model"]
             if hasattr(model, "feature_importances_"):
-                # We need column names from X_test, which we saved
-                if "model_X_test" in st.session_state:
-                    feats = st.session_state["model_X_test"].columns
+                # Column names come from the cached design matrix (or the saved X_test)
+                design = st.session_state.get("model_design")
+                if design is not None or "model_X_test" in st.session_state:
+                    feats = design.columns if design is not None else st.session_state["model_X_test"].columns
                     importances = model.feature_importances_
                     df_imp = pd.DataFrame({"Feature": feats, "Importance": importances}).sort_values(by="Importance", ascending=False)
                     fig = px.bar(df_imp, x="Importance", y="Feature", orientation='h', title="Feature Importance")
@@ -51,30 +67,55 @@ def render_manual_evaluation():
                 else:
                     st.warning("Feature names not found.")
             else:
-                st.info("This model type does not support built-in feature importance (e.g., Logistic Regression or Neural Networks). Experimental SHAP support coming soon.")
+                design = st.session_state.get("model_design")
+                render_permutation_importance(model, st.session_state["model_X_test"], st.session_state["model_y_test"],
+                                              task_type, version=design.key if design is not None else None,
+                                              features=design.features if design is not None else None,
+                                              key="manual_eval_permutation")
+            
+        elif option == "SHAP Explanations":
+            design = st.session_state.get("model_design")
+            render_shap(st.session_state["trained_model"], st.session_state["model_X_test"], task_type,
+                        version=design.key if design is not None else None, key="manual_eval_shap")
+            
+        elif option == "LIME Explanations":
+            design = st.session_state.get("model_design")
+            render_lime(st.session_state["trained_model"], st.session_state["model_X_test"], task_type,
+                        version=design.key if design is not None else None, key="manual_eval_lime")
             
     elif task_type == "Regression":
-        option = st.selectbox("Select Plot", ["Actual vs Predicted", "Residuals", "Feature Importance"])
+        plots = ["Actual vs Predicted", "Residuals"] + explanations
+        option = st.selectbox("Select Plot", plots)
         
         if option == "Actual vs Predicted":
-            df_res = pd.DataFrame({"Actual": y_test, "Predicted": preds})
-            fig = px.scatter(df_res, x="Actual", y="Predicted", title="Actual vs Predicted")
-            fig.add_shape(type="line", line=dict(dash="dash"), x0=y_test.min(), y0=y_test.min(), x1=y_test.max(), y1=y_test.max())
-            st.plotly_chart(fig)
+            render_actual_vs_predicted(evaluation)
             
         elif option == "Residuals":
-            residuals = y_test - preds
-            fig = px.histogram(residuals, title="Residual Distribution", nbins=30)
-            st.plotly_chart(fig)
+            render_residuals(evaluation)
             
         elif option == "Feature Importance":
             model = st.session_state["trained_model"]
             if hasattr(model, "feature_importances_"):
-                if "model_X_test" in st.session_state:
-                    feats = st.session_state["model_X_test"].columns
+                design = st.session_state.get("model_design")
+                if design is not None or "model_X_test" in st.session_state:
+                    feats = design.columns if design is not None else st.session_state["model_X_test"].columns
                     importances = model.feature_importances_
                     df_imp = pd.DataFrame({"Feature": feats, "Importance": importances}).sort_values(by="Importance", ascending=False)
                     fig = px.bar(df_imp, x="Importance", y="Feature", orientation='h', title="Feature Importance")
                     st.plotly_chart(fig)
             else:
-                st.info("This model type does not support built-in feature importance.")
+                design = st.session_state.get("model_design")
+                render_permutation_importance(model, st.session_state["model_X_test"], st.session_state["model_y_test"],
+                                              task_type, version=design.key if design is not None else None,
+                                              features=design.features if design is not None else None,
+                                              key="manual_eval_permutation")
+            
+        elif option == "SHAP Explanations":
+            design = st.session_state.get("model_design")
+            render_shap(st.session_state["trained_model"], st.session_state["model_X_test"], task_type,
+                        version=design.key if design is not None else None, key="manual_eval_shap")
+            
+        elif option == "LIME Explanations":
+            design = st.session_state.get("model_design")
+            render_lime(st.session_state["trained_model"], st.session_state["model_X_test"], task_type,
+                        version=design.key if design is not None else None, key="manual_eval_lime")
@@ -0,0 +1,230 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from core.metrics import BinnedHistogram, ClassificationMetrics, RegressionMetrics
+from modules.evaluation.explainability.lime_explainer import LIME_SAMPLE_ROWS, NUM_SAMPLES, instance_figure
+from modules.evaluation.explainability.lime_explainer import explain as explain_lime
+from modules.evaluation.explainability.lime_explainer import importance_frame as lime_importance_frame
+from modules.evaluation.explainability.metrics import EVAL_ROWS, N_REPEATS, importance_figure
+from modules.evaluation.explainability.metrics import explain as permutation_explain
+from modules.evaluation.explainability.shap_explainer import (
+    KERNEL_MAX_FEATURES, KERNEL_SAMPLE_ROWS, TREE_SAMPLE_ROWS, dependence_figure, explain, importance_frame,
+    summary_figure, supports_tree_shap,
+)
+
+
+def _occupied(counts: np.ndarray, axis: int) -> slice:
+    """Bins spanning the non-empty part of a histogram along one axis."""
+    other = tuple(a for a in range(counts.ndim) if a != axis)
+    nz = np.flatnonzero(counts.sum(axis=other) if other else counts)
+    return slice(nz[0], nz[-1] + 1) if len(nz) else slice(0, 0)
+
+
+def render_confusion(ev: ClassificationMetrics):
+    labels = [str(c) for c in ev.classes]
+    fig = px.imshow(ev.confusion, x=labels, y=labels, text_auto=True, title="Confusion Matrix",
+                    labels={"x": "Predicted", "y": "Actual", "color": "Rows"})
+    st.plotly_chart(fig)
+    if ev.unseen:
+        st.caption(f"{ev.unseen:,} test rows have labels not seen in training (counted as errors).")
+
+
+def _score_class(ev: ClassificationMetrics, key: str):
+    """Positive class for score-based views, or None when the model has no probabilities."""
+    if not ev.has_scores:
+        st.info("This model does not provide class probabilities.")
+        return None
+    if len(ev.classes) > 2:
+        return st.selectbox("Positive class (one-vs-rest)", list(ev.classes), key=key)
+    return ev.positive_class
+
+
+def render_curves(ev: ClassificationMetrics, key: str):
+    """ROC and precision-recall curves read from the binned score histograms."""
+    cls = _score_class(ev, key)
+    if cls is None:
+        return
+    roc, pr = ev.roc(cls), ev.pr(cls)
+    c1, c2 = st.columns(2)
+    fig = px.line(roc, x="fpr", y="tpr", hover_data=["threshold"], title=f"ROC (AUC = {ev.roc_auc(cls):.4f})")
+    fig.add_shape(type="line", line=dict(dash="dash"), x0=0, y0=0, x1=1, y1=1)
+    c1.plotly_chart(fig, use_container_width=True)
+    fig = px.line(pr, x="recall", y="precision", hover_data=["threshold"],
+                  title=f"Precision-Recall (AP = {ev.average_precision(cls):.4f})")
+    c2.plotly_chart(fig, use_container_width=True)
+
+
+def render_calibration(ev: ClassificationMetrics, key: str):
+    cls = _score_class(ev, key)
+    if cls is None:
+        return
+    n_bins = st.slider("Score bands", 5, 50, 10, key=f"{key}_bands")
+    curve = ev.calibration(cls, n_bins)
+    fig = px.line(curve, x="mean_predicted", y="fraction_positive", markers=True, hover_data=["rows"],
+                  title=f"Calibration ({cls})", range_x=[0, 1], range_y=[0, 1])
+    fig.add_shape(type="line", line=dict(dash="dash"), x0=0, y0=0, x1=1, y1=1)
+    st.plotly_chart(fig)
+    err = ev.calibration_error(cls)
+    st.caption(f"Brier score {err['brier']:.4f}; expected calibration error {err['ece']:.4f}.")
+
+
+def render_gains(ev: ClassificationMetrics, key: str):
+    cls = _score_class(ev, key)
+    if cls is None:
+        return
+    gains = ev.gains(cls)
+    c1, c2 = st.columns(2)
+    fig = px.line(gains, x="population", y="gain", hover_data=["threshold"], title=f"Cumulative Gain ({cls})")
+    fig.add_shape(type="line", line=dict(dash="dash"), x0=0, y0=0, x1=1, y1=1)
+    c1.plotly_chart(fig, use_container_width=True)
+    fig = px.line(gains, x="population", y="lift", hover_data=["threshold"], title="Lift")
+    fig.add_hline(y=1, line_dash="dash")
+    c2.plotly_chart(fig, use_container_width=True)
+
+
+def render_threshold_analysis(ev: ClassificationMetrics, key: str):
+    """Threshold slider and cost sweep; every value is a lookup into the cached threshold table."""
+    cls = _score_class(ev, key)
+    if cls is None:
+        return
+    c1, c2, c3 = st.columns(3)
+    threshold = c1.slider("Decision threshold", 0.0, 1.0, 0.5, step=0.001, key=f"{key}_threshold")
+    cost_fp = c2.number_input("Cost of a false positive", min_value=0.0, value=1.0, key=f"{key}_cost_fp")
+    cost_fn = c3.number_input("Cost of a false negative", min_value=0.0, value=1.0, key=f"{key}_cost_fn")
+
+    row = ev.at_threshold(threshold, cls)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Precision", f"{row['precision']:.4f}")
+    m2.metric("Recall", f"{row['recall']:.4f}")
+    m3.metric("F1", f"{row['f1']:.4f}")
+    m4.metric("Cost", f"{cost_fp * row['fp'] + cost_fn * row['fn']:,.0f}")
+    confusion = [[int(row["tn"]), int(row["fp"])], [int(row["fn"]), int(row["tp"])]]
+    labels = [f"not {cls}", str(cls)]
+    st.plotly_chart(px.imshow(confusion, x=labels, y=labels, text_auto=True, title=f"Confusion at {threshold:.3f}",
+                              labels={"x": "Predicted", "y": "Actual", "color": "Rows"}))
+
+    curve = ev.cost_curve(cost_fp, cost_fn, cls)
+    best = curve.loc[curve["cost"].idxmin()]
+    table = ev.threshold_table(cls)
+    fig = px.line(pd.concat([curve["cost"], table[["threshold", "precision", "recall", "f1"]]], axis=1),
+                  x="threshold", y="cost", hover_data=["precision", "recall", "f1"], title="Cost by Threshold")
+    fig.add_vline(x=threshold, line_dash="dash")
+    st.plotly_chart(fig)
+    st.caption(f"Lowest cost {best['cost']:,.0f} at threshold {best['threshold']:.3f}; "
+               f"best F1 {table['f1'].max():.4f} at {table.loc[table['f1'].idxmax(), 'threshold']:.3f}.")
+
+
+def render_actual_vs_predicted(ev: RegressionMetrics):
+    """Density of (actual, predicted) pairs from the binned grid, with the identity line."""
+    grid = ev.grid
+    if grid.lo is None:
+        st.info("No predictions to plot.")
+        return
+    rows, cols = _occupied(grid.counts, 0), _occupied(grid.counts, 1)
+    counts = grid.counts[rows, cols].T.astype(np.float64)
+    x, y = grid.centers(0)[rows], grid.centers(1)[cols]
+    # Log colour scale so sparse tails stay visible next to the dense core
+    fig = px.imshow(np.log1p(counts), x=x, y=y, origin="lower", aspect="auto", color_continuous_scale="Blues",
+                    labels={"x": "Actual", "y": "Predicted", "color": "log(1 + rows)"},
+                    title=f"Actual vs Predicted ({ev.n:,} rows)")
+    lo, hi = max(x[0], y[0]), min(x[-1], y[-1])
+    fig.add_shape(type="line", line=dict(dash="dash"), x0=lo, y0=lo, x1=hi, y1=hi)
+    st.plotly_chart(fig)
+
+
+def render_residuals(ev: RegressionMetrics):
+    hist: BinnedHistogram = ev.residual_hist
+    if hist.lo is None:
+        st.info("No predictions to plot.")
+        return
+    keep = _occupied(hist.counts, 0)
+    df = pd.DataFrame({"Residual": hist.centers()[keep], "Rows": hist.counts[keep]})
+    fig = px.bar(df, x="Residual", y="Rows", title="Residual Distribution")
+    fig.update_traces(width=hist.width[0])
+    st.plotly_chart(fig)
+    q = ev.summary()["residual_quantiles"]
+    st.caption("Residual quantiles: " + ", ".join(f"p{int(k * 100)} = {v:.4g}" for k, v in q.items()))
+
+
+def render_shap(model, X: pd.DataFrame, task: str, version: str = None, key: str = "shap"):
+    """SHAP summary / dependence plots for a sample of the test rows; values are cached per model and data."""
+    # KernelSHAP costs a few thousand predictions per row, so it starts from a smaller sample
+    tree = supports_tree_shap(model)
+    if not tree and X.shape[1] > KERNEL_MAX_FEATURES:
+        st.info(f"This model needs KernelSHAP, which supports at most {KERNEL_MAX_FEATURES} features "
+                f"(the design has {X.shape[1]:,}). Use permutation importance grouped by raw feature, "
+                "or a tree model for exact TreeSHAP.")
+        return
+    default = TREE_SAMPLE_ROWS if tree else KERNEL_SAMPLE_ROWS
+    c1, c2 = st.columns(2)
+    max_rows = c1.number_input("Rows to explain", min_value=1, max_value=len(X), value=min(len(X), default),
+                               step=50, key=f"{key}_rows")
+    if not st.session_state.get(f"{key}_on") and not c2.button("Compute SHAP values", key=f"{key}_run"):
+        return
+    st.session_state[f"{key}_on"] = True
+    with st.spinner("Explaining predictions..."):
+        expl = explain(model, X, task, version=version, max_rows=int(max_rows))
+    st.caption(f"{expl['method']} on {len(expl['X']):,} rows in {expl['seconds']:.1f}s (cached).")
+
+    output = 0
+    if len(expl["outputs"]) > 1:
+        output = expl["outputs"].index(st.selectbox("Output", expl["outputs"], key=f"{key}_output"))
+    st.plotly_chart(summary_figure(expl, output))
+    with st.expander("Mean |SHAP| per feature"):
+        st.dataframe(importance_frame(expl, output), use_container_width=True)
+
+    ranked = importance_frame(expl, output)["Feature"].tolist()
+    feature = st.selectbox("Dependence plot feature", ranked, key=f"{key}_feature")
+    color = st.selectbox("Colour by", ["(strongest interaction)"] + [c for c in ranked if c != feature],
+                         key=f"{key}_color")
+    st.plotly_chart(dependence_figure(expl, feature, output, None if color.startswith("(") else color))
+
+
+def render_lime(model, X: pd.DataFrame, task: str, version: str = None, key: str = "lime"):
+    """Local LIME explanations for a sample of the test rows, browsed one row at a time."""
+    c1, c2, c3 = st.columns(3)
+    max_rows = c1.number_input("Rows to explain", min_value=1, max_value=len(X), value=min(len(X), LIME_SAMPLE_ROWS),
+                               step=100, key=f"{key}_rows")
+    num_samples = c2.number_input("Perturbations per row", min_value=100, max_value=20_000, value=NUM_SAMPLES,
+                                  step=500, key=f"{key}_samples")
+    if not st.session_state.get(f"{key}_on") and not c3.button("Compute LIME explanations", key=f"{key}_run"):
+        return
+    st.session_state[f"{key}_on"] = True
+    with st.spinner("Explaining predictions..."):
+        expl = explain_lime(model, X, task, version=version, max_rows=int(max_rows), num_samples=int(num_samples))
+    st.caption(f"LIME on {len(expl['X']):,} rows in {expl['seconds']:.1f}s (cached); "
+               f"mean local fit R² {np.nanmean(expl['score']):.3f}.")
+
+    i = st.number_input("Explained row", min_value=0, max_value=len(expl["X"]) - 1, value=0, key=f"{key}_row")
+    st.plotly_chart(instance_figure(expl, int(i)))
+    st.caption(f"Test row {expl['X'].index[int(i)]}: local model predicts {expl['local_pred'][int(i)]:.4g} "
+               f"(fit R² {expl['score'][int(i)]:.3f}).")
+    with st.expander("Row values"):
+        st.dataframe(expl["X"].iloc[[int(i)]], use_container_width=True)
+    with st.expander("Mean |LIME weight| over explained rows"):
+        st.dataframe(lime_importance_frame(expl), use_container_width=True)
+
+
+def render_permutation_importance(model, X: pd.DataFrame, y, task: str, version: str = None, features: list = None,
+                                  key: str = "permutation"):
+    """Permutation importance for models without built-in importances; cached per model and data."""
+    st.caption("This model has no built-in feature importance; showing the drop in test score "
+               "when each feature is shuffled.")
+    c1, c2, c3 = st.columns(3)
+    max_rows = c1.number_input("Evaluation rows per repeat", min_value=1, max_value=len(X),
+                               value=min(len(X), EVAL_ROWS), step=500, key=f"{key}_rows")
+    n_repeats = c2.number_input("Repeats", min_value=2, max_value=50, value=N_REPEATS, key=f"{key}_repeats")
+    grouped = c3.checkbox("Group one-hot columns", value=True, disabled=not features, key=f"{key}_grouped")
+    if not st.session_state.get(f"{key}_on") and not st.button("Compute permutation importance", key=f"{key}_run"):
+        return
+    st.session_state[f"{key}_on"] = True
+    with st.spinner("Permuting features..."):
+        result = permutation_explain(model, X, y, task, version=version, features=features if grouped else None,
+                                     max_rows=int(max_rows), n_repeats=int(n_repeats))
+    st.plotly_chart(importance_figure(result))
+    st.caption(f"Baseline {result['metric']} {result['baseline']:.4f} on {result['rows']:,} rows per repeat; "
+               f"computed in {result['seconds']:.1f}s (cached).")
+    with st.expander("Importance table"):
+        st.dataframe(result["table"], use_container_width=True)
@@ -31,3 +31,38 @@ def render_export_page():
         
     with col2:
         st.info("Onnx export coming soon!")
+    
+    # Fitted feature transformers for scoring raw data the same way
+    pipelines = st.session_state.get("feature_pipelines", {})
+    pipeline = pipelines.get(st.session_state.get("active_dataset"))
+    if pipeline is not None and len(pipeline):
+        st.write("### Preprocessing Pipeline")
+        for step in pipeline.describe():
+            st.write(f"- {step}")
+        st.download_button(
+            label="Download Pipeline (.pkl)",
+            data=pipeline.dumps(),
+            file_name="autods_feature_pipeline.pkl",
+            mime="application/octet-stream"
+        )
+    
+    # Encoded input schema: raw features, column order and categories the model expects
+    design = st.session_state.get("model_design")
+    if design is not None:
+        st.write("### Model Input Schema")
+        st.write(f"{len(design.features)} raw features -> {len(design.columns)} encoded columns")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="Download Input Schema (.json)",
+                data=design.schema_json(),
+                file_name="autods_input_schema.json",
+                mime="application/json"
+            )
+        with col2:
+            st.download_button(
+                label="Download Encoder (.pkl)",
+                data=pickle.dumps(design.encoder),
+                file_name="autods_encoder.pkl",
+                mime="application/octet-stream"
+            )
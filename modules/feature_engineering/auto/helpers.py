@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_selection import mutual_info_classif, mutual_info_regression
+
+from core.correlation import correlation_matrix
+
+# ---------------------------------------------------------
+# AUTO FEATURE SELECTION
+# One blocked correlation matrix drives everything: highly correlated
+# clusters are connected components of |r| >= threshold, and VIFs are
+# the diagonal of its inverse. Dropping a feature downdates the inverse
+# (Schur complement, O(p^2)) instead of re-running one regression per
+# column. Mutual information on a row sample decides who survives.
+# ---------------------------------------------------------
+CORR_THRESHOLD = 0.9
+VIF_THRESHOLD = 10.0
+MI_SAMPLE_ROWS = 5_000
+MAX_VIF_COLS = 2_000
+
+
+def correlation_clusters(corr: pd.DataFrame, threshold: float = CORR_THRESHOLD) -> list:
+    """Groups (size >= 2) of columns linked by |r| >= threshold."""
+    vals = np.abs(np.nan_to_num(corr.to_numpy()))
+    np.fill_diagonal(vals, 0.0)
+    n_comp, labels = connected_components(csr_matrix(vals >= threshold), directed=False)
+    sizes = np.bincount(labels, minlength=n_comp)
+    cols = corr.columns.to_numpy()
+    return [cols[labels == g].tolist() for g in np.flatnonzero(sizes > 1)]
+
+
+def vif_scores(corr: pd.DataFrame) -> pd.Series:
+    """Variance inflation factors: diag(R^-1) of the correlation matrix."""
+    inv = _inverse(corr.to_numpy())
+    return pd.Series(np.diag(inv), index=corr.columns)
+
+
+def _inverse(R: np.ndarray) -> np.ndarray:
+    R = np.nan_to_num(R)
+    # Tiny ridge keeps exactly collinear sets invertible (their VIF becomes huge)
+    return np.linalg.inv(R + 1e-8 * np.eye(len(R)))
+
+
+def prune_vif(corr: pd.DataFrame, threshold: float = VIF_THRESHOLD, protect=None) -> tuple:
+    """
+    Repeatedly drop the highest-VIF column until all VIFs <= threshold.
+    The inverse is downdated after each removal instead of recomputed.
+    Returns (dropped [(column, vif)], final VIF Series).
+    """
+    cols = corr.columns.tolist()
+    inv = _inverse(corr.to_numpy())
+    alive = np.ones(len(cols), dtype=bool)
+    protect = set(protect or [])
+    dropped = []
+
+    while alive.sum() > 1:
+        vif = np.where(alive, np.diag(inv), -np.inf)
+        order = np.argsort(-vif)
+        k = next((i for i in order if alive[i] and cols[i] not in protect), None)
+        if k is None or vif[k] <= threshold:
+            break
+        dropped.append((cols[k], float(vif[k])))
+        # inv(R without k) = A - b b^T / d  (Schur complement of the removed pivot)
+        b = inv[:, k].copy()
+        inv -= np.outer(b, b) / inv[k, k]
+        inv[k, :] = 0.0
+        inv[:, k] = 0.0
+        alive[k] = False
+
+    final = pd.Series(np.diag(inv)[alive], index=np.asarray(cols)[alive])
+    return dropped, final
+
+
+def rank_features(df: pd.DataFrame, cols: list, target: str = None,
+                  sample_rows: int = MI_SAMPLE_ROWS, random_state: int = 0) -> pd.Series:
+    """
+    Mutual information with the target on a row sample (higher = keep).
+    Without a target, columns are ranked by how many non-null values they have.
+    """
+    if not target:
+        return df[cols].notna().sum().astype(np.float64)
+
+    data = df[cols + [target]].dropna(subset=[target])
+    if len(data) > sample_rows:
+        data = data.sample(sample_rows, random_state=random_state)
+    X = data[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+    X = np.nan_to_num(X)
+    y = data[target]
+
+    if pd.api.types.is_numeric_dtype(y) and y.nunique() > 20:
+        mi = mutual_info_regression(X, y.to_numpy(dtype=np.float64), random_state=random_state)
+    else:
+        mi = mutual_info_classif(X, pd.factorize(y)[0], random_state=random_state)
+    return pd.Series(mi, index=cols)
+
+
+def select_features(df: pd.DataFrame, target: str = None, corr_threshold: float = CORR_THRESHOLD,
+                    vif_threshold: float = VIF_THRESHOLD, sample_rows: int = MI_SAMPLE_ROWS) -> dict:
+    """
+    Redundancy pruning for the numeric features of df.
+    Returns keep / drop lists, a reason per dropped column, clusters, VIFs and ranking.
+    """
+    cols = [c for c in df.select_dtypes(include=["number", "bool"]).columns if c != target]
+    reasons = {}
+
+    # Constant columns carry no information and break the correlation matrix
+    data = df[cols].astype(np.float64) if any(df[c].dtype == bool for c in cols) else df[cols]
+    constant = [c for c, v in data.nunique(dropna=True).items() if v <= 1]
+    for c in constant:
+        reasons[c] = "constant"
+    cols = [c for c in cols if c not in reasons]
+    if not cols:
+        return {"keep": [], "drop": list(reasons), "reasons": reasons, "clusters": [],
+                "vif": pd.Series(dtype=np.float64), "ranking": pd.Series(dtype=np.float64)}
+
+    corr = correlation_matrix(data, cols)
+    ranking = rank_features(df, cols, target, sample_rows)
+
+    # 1. Correlation clusters: keep the best-ranked member of each
+    clusters = correlation_clusters(corr, corr_threshold)
+    for group in clusters:
+        best = ranking[group].idxmax()
+        for c in group:
+            if c != best:
+                reasons[c] = f"correlated with {best} (|r| = {abs(corr.at[c, best]):.2f})"
+
+    # 2. VIF pruning on the survivors
+    survivors = [c for c in cols if c not in reasons]
+    vif = pd.Series(dtype=np.float64)
+    if 1 < len(survivors) <= MAX_VIF_COLS:
+        dropped, vif = prune_vif(corr.loc[survivors, survivors], vif_threshold)
+        for c, v in dropped:
+            reasons[c] = f"VIF {v:.1f} > {vif_threshold:g}"
+
+    keep = [c for c in cols if c not in reasons]
+    return {
+        "keep": keep,
+        "drop": list(reasons),
+        "reasons": reasons,
+        "clusters": clusters,
+        "vif": vif,
+        "ranking": ranking.sort_values(ascending=False),
+    }
+
+
+class FeatureSelector(BaseEstimator, TransformerMixin):
+    """Pipeline step that drops the columns select_features() marks as redundant."""
+
+    def __init__(self, target=None, corr_threshold=CORR_THRESHOLD, vif_threshold=VIF_THRESHOLD):
+        self.target = target
+        self.corr_threshold = corr_threshold
+        self.vif_threshold = vif_threshold
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.report_ = select_features(X, self.target, self.corr_threshold, self.vif_threshold)
+        self.drop_ = self.report_["drop"]
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        return X.drop(columns=self.drop_, errors="ignore")
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler
 from core.data_manager import DataManager
+from modules.feature_engineering.transformers.encoding import CategoricalEncoder, TargetEncoder
+from modules.feature_engineering.transformers.scaling import ColumnScaler
+from modules.feature_engineering.auto.helpers import FeatureSelector
 
 def render_auto_feature_engineering():
     st.header("🤖 Auto-Feature Engineering")
@@ -13,38 +15,73 @@ def render_auto_feature_engineering():
     dataset_name = st.session_state["active_dataset"]
     df = st.session_state["cloud_datasets"][dataset_name]
     
-    st.info("Pipeline Strategy:\n1. Encode all categorical variables (Label Encoding for high cardinality, One-Hot for low)\n2. Scale all numeric variables (StandardScaler)")
+    st.info("Pipeline Strategy:\n1. Encode all categorical variables (Target Encoding for high cardinality when a target is set, otherwise Label Encoding; One-Hot for low)\n2. Scale all numeric variables (StandardScaler)\n3. Drop redundant features (correlation clusters, VIF; mutual information picks the survivor)")
+    
+    target = st.selectbox("Target Column (optional, enables target encoding)", ["None"] + df.columns.tolist(), key="auto_fe_target")
+    target = None if target == "None" else target
+    
+    select = st.checkbox("Drop redundant features (multicollinearity)", value=True, key="auto_fe_select")
     
     if st.button("🚀 Run Auto-Features"):
         df_new = df.copy()
         report = []
+        # Fitted transformers are kept so new data can be scored without refitting
+        pipeline = DataManager.get_feature_pipeline(dataset_name)
         
         # 1. Handle Categorical
-        cat_cols = df_new.select_dtypes(include=['object', 'category']).columns
-        for col in cat_cols:
-            if df_new[col].nunique() < 10:
-                df_new = pd.get_dummies(df_new, columns=[col], drop_first=True)
-                report.append(f"One-Hot Encoded: {col}")
-            else:
-                le = LabelEncoder()
-                df_new[col] = le.fit_transform(df_new[col].astype(str))
-                report.append(f"Label Encoded: {col}")
+        cat_cols = df_new.select_dtypes(include=['object', 'category']).columns.drop(target, errors="ignore")
+        if len(cat_cols):
+            # One encoder for all columns: factorized once, one-hot built in a single block
+            cardinality = df_new[cat_cols].nunique()
+            onehot_cols = cardinality[cardinality < 10].index.tolist()
+            label_cols = cardinality[cardinality >= 10].index.tolist()
+            if target and label_cols:
+                # Out-of-fold target means: one column per feature instead of arbitrary codes
+                target_encoder = TargetEncoder(columns=label_cols, target=target)
+                df_new = pipeline.fit_apply("auto_target_encode", target_encoder, df_new)
+                report.extend(f"Target Encoded: {col}" for col in label_cols)
+                label_cols = []
+            encoder = CategoricalEncoder(onehot_cols=onehot_cols, label_cols=label_cols, drop_first=True)
+            df_new = pipeline.fit_apply("auto_encode", encoder, df_new)
+            report.extend(f"One-Hot Encoded: {col}" for col in onehot_cols)
+            report.extend(f"Label Encoded: {col}" for col in label_cols)
                 
         # 2. Handle Numeric (Scaling)
         num_cols = df_new.select_dtypes(include=['number']).columns
         # Exclude target variable if known? For now scale everything except potential ID-like columns (heuristic needed)
         # Simple heuristic: don't scale int columns that act as IDs? 
         # For simplicity, scale floats.
-        float_cols = df_new.select_dtypes(include=['float']).columns
+        float_cols = df_new.select_dtypes(include=['float']).columns.drop(target, errors="ignore")
         if not float_cols.empty:
-            scaler = StandardScaler()
-            df_new[float_cols] = scaler.fit_transform(df_new[float_cols])
+            scaler = ColumnScaler(columns=float_cols.tolist(), method="standard")
+            df_new = pipeline.fit_apply("auto_scale", scaler, df_new)
             report.append(f"Standard Scaled {len(float_cols)} columns.")
+        
+        # 3. Feature Selection (redundancy pruning)
+        selection = None
+        if select:
+            with st.spinner("Checking multicollinearity..."):
+                selector = FeatureSelector(target=target)
+                df_new = pipeline.fit_apply("auto_select", selector, df_new)
+            selection = selector.report_
+            report.append(f"Dropped {len(selection['drop'])} redundant features, kept {len(selection['keep'])}.")
             
-        DataManager.save_dataset(df_new, dataset_name, version_note="auto_fe")
+        DataManager.save_dataset(df_new, dataset_name, version_note="auto_fe", pipeline=pipeline)
         st.session_state["cloud_datasets"][dataset_name] = df_new
         
         st.success("Feature Engineering Complete!")
         for r in report:
             st.write(f"- {r}")
         st.dataframe(df_new.head())
+        
+        if selection and selection["drop"]:
+            with st.expander("🔎 Feature Selection Details"):
+                st.write("**Dropped features**")
+                st.dataframe(pd.DataFrame({"feature": list(selection["reasons"]), "reason": list(selection["reasons"].values())}),
+                             use_container_width=True, hide_index=True)
+                if selection["clusters"]:
+                    st.write("**Correlation clusters**")
+                    for group in selection["clusters"]:
+                        st.write(f"- {', '.join(map(str, group))}")
+                st.write("**Ranking** (mutual information with target)" if target else "**Ranking** (non-null count)")
+                st.dataframe(selection["ranking"].rename("score").to_frame(), use_container_width=True)
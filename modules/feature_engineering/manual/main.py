@@ -1,7 +1,13 @@
+import os
 import streamlit as st
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler, MinMaxScaler
 from core.data_manager import DataManager
+from core.sampling import DEFAULT_SAMPLE_ROWS, LARGE_DATASET_ROWS, sample_parquet
+from core.utils.caching import stamp_version
+from modules.feature_engineering.transformers.encoding import CategoricalEncoder
+from modules.feature_engineering.transformers.scaling import ColumnScaler, SCALING_METHODS
+from modules.feature_engineering.transformers.datetime import DatetimeFeatureExtractor, DATETIME_FEATURES
+from modules.feature_engineering.transformers.polynomial import PolynomialFeatureGenerator, count_terms
+from modules.feature_engineering.transformers.custom import FormulaFeatures, FormulaError, parse_formula_block
 
 def render_manual_feature_engineering():
     st.header("🛠️ Manual Feature Engineering")
@@ -34,16 +40,16 @@ def render_manual_feature_engineering():
         method = st.selectbox("Method", ["Label Encoding", "One-Hot Encoding"])
         
         if st.button("Apply Encoding"):
-            df_new = df.copy()
             if method == "Label Encoding":
-                le = LabelEncoder()
-                df_new[target_col] = le.fit_transform(df_new[target_col].astype(str))
+                encoder = CategoricalEncoder(onehot_cols=[], label_cols=[target_col])
                 note = "label_encoded"
             elif method == "One-Hot Encoding":
-                df_new = pd.get_dummies(df_new, columns=[target_col], prefix=target_col)
+                encoder = CategoricalEncoder(onehot_cols=[target_col])
                 note = "one_hot"
+            pipeline = DataManager.get_feature_pipeline(dataset_name)
+            df_new = pipeline.fit_apply(note, encoder, df)
                 
-            DataManager.save_dataset(df_new, dataset_name, version_note=note)
+            DataManager.save_dataset(df_new, dataset_name, version_note=note, pipeline=pipeline)
             st.session_state["cloud_datasets"][dataset_name] = df_new
             st.success(f"Applied {method} on {target_col}")
             st.rerun()
@@ -54,19 +60,112 @@ def render_manual_feature_engineering():
         num_cols = df.select_dtypes(include=['number']).columns
         
         target_cols_scale = st.multiselect("Select Columns to Scale", num_cols)
-        scale_method = st.selectbox("Scaling Method", ["StandardScaler (Z-Score)", "MinMaxScaler (0-1)"])
+        scale_method = st.selectbox("Scaling Method", list(SCALING_METHODS.keys()))
+        
+        # Out-of-core: fit and write from the parquet row groups on disk
+        source_path = DataManager.resolve_path(dataset_name)
+        stream = st.checkbox("Stream from disk (constant memory)", value=False, disabled=source_path is None,
+                             help="Fits the scaler row group by row group and writes the scaled version directly to parquet.")
         
         if st.button("Apply Scaling"):
             if target_cols_scale:
-                df_new = df.copy()
-                if scale_method.startswith("Standard"):
-                    scaler = StandardScaler()
+                scaler = ColumnScaler(columns=target_cols_scale, method=SCALING_METHODS[scale_method])
+                pipeline = DataManager.get_feature_pipeline(dataset_name)
+                
+                if stream and source_path:
+                    with st.spinner("Streaming row groups..."):
+                        scaler.fit_stream(DataManager.iter_row_groups(source_path, columns=target_cols_scale))
+                        # The step joins the session pipeline only once the version is written
+                        out_path = DataManager.stream_transform(source_path, scaler, dataset_name, version_note="scaled",
+                                                                pipeline=pipeline.copy().add("scaled", scaler))
+                    # The full version stays on disk; the session holds it only when it is small
+                    rows = sum(DataManager.row_group_sizes(out_path)) if out_path else 0
+                    if out_path is None:
+                        df_new = None
+                        st.error("The saved dataset has no rows to stream.")
+                    elif rows > LARGE_DATASET_ROWS:
+                        df_new = stamp_version(sample_parquet(out_path, DEFAULT_SAMPLE_ROWS),
+                                               f"sample:{os.path.basename(out_path)}")
+                        st.toast(f"Working on a {len(df_new):,}-row sample; all {rows:,} scaled rows "
+                                 f"are saved as {os.path.basename(out_path)}.", icon="⚡")
+                    else:
+                        df_new = stamp_version(DataManager.load_dataset(os.path.basename(out_path)),
+                                               os.path.basename(out_path))
                 else:
-                    scaler = MinMaxScaler()
-                    
-                df_new[target_cols_scale] = scaler.fit_transform(df_new[target_cols_scale])
+                    df_new = pipeline.fit_apply("scaled", scaler, df)
+                    DataManager.save_dataset(df_new, dataset_name, version_note="scaled", pipeline=pipeline)
+                
+                if df_new is not None:
+                    st.session_state["cloud_datasets"][dataset_name] = df_new
+                    st.success(f"Scaled {len(target_cols_scale)} columns.")
+                    st.rerun()
+
+    # --- POLYNOMIAL / INTERACTION FEATURES ---
+    st.subheader("Polynomial & Interaction Features")
+    num_all = df.select_dtypes(include=['number']).columns.tolist()
+    c_p1, c_p2 = st.columns(2)
+    poly_target = c_p1.selectbox("Screen against target (optional)", ["None"] + df.columns.tolist(), key="fe_poly_target")
+    poly_cols = c_p1.multiselect("Base Columns", [c for c in num_all if c != poly_target], key="fe_poly_cols")
+    poly_degree = c_p2.slider("Max Degree", 2, 4, 2, key="fe_poly_degree")
+    poly_k = c_p2.number_input("Keep Top-k Terms", min_value=1, max_value=1000, value=20, key="fe_poly_k")
+    interaction_only = st.checkbox("Interactions only (no powers)", value=False, key="fe_poly_inter")
+    
+    if poly_cols:
+        st.caption(f"{count_terms(len(poly_cols), poly_degree, interaction_only):,} candidate terms will be screened on a sample.")
+    
+    if st.button("Generate Polynomial Features"):
+        if len(poly_cols) >= 1:
+            gen = PolynomialFeatureGenerator(columns=poly_cols, degree=poly_degree, interaction_only=interaction_only,
+                                             top_k=int(poly_k), target=None if poly_target == "None" else poly_target)
+            pipeline = DataManager.get_feature_pipeline(dataset_name)
+            with st.spinner("Screening candidate terms..."):
+                df_new = pipeline.fit_apply("polynomial", gen, df)
+            
+            DataManager.save_dataset(df_new, dataset_name, version_note="poly_features", pipeline=pipeline)
+            st.session_state["cloud_datasets"][dataset_name] = df_new
+            st.success(f"Added {len(gen.terms_)} of {gen.n_candidates_:,} candidate terms.")
+            st.rerun()
+
+    # --- CUSTOM FORMULA FEATURES ---
+    st.subheader("Custom Formula Features")
+    formula_text = st.text_area(
+        "One feature per line: name = formula",
+        placeholder="unit_price = price / (qty + 1)\nlog_income = log1p(`annual income`)",
+        key="fe_formula_text",
+        help="Operators: + - * / ** %, comparisons, and/or/not. Functions: log, log1p, exp, sqrt, abs, where(cond, a, b), ... "
+             "Put column names with spaces in backticks."
+    )
+    
+    if st.button("Add Formula Features"):
+        try:
+            formulas = parse_formula_block(formula_text)
+            if formulas:
+                pipeline = DataManager.get_feature_pipeline(dataset_name)
+                df_new = pipeline.fit_apply("formulas", FormulaFeatures(formulas), df)
+                
+                DataManager.save_dataset(df_new, dataset_name, version_note="formula_features", pipeline=pipeline)
+                st.session_state["cloud_datasets"][dataset_name] = df_new
+                st.success(f"Added {len(formulas)} formula features.")
+                st.rerun()
+        except FormulaError as e:
+            st.error(str(e))
+
+    # --- DATE/TIME FEATURES ---
+    date_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+    if date_cols:
+        st.subheader("Date/Time Features")
+        c_dt1, c_dt2 = st.columns(2)
+        dt_cols = c_dt1.multiselect("Datetime Columns", date_cols, default=date_cols)
+        dt_feats = c_dt2.multiselect("Features", DATETIME_FEATURES, default=["year", "month", "day", "weekday"])
+        drop_orig = st.checkbox("Drop original datetime columns", value=False)
+        
+        if st.button("Extract Features"):
+            if dt_cols and dt_feats:
+                extractor = DatetimeFeatureExtractor(columns=dt_cols, features=dt_feats, drop_original=drop_orig)
+                pipeline = DataManager.get_feature_pipeline(dataset_name)
+                df_new = pipeline.fit_apply("datetime_features", extractor, df)
                 
-                DataManager.save_dataset(df_new, dataset_name, version_note="scaled")
+                DataManager.save_dataset(df_new, dataset_name, version_note="dt_features", pipeline=pipeline)
                 st.session_state["cloud_datasets"][dataset_name] = df_new
-                st.success(f"Scaled {len(target_cols_scale)} columns.")
+                st.success(f"Extracted {len(dt_cols) * len(dt_feats)} features.")
                 st.rerun()
@@ -0,0 +1,332 @@
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+try:
+    import numexpr as ne
+except ImportError:  # optional: falls back to NumPy evaluation
+    ne = None
+
+# ---------------------------------------------------------
+# CUSTOM FORMULA FEATURES
+# Formulas such as  log(price) / (qty + 1)  are parsed into a Python
+# AST, checked against a whitelist and the dataset schema, and
+# rewritten to reference internal array names. Every node is typed
+# as boolean or numeric, so logical operators, where() conditions and
+# arithmetic get operands that both engines accept. Subexpressions shared
+# by several formulas are hoisted into temporaries computed once; each
+# remaining expression is evaluated in a single blocked, multithreaded
+# numexpr pass (plain NumPy ufuncs when numexpr is not installed).
+# ---------------------------------------------------------
+FUNCTIONS = {
+    "log": 1, "log10": 1, "log1p": 1, "exp": 1, "expm1": 1, "sqrt": 1, "abs": 1,
+    "sin": 1, "cos": 1, "tan": 1, "arcsin": 1, "arccos": 1, "arctan": 1, "arctan2": 2,
+    "sinh": 1, "cosh": 1, "tanh": 1, "where": 3,
+}
+
+_NUMPY_FUNCS = {name: getattr(np, "abs" if name == "abs" else name) for name in FUNCTIONS}
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.BitAnd, ast.BitOr)
+_UNARY_OPS = (ast.USub, ast.UAdd, ast.Invert, ast.Not)
+_CMP_OPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_BACKTICK = re.compile(r"`([^`]+)`")
+
+
+class FormulaError(ValueError):
+    """Raised when a formula is not valid or does not match the dataset schema."""
+
+
+# ---------------------------
+# PARSING & VALIDATION
+# ---------------------------
+class _Resolver(ast.NodeTransformer):
+    """
+    Validates a parsed formula and rewrites column names to internal array names.
+    Each returned node carries kind = "bool" or "num".
+    """
+
+    def __init__(self, columns: dict, quoted: dict, formula: str, bool_columns=()):
+        self.columns = columns  # column -> internal name
+        self.quoted = quoted    # placeholder -> column (for `backtick names`)
+        self.formula = formula
+        self.bool_columns = set(bool_columns)
+        self.names = {v: k for k, v in columns.items()}
+        self.used = set()
+
+    def fail(self, msg: str):
+        raise FormulaError(f"{msg} in formula: {self.formula}")
+
+    def expect(self, node, kind: str, context: str):
+        if node.kind != kind:
+            hint = "; use where(condition, 1, 0) for a number" if kind == "num" else "; compare it first, e.g. x > 0"
+            self.fail(f"{context} needs a {'boolean' if kind == 'bool' else 'numeric'} operand, "
+                      f"got '{self.source(node)}'{hint}")
+
+    def source(self, node) -> str:
+        """Formula text of a rewritten node, with the user's column names."""
+        return re.sub(r"\b_c\d+\b", lambda m: self.names[m.group()], ast.unparse(node))
+
+    @staticmethod
+    def typed(node, kind: str):
+        node.kind = kind
+        return node
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Name(self, node):
+        col = self.quoted.get(node.id, node.id)
+        if col not in self.columns:
+            self.fail(f"Unknown or non-numeric column '{col}'")
+        self.used.add(col)
+        out = ast.copy_location(ast.Name(id=self.columns[col], ctx=ast.Load()), node)
+        return self.typed(out, "bool" if col in self.bool_columns else "num")
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            self.fail(f"Unsupported constant {node.value!r}")
+        return self.typed(node, "num")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BIN_OPS):
+            self.fail(f"Operator '{type(node.op).__name__}' is not allowed")
+        node = self.generic_visit(node)
+        kind = "bool" if isinstance(node.op, (ast.BitAnd, ast.BitOr)) else "num"
+        symbol = {"bool": "'&' / '|'", "num": "Arithmetic"}[kind]
+        self.expect(node.left, kind, symbol)
+        self.expect(node.right, kind, symbol)
+        return self.typed(node, kind)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPS):
+            self.fail(f"Operator '{type(node.op).__name__}' is not allowed")
+        node = self.generic_visit(node)
+        kind = "bool" if isinstance(node.op, (ast.Not, ast.Invert)) else "num"
+        self.expect(node.operand, kind, "'not' / '~'" if kind == "bool" else "Unary minus")
+        # numexpr has no 'not'; '~' works on boolean arrays in both engines
+        if isinstance(node.op, ast.Not):
+            node.op = ast.Invert()
+        return self.typed(node, kind)
+
+    def visit_BoolOp(self, node):
+        node = self.generic_visit(node)
+        for value in node.values:
+            self.expect(value, "bool", "'and' / 'or'")
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        out = node.values[0]
+        for value in node.values[1:]:
+            out = ast.BinOp(left=out, op=op, right=value)
+        return self.typed(out, "bool")
+
+    def visit_Compare(self, node):
+        if len(node.ops) != 1 or not isinstance(node.ops[0], _CMP_OPS):
+            self.fail("Only single comparisons (a < b) are allowed; combine them with 'and' / 'or'")
+        return self.typed(self.generic_visit(node), "bool")
+
+    def visit_Call(self, node):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in FUNCTIONS:
+            self.fail(f"Function '{ast.unparse(node.func)}' is not allowed")
+        if node.keywords or len(node.args) != FUNCTIONS[name]:
+            self.fail(f"{name}() takes {FUNCTIONS[name]} positional argument(s)")
+        node.args = [self.visit(a) for a in node.args]
+        if name == "where":
+            self.expect(node.args[0], "bool", "where() condition")
+            kind = "bool" if all(a.kind == "bool" for a in node.args[1:]) else "num"
+            return self.typed(node, kind)
+        for arg in node.args:
+            self.expect(arg, "num", f"{name}()")
+        return self.typed(node, "num")
+
+    def generic_visit(self, node):
+        allowed = (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Call, ast.Name, ast.Constant,
+                   ast.Load, ast.operator, ast.unaryop, ast.cmpop, ast.boolop)
+        if not isinstance(node, allowed):
+            self.fail(f"'{type(node).__name__}' expressions are not allowed")
+        return super().generic_visit(node)
+
+
+def numeric_columns(df: pd.DataFrame) -> list:
+    return df.select_dtypes(include=["number", "bool"]).columns.tolist()
+
+
+def parse_formula(formula: str, columns: dict, bool_columns=()) -> tuple:
+    """Parse one formula against {column: internal name}; returns (expression AST, columns used)."""
+    quoted = {}
+
+    def _quote(m):
+        key = f"__q{len(quoted)}__"
+        quoted[key] = m.group(1)
+        return key
+
+    source = _BACKTICK.sub(_quote, formula.strip())
+    if not source:
+        raise FormulaError("Empty formula")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Syntax error in formula: {formula} ({e.msg})") from None
+
+    resolver = _Resolver(columns, quoted, formula, bool_columns)
+    tree = resolver.visit(tree)
+    return tree.body, resolver.used
+
+
+# ---------------------------
+# COMMON SUBEXPRESSIONS
+# ---------------------------
+def _is_leaf(node) -> bool:
+    return isinstance(node, (ast.Name, ast.Constant))
+
+
+def _subtree_counts(trees: list) -> dict:
+    counts = {}
+    for tree in trees:
+        for node in ast.walk(tree):
+            if not _is_leaf(node) and isinstance(node, ast.expr):
+                key = ast.dump(node)
+                counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class _Hoister(ast.NodeTransformer):
+    """Replaces repeated subtrees with temporaries (inner ones are defined first)."""
+
+    def __init__(self, counts: dict):
+        self.counts = counts
+        self.temps = {}  # dump -> (name, body AST), insertion order = evaluation order
+
+    def visit(self, node):
+        if _is_leaf(node) or not isinstance(node, ast.expr):
+            return super().visit(node)
+        key = ast.dump(node)
+        if self.counts.get(key, 0) < 2:
+            return self.generic_visit(node)
+        if key not in self.temps:
+            body = self.generic_visit(ast.parse(ast.unparse(node), mode="eval").body)
+            self.temps[key] = (f"_t{len(self.temps)}", body)
+        return ast.Name(id=self.temps[key][0], ctx=ast.Load())
+
+
+class _Inliner(ast.NodeTransformer):
+    def __init__(self, bodies: dict):
+        self.bodies = bodies
+
+    def visit_Name(self, node):
+        return self.visit(self.bodies[node.id]) if node.id in self.bodies else node
+
+
+def compile_formulas(formulas: dict, df: pd.DataFrame):
+    """
+    Validate {feature name: formula} against df and build an evaluation plan.
+    Returns (inputs {internal: column}, temps [(name, expr)], outputs [(feature, expr)]).
+    """
+    cols = numeric_columns(df)
+    internal = {c: f"_c{i}" for i, c in enumerate(cols)}
+    bools = [c for c in cols if pd.api.types.is_bool_dtype(df[c])]
+
+    trees, used = {}, set()
+    for name, formula in formulas.items():
+        if not name or not str(name).strip():
+            raise FormulaError(f"Missing feature name for formula: {formula}")
+        trees[name], cols_used = parse_formula(formula, internal, bools)
+        used |= cols_used
+
+    hoister = _Hoister(_subtree_counts(list(trees.values())))
+    outputs = {name: hoister.visit(tree) for name, tree in trees.items()}
+    temps = list(hoister.temps.values())
+
+    # A subtree shared only inside one hoisted parent is used once: inline it back
+    refs = {}
+    for node in [body for _, body in temps] + list(outputs.values()):
+        for sub in ast.walk(node):
+            if isinstance(sub, ast.Name) and sub.id.startswith("_t"):
+                refs[sub.id] = refs.get(sub.id, 0) + 1
+    single = {name: body for name, body in temps if refs.get(name, 0) < 2}
+    inliner = _Inliner(single)
+    temps = [(name, ast.unparse(inliner.visit(body))) for name, body in temps if name not in single]
+    outputs = [(name, ast.unparse(inliner.visit(tree))) for name, tree in outputs.items()]
+
+    inputs = {internal[c]: c for c in cols if c in used}
+    return inputs, temps, outputs
+
+
+# ---------------------------
+# EVALUATION
+# ---------------------------
+def _evaluate(expr: str, arrays: dict) -> np.ndarray:
+    if ne is not None:
+        return ne.evaluate(expr, local_dict=arrays)
+    # Safe: the expression only contains whitelisted nodes and internal names
+    with np.errstate(all="ignore"):
+        return eval(compile(expr, "<formula>", "eval"), {"__builtins__": {}}, {**_NUMPY_FUNCS, **arrays})
+
+
+def evaluate_plan(df: pd.DataFrame, inputs: dict, temps: list, outputs: list) -> pd.DataFrame:
+    arrays = {}
+    for key, col in inputs.items():
+        values = df[col]
+        arrays[key] = values.to_numpy(dtype=bool) if pd.api.types.is_bool_dtype(values) \
+            else values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    for name, expr in temps:
+        arrays[name] = _evaluate(expr, arrays)
+
+    result = {}
+    for name, expr in outputs:
+        values = np.broadcast_to(_evaluate(expr, arrays), (len(df),))
+        values = values.astype(np.float64) if values.dtype != bool else values.copy()
+        if values.dtype != bool:
+            values[np.isinf(values)] = np.nan
+        result[name] = values
+    return pd.DataFrame(result, index=df.index)
+
+
+class FormulaFeatures(BaseEstimator, TransformerMixin):
+    """
+    Adds one column per {name: formula}. Column names with spaces go in backticks.
+    Allowed: + - * / ** %, comparisons, and / or / not, and the FUNCTIONS whitelist.
+    Division by zero and log(0) give NaN instead of inf.
+    """
+
+    def __init__(self, formulas=None):
+        self.formulas = formulas
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.inputs_, self.temps_, self.outputs_ = compile_formulas(dict(self.formulas or {}), X)
+        # Dry run on a few rows, so any remaining engine error surfaces as a FormulaError here
+        try:
+            evaluate_plan(X.iloc[:8], self.inputs_, self.temps_, self.outputs_)
+        except Exception as e:
+            raise FormulaError(f"Formulas cannot be evaluated: {e}") from None
+        return self
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([name for name, _ in self.outputs_], dtype=object)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        missing = [c for c in self.inputs_.values() if c not in X.columns]
+        if missing:
+            raise FormulaError(f"Columns required by the formulas are missing: {missing}")
+        feats = evaluate_plan(X, self.inputs_, self.temps_, self.outputs_)
+        base = X.drop(columns=[c for c in feats.columns if c in X.columns])
+        return pd.concat([base, feats], axis=1)
+
+
+def parse_formula_block(text: str) -> dict:
+    """'name = formula' per line (blank lines and # comments ignored) -> {name: formula}."""
+    formulas = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, sep, formula = line.partition("=")
+        # 'a == b' without a name is not an assignment
+        if not sep or formula.startswith("="):
+            raise FormulaError(f"Expected 'name = formula', got: {line}")
+        formulas[name.strip().strip("`")] = formula.strip()
+    return formulas
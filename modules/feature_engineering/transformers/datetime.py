@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# ---------------------------------------------------------
+# DATETIME FEATURE EXTRACTION
+# Calendar parts are derived with datetime64 unit arithmetic on the
+# raw int64 buffer instead of the pandas .dt accessors, which keeps
+# scoring-time extraction to a handful of NumPy ops per feature.
+# ---------------------------------------------------------
+DATETIME_FEATURES = ["year", "month", "day", "weekday", "hour", "minute", "dayofyear", "is_weekend"]
+
+
+def _as_datetime64(series: pd.Series, tz=None) -> np.ndarray:
+    """datetime64[ns] values (UTC wall-clock converted to the fitted tz, then made naive)."""
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors="coerce")
+    if series.dt.tz is not None:
+        series = series.dt.tz_convert(tz or series.dt.tz).dt.tz_localize(None)
+    return series.to_numpy(dtype="datetime64[ns]")
+
+
+def datetime_parts(values: np.ndarray, features: list) -> np.ndarray:
+    """(n x len(features)) float32 block; NaT rows become NaN."""
+    nat = np.isnat(values)
+    days = values.astype("datetime64[D]")
+    out = np.empty((len(values), len(features)), dtype=np.float32)
+
+    for j, feat in enumerate(features):
+        if feat == "year":
+            col = values.astype("datetime64[Y]").astype(np.int64) + 1970
+        elif feat == "month":
+            col = values.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        elif feat == "day":
+            col = (days - values.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+        elif feat == "weekday":
+            # 1970-01-01 was a Thursday; Monday = 0
+            col = (days.astype(np.int64) + 3) % 7
+        elif feat == "hour":
+            col = (values - days).astype("timedelta64[h]").astype(np.int64)
+        elif feat == "minute":
+            col = (values - values.astype("datetime64[h]")).astype("timedelta64[m]").astype(np.int64)
+        elif feat == "dayofyear":
+            col = (days - values.astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64) + 1
+        elif feat == "is_weekend":
+            col = ((days.astype(np.int64) + 3) % 7 >= 5).astype(np.int64)
+        else:
+            raise ValueError(f"Unknown datetime feature: {feat}")
+        out[:, j] = col
+
+    out[nat] = np.nan
+    return out
+
+
+class DatetimeFeatureExtractor(BaseEstimator, TransformerMixin):
+    """
+    Adds <col>_<feature> columns for each datetime column.
+    The timezone seen at fit time is reused when scoring so features line up.
+    """
+
+    def __init__(self, columns=None, features=("year", "month", "day", "weekday", "hour"), drop_original=False):
+        self.columns = columns
+        self.features = features
+        self.drop_original = drop_original
+
+    def fit(self, X: pd.DataFrame, y=None):
+        cols = list(self.columns) if self.columns is not None else X.select_dtypes(include=["datetime", "datetimetz"]).columns.tolist()
+        self.columns_ = cols
+        self.tz_ = {c: (str(X[c].dt.tz) if pd.api.types.is_datetime64_any_dtype(X[c]) and X[c].dt.tz is not None else None)
+                    for c in cols}
+        self.features_ = list(self.features)
+        return self
+
+    def transform_array(self, X: pd.DataFrame) -> np.ndarray:
+        """Fast path: all extracted features as one float32 block."""
+        blocks = [datetime_parts(_as_datetime64(X[c], self.tz_[c]), self.features_) for c in self.columns_]
+        return np.hstack(blocks) if blocks else np.empty((len(X), 0), dtype=np.float32)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([f"{c}_{f}" for c in self.columns_ for f in self.features_], dtype=object)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        feats = pd.DataFrame(self.transform_array(X), columns=self.get_feature_names_out(), index=X.index)
+        base = X.drop(columns=self.columns_) if self.drop_original else X
+        return pd.concat([base, feats], axis=1)
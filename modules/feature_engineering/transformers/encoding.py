@@ -0,0 +1,465 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from modules.feature_engineering.transformers.text import TextVectorizer, text_columns
+
+# ---------------------------------------------------------
+# CATEGORICAL ENCODING ENGINE
+# Every categorical column is factorized once at fit time. transform()
+# maps values to integer codes with a hash lookup and builds the
+# one-hot matrix straight from those codes in a single allocation
+# (CSR or a uint8 block) - no per-column get_dummies copies.
+# ---------------------------------------------------------
+CATEGORICAL_DTYPES = ["object", "category", "string"]
+HASH_CARDINALITY = 1_000
+N_HASH_FEATURES = 256
+
+
+def categorical_columns(df: pd.DataFrame) -> list:
+    """Columns pd.get_dummies would expand (object / category / string)."""
+    return df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+
+class CategoricalEncoder(BaseEstimator, TransformerMixin):
+    """
+    One-hot / label encoder for many columns at once.
+
+    onehot_cols  -> expanded into indicator columns (sparse CSR or dense uint8)
+    label_cols   -> replaced by int32 codes (unseen / NaN -> -1)
+    hash_cols    -> hashed into n_hash_features shared buckets (HashingEncoder)
+    text_cols    -> TF-IDF n-grams (TextVectorizer); the output then stays sparse
+    Unseen categories at transform time encode as an all-zero one-hot row
+    (handle_unknown="ignore") or raise (handle_unknown="error").
+    """
+
+    def __init__(self, onehot_cols=None, label_cols=None, drop_first=False, handle_unknown="ignore",
+                 hash_cols=None, n_hash_features=N_HASH_FEATURES, text_cols=None):
+        self.onehot_cols = onehot_cols
+        self.label_cols = label_cols
+        self.drop_first = drop_first
+        self.handle_unknown = handle_unknown
+        self.hash_cols = hash_cols
+        self.n_hash_features = n_hash_features
+        self.text_cols = text_cols
+
+    # ---------------------------
+    # FIT
+    # ---------------------------
+    def fit(self, X: pd.DataFrame, y=None):
+        self._fit(X)
+        return self
+
+    def _fit(self, X: pd.DataFrame) -> dict:
+        """Factorize every encoded column once; returns the training codes."""
+        label = list(self.label_cols) if self.label_cols is not None else []
+        hashed = list(self.hash_cols) if self.hash_cols is not None else []
+        text = list(self.text_cols) if self.text_cols is not None else []
+        onehot = list(self.onehot_cols) if self.onehot_cols is not None else \
+            [c for c in categorical_columns(X) if c not in set(label) | set(hashed) | set(text)]
+
+        self.categories_ = {}
+        fit_codes = {}
+        for col in onehot + label:
+            # sort=True keeps the column order identical to pd.get_dummies
+            codes, uniques = pd.factorize(X[col], sort=True)
+            self.categories_[col] = pd.Index(uniques)
+            fit_codes[col] = codes.astype(np.int64, copy=False)
+
+        self.onehot_cols_ = onehot
+        self.label_cols_ = label
+        self.hash_cols_ = hashed
+        self.hasher_ = HashingEncoder(columns=hashed, n_features=self.n_hash_features) if hashed else None
+        self.text_cols_ = text
+        self.text_vectorizer_ = TextVectorizer(columns=text).fit(X) if text else None
+
+        # Column layout of the one-hot block
+        skip = 1 if self.drop_first else 0
+        widths = np.array([max(0, len(self.categories_[c]) - skip) for c in onehot], dtype=np.int64)
+        self.offsets_ = np.concatenate([[0], np.cumsum(widths)])
+        self.n_onehot_ = int(self.offsets_[-1])
+        return fit_codes
+
+    def _codes(self, X: pd.DataFrame, col: str) -> np.ndarray:
+        cached = getattr(self, "_fit_codes", None)
+        if cached is not None and cached[0] == id(X) and cached[1] == len(X):
+            return cached[2][col]
+        codes = self.categories_[col].get_indexer(X[col])
+        if self.handle_unknown == "error":
+            unseen = (codes < 0) & X[col].notna().to_numpy()
+            if unseen.any():
+                bad = X[col][unseen].unique()[:5]
+                raise ValueError(f"Unseen categories in '{col}': {list(bad)}")
+        return codes
+
+    def fit_transform(self, X: pd.DataFrame, y=None, sparse: bool = False):
+        # Reuse the training codes instead of re-hashing the same frame
+        self._fit_codes = (id(X), len(X), self._fit(X))
+        try:
+            return self.transform(X, sparse=sparse)
+        finally:
+            self._fit_codes = None
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        skip = 1 if self.drop_first else 0
+        names = []
+        for col in self.onehot_cols_:
+            names.extend(f"{col}_{v}" for v in self.categories_[col][skip:])
+        return np.asarray(names, dtype=object)
+
+    # ---------------------------
+    # TRANSFORM
+    # ---------------------------
+    def _onehot_positions(self, X: pd.DataFrame):
+        """(n x k) matrix of target column indices, -1 where the row has no indicator."""
+        n, k = len(X), len(self.onehot_cols_)
+        skip = 1 if self.drop_first else 0
+        pos = np.empty((n, k), dtype=np.int64)
+        for j, col in enumerate(self.onehot_cols_):
+            codes = self._codes(X, col) - skip
+            pos[:, j] = np.where(codes >= 0, codes + self.offsets_[j], -1)
+        return pos
+
+    def transform_sparse(self, X: pd.DataFrame) -> sp.csr_matrix:
+        """One-hot block as CSR (uint8), built from codes without densifying."""
+        pos = self._onehot_positions(X)
+        valid = pos >= 0
+        indptr = np.concatenate([[0], np.cumsum(valid.sum(axis=1))])
+        indices = pos[valid]  # row-major order == CSR order
+        data = np.ones(len(indices), dtype=np.uint8)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(X), self.n_onehot_))
+
+    def transform_dense(self, X: pd.DataFrame) -> np.ndarray:
+        """One-hot block as a dense uint8 array (single allocation)."""
+        pos = self._onehot_positions(X)
+        out = np.zeros((len(X), self.n_onehot_), dtype=np.uint8)
+        rows, cols = np.nonzero(pos >= 0)
+        out[rows, pos[rows, cols]] = 1
+        return out
+
+    def transform_labels(self, X: pd.DataFrame) -> np.ndarray:
+        """int32 codes for label_cols (n x len(label_cols))."""
+        out = np.empty((len(X), len(self.label_cols_)), dtype=np.int32)
+        for j, col in enumerate(self.label_cols_):
+            out[:, j] = self._codes(X, col)
+        return out
+
+    def transform(self, X: pd.DataFrame, sparse: bool = False):
+        """
+        Replace encoded columns in X and return a new frame (sparse=False) or a CSR
+        matrix of [other columns | labels | one-hot | hashed | text] (sparse=True).
+        With text columns the frame is sparse-backed so TF-IDF blocks are never densified.
+        """
+        rest = self._rest_columns(X)
+        hasher = getattr(self, "hasher_", None)
+        texter = getattr(self, "text_vectorizer_", None)
+
+        if texter is not None and not sparse:
+            return pd.DataFrame.sparse.from_spmatrix(self.transform(X, sparse=True), index=X.index,
+                                                     columns=self.transformed_columns(X))
+
+        if sparse:
+            blocks = []
+            if rest:
+                blocks.append(sp.csr_matrix(X[rest].to_numpy(dtype=np.float32, na_value=np.nan)))
+            if self.label_cols_:
+                blocks.append(sp.csr_matrix(self.transform_labels(X).astype(np.float32)))
+            blocks.append(self.transform_sparse(X).astype(np.float32))
+            if hasher is not None:
+                blocks.append(hasher.transform_sparse(X))
+            if texter is not None:
+                blocks.append(texter.transform_sparse(X))
+            return sp.hstack(blocks, format="csr")
+
+        parts = [X[rest]]
+        if self.label_cols_:
+            parts.append(pd.DataFrame(self.transform_labels(X), columns=self.label_cols_, index=X.index))
+        if self.onehot_cols_:
+            parts.append(pd.DataFrame(self.transform_dense(X), columns=self.get_feature_names_out(), index=X.index))
+        if hasher is not None:
+            parts.append(pd.DataFrame(hasher.transform_dense(X), columns=hasher.get_feature_names_out(), index=X.index))
+        return pd.concat(parts, axis=1, copy=False)
+
+    def _rest_columns(self, X: pd.DataFrame) -> list:
+        encoded = set(self.onehot_cols_) | set(self.label_cols_)
+        encoded |= set(getattr(self, "hash_cols_", [])) | set(getattr(self, "text_cols_", []))
+        return [c for c in X.columns if c not in encoded]
+
+    def transformed_columns(self, X: pd.DataFrame) -> list:
+        """Column names produced by transform(X) in order."""
+        hashed = list(self.hasher_.get_feature_names_out()) if getattr(self, "hash_cols_", []) else []
+        text = list(self.text_vectorizer_.get_feature_names_out()) if getattr(self, "text_cols_", []) else []
+        return self._rest_columns(X) + list(self.label_cols_) + list(self.get_feature_names_out()) + hashed + text
+
+
+# ---------------------------------------------------------
+# TARGET (MEAN) ENCODING
+# Group sums/counts come from np.bincount on factorized codes. Out-of-
+# fold statistics use one 2-D bincount over (fold, code) and subtract
+# each fold from the totals, so K folds cost one pass over the rows.
+# ---------------------------------------------------------
+class TargetEncoder(BaseEstimator, TransformerMixin):
+    """
+    Replaces each categorical column with the smoothed target mean of its category.
+
+    fit_transform() returns out-of-fold encodings (no row sees its own target);
+    transform() uses the full-data lookup table. Unseen / NaN categories get the prior.
+    Numeric targets give one column per feature; class targets give one column per
+    class (<col>_te_<class>), or one column (positive class) for binary targets.
+    """
+
+    def __init__(self, columns=None, target=None, n_folds=5, smoothing=10.0, random_state=0):
+        self.columns = columns
+        self.target = target
+        self.n_folds = n_folds
+        self.smoothing = smoothing
+        self.random_state = random_state
+
+    def _target_matrix(self, y: pd.Series) -> tuple:
+        """(n x t) float target block, row validity mask and output suffixes."""
+        if pd.api.types.is_numeric_dtype(y) and not pd.api.types.is_bool_dtype(y):
+            values = y.to_numpy(dtype=np.float64, na_value=np.nan)
+            return values[:, None], ~np.isnan(values), [None]
+        codes, classes = pd.factorize(y, sort=True)
+        # Binary: encode the positive (last sorted) class only
+        keep = classes[1:] if len(classes) == 2 else classes
+        block = (codes[:, None] == np.arange(len(classes))[None, len(classes) - len(keep):]).astype(np.float64)
+        return block, codes >= 0, [str(c) for c in keep] if len(classes) != 2 else [None]
+
+    def _output_names(self, col) -> list:
+        return [col if s is None else f"{col}_te_{s}" for s in self.suffixes_]
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._fit(X, y)
+        return self
+
+    def _fit(self, X: pd.DataFrame, y=None, oof: bool = False):
+        if y is None:
+            y = X[self.target]
+        y = pd.Series(np.asarray(y) if not isinstance(y, pd.Series) else y.to_numpy(), copy=False)
+        cols = list(self.columns) if self.columns is not None else [c for c in categorical_columns(X) if c != self.target]
+
+        Y, valid, self.suffixes_ = self._target_matrix(y)
+        Y[~valid] = 0.0
+        w = valid.astype(np.float64)
+        n_t = Y.shape[1]
+        m = float(self.smoothing)
+
+        self.prior_ = Y.sum(axis=0) / max(w.sum(), 1.0)
+        self.columns_ = cols
+        self.mapping_ = {}
+        oof_out = {}
+
+        if oof:
+            rng = np.random.default_rng(self.random_state)
+            folds = rng.permutation(len(X)) % self.n_folds
+            fold_n = np.bincount(folds, weights=w, minlength=self.n_folds)
+            fold_y = np.stack([np.bincount(folds, weights=Y[:, t], minlength=self.n_folds) for t in range(n_t)], axis=1)
+            # Prior per fold excludes that fold as well
+            fold_prior = (Y.sum(axis=0) - fold_y) / np.maximum(w.sum() - fold_n, 1.0)[:, None]
+
+        for col in cols:
+            codes, uniques = pd.factorize(X[col])
+            k = len(uniques)
+            has = codes >= 0
+            c = np.where(has, codes, k)  # NaN rows go to a spare slot that is never looked up
+
+            counts = np.bincount(c, weights=w, minlength=k + 1)
+            sums = np.stack([np.bincount(c, weights=Y[:, t], minlength=k + 1) for t in range(n_t)], axis=1)
+            enc = (sums + m * self.prior_) / (counts + m)[:, None]
+            self.mapping_[col] = (pd.Index(uniques), enc[:k].astype(np.float32))
+
+            if oof:
+                idx = folds * (k + 1) + c
+                f_counts = np.bincount(idx, weights=w, minlength=self.n_folds * (k + 1)).reshape(self.n_folds, k + 1)
+                out = np.empty((len(X), n_t), dtype=np.float32)
+                for t in range(n_t):
+                    f_sums = np.bincount(idx, weights=Y[:, t], minlength=self.n_folds * (k + 1)).reshape(self.n_folds, k + 1)
+                    oof_enc = (sums[:, t] - f_sums + m * fold_prior[:, t:t + 1]) / (counts - f_counts + m)
+                    out[:, t] = np.where(has, oof_enc[folds, c], fold_prior[folds, t])
+                oof_out[col] = out
+        return oof_out
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([name for col in self.columns_ for name in self._output_names(col)], dtype=object)
+
+    def transform_array(self, X: pd.DataFrame) -> np.ndarray:
+        """Fast path: encoded block (n x n_outputs) via the lookup tables."""
+        blocks = []
+        prior = self.prior_.astype(np.float32)
+        for col in self.columns_:
+            uniques, enc = self.mapping_[col]
+            codes = uniques.get_indexer(X[col])
+            blocks.append(np.where((codes >= 0)[:, None], enc[codes], prior))
+        return np.hstack(blocks) if blocks else np.empty((len(X), 0), dtype=np.float32)
+
+    def _assemble(self, X: pd.DataFrame, blocks: dict) -> pd.DataFrame:
+        parts = [X.drop(columns=self.columns_)]
+        for col in self.columns_:
+            parts.append(pd.DataFrame(blocks[col], columns=self._output_names(col), index=X.index))
+        return pd.concat(parts, axis=1, copy=False)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        block = self.transform_array(X)
+        width = len(self.suffixes_)
+        return self._assemble(X, {col: block[:, j * width:(j + 1) * width] for j, col in enumerate(self.columns_)})
+
+    def fit_transform(self, X: pd.DataFrame, y=None):
+        # Training rows get out-of-fold encodings to avoid target leakage
+        return self._assemble(X, self._fit(X, y, oof=True))
+
+
+# ---------------------------------------------------------
+# FEATURE HASHING
+# Strings are hashed straight from the Arrow buffers (offsets + UTF-8
+# bytes): FNV-1a runs one byte position at a time over every string
+# still that long, so the loop is over the longest length, not rows.
+# No vocabulary is learned, so memory does not grow with cardinality.
+# ---------------------------------------------------------
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _arrow_strings(values: pd.Series) -> pa.Array:
+    """values as a pyarrow large_string array (nulls preserved)."""
+    try:
+        arr = pa.array(values, from_pandas=True)
+        if isinstance(arr, pa.ChunkedArray):
+            arr = arr.combine_chunks()
+        if not pa.types.is_large_string(arr.type):
+            arr = arr.cast(pa.large_string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed Python objects: fall back to their str() form
+        arr = pa.array(values.astype(str).where(values.notna()), type=pa.large_string(), from_pandas=True)
+    return arr
+
+
+def hash_strings(values, seed: int = 0) -> tuple:
+    """
+    64-bit FNV-1a (+ splitmix64 finaliser) of every string.
+    Returns (uint64 hashes, null mask).
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Hash the categories once and gather by code
+        cat_hash, _ = hash_strings(pd.Series(series.cat.categories), seed)
+        codes = series.cat.codes.to_numpy()
+        return np.where(codes >= 0, cat_hash[codes], np.uint64(0)), codes < 0
+
+    arr = _arrow_strings(series)
+    n = len(arr)
+    _, offsets_buf, data_buf = arr.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=np.int64)[arr.offset:arr.offset + n + 1]
+    data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, dtype=np.uint8)
+
+    lengths = np.diff(offsets)
+    order = np.argsort(-lengths, kind="stable")
+    starts = offsets[:-1][order]
+    lengths_asc = lengths[order][::-1]
+
+    h = np.full(n, _FNV_OFFSET ^ np.uint64(seed), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(int(lengths.max()) if n else 0):
+            # Strings are sorted longest first, so the active ones are a prefix
+            m = n - np.searchsorted(lengths_asc, j, side="right")
+            h[:m] ^= data[starts[:m] + j]
+            h[:m] *= _FNV_PRIME
+        h ^= h >> np.uint64(30)
+        h *= _MIX_1
+        h ^= h >> np.uint64(27)
+        h *= _MIX_2
+        h ^= h >> np.uint64(31)
+
+    out = np.empty(n, dtype=np.uint64)
+    out[order] = h
+    nulls = arr.is_null().to_numpy(zero_copy_only=False) if arr.null_count else np.zeros(n, dtype=bool)
+    return out, nulls
+
+
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    """
+    Feature hashing of string / categorical columns into n_features shared buckets.
+    Stateless: the bucket of a value depends only on the value and its column name,
+    so chunks can be encoded independently and new categories need no refit.
+    """
+
+    def __init__(self, columns=None, n_features=N_HASH_FEATURES, alternate_sign=False):
+        self.columns = columns
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self.columns_ = list(self.columns) if self.columns is not None else categorical_columns(X)
+        return self
+
+    def _columns(self, X: pd.DataFrame) -> list:
+        if hasattr(self, "columns_"):
+            return self.columns_
+        return list(self.columns) if self.columns is not None else categorical_columns(X)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+
+    def transform_sparse(self, X: pd.DataFrame) -> sp.csr_matrix:
+        """(n x n_features) float32 CSR; a row holds one entry per non-null hashed column."""
+        cols = self._columns(X)
+        n = len(X)
+        buckets = np.empty((n, len(cols)), dtype=np.int64)
+        signs = np.ones((n, len(cols)), dtype=np.float32)
+        for j, col in enumerate(cols):
+            # Column name as seed: equal values in different columns land apart
+            seed, _ = hash_strings(pd.Series([str(col)]))
+            h, nulls = hash_strings(X[col], int(seed[0]))
+            buckets[:, j] = np.where(nulls, -1, (h % np.uint64(self.n_features)).astype(np.int64))
+            if self.alternate_sign:
+                signs[:, j] = np.where((h >> np.uint64(63)) == 1, -1.0, 1.0)
+
+        valid = buckets >= 0
+        indptr = np.concatenate([[0], np.cumsum(valid.sum(axis=1))])
+        out = sp.csr_matrix((signs[valid], buckets[valid], indptr), shape=(n, self.n_features))
+        out.sum_duplicates()
+        return out
+
+    def transform_dense(self, X: pd.DataFrame) -> np.ndarray:
+        return self.transform_sparse(X).toarray()
+
+    def transform(self, X: pd.DataFrame, sparse: bool = False):
+        """Hashed columns replaced by hash_0..hash_{n-1} (or the CSR block when sparse=True)."""
+        if sparse:
+            return self.transform_sparse(X)
+        cols = self._columns(X)
+        feats = pd.DataFrame(self.transform_dense(X), columns=self.get_feature_names_out(), index=X.index)
+        return pd.concat([X.drop(columns=cols), feats], axis=1, copy=False)
+
+    def transform_chunks(self, chunks):
+        """Stream CSR blocks for an iterable of frames (e.g. DataManager.iter_row_groups)."""
+        for chunk in chunks:
+            yield self.transform_sparse(chunk)
+
+
+def encode_features(X: pd.DataFrame, drop_first: bool = True, sparse: bool = False,
+                    hash_cardinality: int = HASH_CARDINALITY, text: bool = True, keep_categorical: bool = False):
+    """
+    Drop-in replacement for pd.get_dummies(X, drop_first=...) on a feature frame.
+    Free-text columns become TF-IDF n-grams (sparse-backed output), and columns with
+    more than hash_cardinality uniques (IDs, URLs, SKUs) are hashed into
+    N_HASH_FEATURES buckets instead of being expanded.
+    keep_categorical leaves the remaining categoricals as they are for learners with
+    native categorical splits. It does not apply when the output is sparse (sparse=True
+    or any text column): a CSR block cannot carry pandas categories, so those columns
+    are one-hot encoded instead and native learners split on the indicators.
+    Returns (encoded, fitted encoder) so the same mapping can be applied to new data.
+    """
+    text_cols = text_columns(X) if text else []
+    cat_cols = [c for c in categorical_columns(X) if c not in text_cols]
+    hash_cols = [c for c in cat_cols if X[c].nunique() > hash_cardinality] if hash_cardinality else []
+    onehot_cols = [c for c in cat_cols if c not in hash_cols]
+    if keep_categorical and not text_cols and not sparse:
+        onehot_cols = []  # otherwise one-hot: see the docstring
+    encoder = CategoricalEncoder(onehot_cols=onehot_cols, drop_first=drop_first, hash_cols=hash_cols,
+                                 text_cols=text_cols)
+    return encoder.fit_transform(X, sparse=sparse), encoder
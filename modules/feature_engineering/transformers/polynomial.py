@@ -0,0 +1,203 @@
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# ---------------------------------------------------------
+# POLYNOMIAL / INTERACTION FEATURES
+# Candidate terms are enumerated lazily and scored on a row sample
+# in batches (one (sample x batch) product block per batch), so the
+# full degree-d expansion is never materialized. Only the top-k terms
+# are computed on the whole frame at transform time.
+# ---------------------------------------------------------
+SAMPLE_ROWS = 20_000
+SCREEN_BATCH = 256
+
+
+def iter_terms(n_cols: int, degree: int = 2, interaction_only: bool = False):
+    """Lazily yield index tuples for every term of degree 2..degree."""
+    combos = itertools.combinations if interaction_only else itertools.combinations_with_replacement
+    for d in range(2, degree + 1):
+        yield from combos(range(n_cols), d)
+
+
+def count_terms(n_cols: int, degree: int = 2, interaction_only: bool = False) -> int:
+    """Number of terms iter_terms would yield, without enumerating them."""
+    if interaction_only:
+        return sum(math.comb(n_cols, d) for d in range(2, degree + 1))
+    return sum(math.comb(n_cols + d - 1, d) for d in range(2, degree + 1))
+
+
+def term_name(names, term) -> str:
+    """('a', 'a', 'b') -> 'a^2*b'."""
+    parts = []
+    for idx, group in itertools.groupby(term):
+        power = len(list(group))
+        parts.append(names[idx] if power == 1 else f"{names[idx]}^{power}")
+    return "*".join(parts)
+
+
+def _batches(iterable, size: int):
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _products(Zt: np.ndarray, batch: list) -> np.ndarray:
+    """
+    (len(batch) x rows) products for a batch of terms, from the transposed
+    block Zt (columns x rows, last row all ones) so every gather is a contiguous row.
+    """
+    width = max(len(t) for t in batch)
+    # Shorter terms are padded with the all-ones row
+    idx = np.full((len(batch), width), Zt.shape[0] - 1, dtype=np.int64)
+    for i, t in enumerate(batch):
+        idx[i, :len(t)] = t
+    out = Zt[idx[:, 0]]
+    for k in range(1, width):
+        out *= Zt[idx[:, k]]
+    return out
+
+
+def _transposed(block: np.ndarray) -> np.ndarray:
+    """Columns-as-rows copy of block with a trailing row of ones."""
+    Zt = np.ones((block.shape[1] + 1, block.shape[0]), dtype=block.dtype)
+    Zt[:-1] = block.T
+    return Zt
+
+
+def _score_batch(Zt: np.ndarray, batch: list, target: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    Screening score per term: r^2 with a numeric target, eta^2 with a
+    categorical one, or (no target) 1 - max r^2 with its parent columns.
+    """
+    P = _products(Zt, batch)
+    P -= P.mean(axis=1, keepdims=True)
+    ss = np.einsum("ij,ij->i", P, P)
+    ss[ss == 0] = np.inf
+
+    if target is not None:
+        return (P @ target) ** 2 / (ss * (target @ target))
+    if groups is not None:
+        counts = np.bincount(groups).astype(P.dtype)
+        sums = np.stack([np.bincount(groups, weights=row, minlength=len(counts)) for row in P])
+        return (sums ** 2 / counts).sum(axis=1) / ss
+
+    # Unsupervised: prefer terms that add information beyond their parents
+    zz = np.einsum("ij,ij->i", Zt, Zt)
+    best = np.zeros(len(batch), dtype=P.dtype)
+    for i, t in enumerate(batch):
+        parents = np.unique(t)
+        r2 = (Zt[parents] @ P[i]) ** 2 / (zz[parents] * ss[i])
+        best[i] = r2.max()
+    return np.where(np.isfinite(ss), 1.0 - best, 0.0)
+
+
+class PolynomialFeatureGenerator(BaseEstimator, TransformerMixin):
+    """
+    Degree-bounded polynomial / interaction terms, screened before being built.
+
+    With a target (y or the `target` column) terms are ranked by r^2 (numeric)
+    or eta^2 (categorical) on a row sample; without one, by how little they
+    correlate with their own parent columns. transform() appends the top_k terms.
+    """
+
+    def __init__(self, columns=None, degree=2, interaction_only=False, top_k=50, target=None,
+                 sample_rows=SAMPLE_ROWS, n_jobs=-1, dtype=np.float32, random_state=0):
+        self.columns = columns
+        self.degree = degree
+        self.interaction_only = interaction_only
+        self.top_k = top_k
+        self.target = target
+        self.sample_rows = sample_rows
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+        self.random_state = random_state
+
+    # ---------------------------
+    # FIT (SCREENING)
+    # ---------------------------
+    def fit(self, X: pd.DataFrame, y=None):
+        if y is None and self.target is not None:
+            y = X[self.target]
+        cols = list(self.columns) if self.columns is not None else X.select_dtypes(include=np.number).columns.tolist()
+        cols = [c for c in cols if c != self.target]
+
+        rng = np.random.default_rng(self.random_state)
+        n = len(X)
+        rows = np.sort(rng.choice(n, self.sample_rows, replace=False)) if n > self.sample_rows else np.arange(n)
+
+        # Standardized sample; NaN -> column mean (0 after centering)
+        Z = X[cols].iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan)
+        Z = (Z - np.nanmean(Z, axis=0)) / np.where(np.nanstd(Z, axis=0) > 0, np.nanstd(Z, axis=0), 1.0)
+        Zt = _transposed(np.nan_to_num(Z).astype(np.float32))
+
+        target, groups = None, None
+        if y is not None:
+            y_s = pd.Series(np.asarray(y)).iloc[rows]
+            if pd.api.types.is_numeric_dtype(y_s) and y_s.nunique() > 20:
+                t = y_s.to_numpy(dtype=np.float64)
+                t = np.nan_to_num(t - np.nanmean(t))
+                target = t.astype(np.float32)
+            else:
+                groups = pd.factorize(y_s)[0]
+                groups[groups < 0] = groups.max() + 1
+
+        k = self.top_k
+        results = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(self._screen)(Zt, batch, target, groups, k)
+            for batch in _batches(iter_terms(len(cols), self.degree, self.interaction_only), SCREEN_BATCH)
+        )
+
+        terms = [t for batch_terms, _ in results for t in batch_terms]
+        scores = np.concatenate([s for _, s in results]) if results else np.empty(0)
+        order = np.argsort(-scores, kind="stable")[:k]
+
+        self.columns_ = cols
+        self.terms_ = [terms[i] for i in order]
+        self.scores_ = scores[order]
+        self.n_candidates_ = count_terms(len(cols), self.degree, self.interaction_only)
+        return self
+
+    @staticmethod
+    def _screen(Zt, batch, target, groups, k):
+        """Score one batch and keep only its local top-k (bounds memory)."""
+        scores = np.nan_to_num(_score_batch(Zt, batch, target, groups))
+        if len(batch) > k:
+            keep = np.argpartition(-scores, k)[:k]
+            return [batch[i] for i in keep], scores[keep]
+        return batch, scores
+
+    # ---------------------------
+    # TRANSFORM
+    # ---------------------------
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([term_name(self.columns_, t) for t in self.terms_], dtype=object)
+
+    def transform_array(self, X: pd.DataFrame, sparse: bool = False):
+        """Selected terms as a float32 block, or CSR when sparse=True (NaN counts as 0 there)."""
+        block = X[self.columns_].to_numpy(dtype=self.dtype, na_value=np.nan)
+        if sparse:
+            # Products of sparse columns stay sparse: multiply CSC columns
+            S = sp.csc_matrix(np.nan_to_num(block))
+            cols = []
+            for t in self.terms_:
+                col = S[:, t[0]]
+                for j in t[1:]:
+                    col = col.multiply(S[:, j])
+                cols.append(col)
+            return sp.hstack(cols, format="csr") if cols else sp.csr_matrix((len(X), 0), dtype=self.dtype)
+        if not self.terms_:
+            return np.empty((len(X), 0), dtype=self.dtype)
+        return _products(_transposed(block), self.terms_).T
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        feats = pd.DataFrame(self.transform_array(X), columns=self.get_feature_names_out(), index=X.index)
+        return pd.concat([X, feats], axis=1)
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# ---------------------------------------------------------
+# SCALING TRANSFORMERS
+# Statistics are learned once (fit) and stored as flat float arrays,
+# so scoring batches only pay for one vectorized (x - center) * inv_scale
+# on a NumPy block - no pandas per-column overhead, no refitting.
+# partial_fit() folds in one chunk at a time (Chan/Welford moments,
+# running min/max, t-digest quantiles), so a file can be scaled from
+# its parquet row groups in constant memory.
+# ---------------------------------------------------------
+SCALING_METHODS = {
+    "StandardScaler (Z-Score)": "standard",
+    "MinMaxScaler (0-1)": "minmax",
+    "RobustScaler (Median/IQR)": "robust",
+}
+
+
+TDIGEST_COMPRESSION = 200
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest, k1 scale function).
+    Holds at most ~compression centroids regardless of how many values were added.
+    """
+
+    def __init__(self, compression: int = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._merge(np.concatenate([self.means, values]),
+                        np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: "TDigest"):
+        self._merge(np.concatenate([self.means, other.means]),
+                    np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _merge(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # Centroids falling in the same unit of the k1 scale are merged;
+        # the scale is steep at the tails so extreme quantiles stay sharp.
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        group = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+        w = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / w
+        self.weights = w
+
+    def quantile(self, q) -> np.ndarray:
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)
+        if len(self.means) == 1:
+            return np.full(np.shape(q), self.means[0])
+        cum = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return np.interp(q, cum, self.means)
+
+
+class ColumnScaler(BaseEstimator, TransformerMixin):
+    """
+    Standard / min-max / robust scaling of selected numeric columns.
+    fit() learns center_ and scale_; transform() leaves other columns untouched.
+    """
+
+    def __init__(self, columns=None, method="standard", dtype=np.float64):
+        self.columns = columns
+        self.method = method
+        self.dtype = dtype
+
+    def fit(self, X: pd.DataFrame, y=None):
+        self._reset_stream()
+        cols = list(self.columns) if self.columns is not None else X.select_dtypes(include=np.number).columns.tolist()
+        block = X[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        if self.method == "standard":
+            center = np.nanmean(block, axis=0)
+            scale = np.nanstd(block, axis=0)
+        elif self.method == "minmax":
+            center = np.nanmin(block, axis=0)
+            scale = np.nanmax(block, axis=0) - center
+        elif self.method == "robust":
+            q1, center, q3 = np.nanpercentile(block, [25, 50, 75], axis=0)
+            scale = q3 - q1
+        else:
+            raise ValueError(f"Unknown scaling method: {self.method}")
+
+        self.columns_ = cols
+        self._set_stats(center, scale)
+        return self
+
+    # ---------------------------
+    # STREAMING FIT
+    # ---------------------------
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fold one chunk into the running statistics (constant memory)."""
+        if not hasattr(self, "n_seen_"):
+            self.columns_ = list(self.columns) if self.columns is not None else X.select_dtypes(include=np.number).columns.tolist()
+            p = len(self.columns_)
+            self.n_seen_ = np.zeros(p)
+            self.mean_ = np.zeros(p)
+            self.m2_ = np.zeros(p)
+            self.min_ = np.full(p, np.inf)
+            self.max_ = np.full(p, -np.inf)
+            self.digests_ = [TDigest() for _ in range(p)] if self.method == "robust" else None
+
+        block = X[self.columns_].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(block)
+        n_b = valid.sum(axis=0).astype(np.float64)
+        has = n_b > 0
+
+        if self.method == "standard":
+            # Chan et al. parallel merge of (count, mean, M2)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean_b = np.where(has, np.nansum(block, axis=0) / n_b, 0.0)
+                m2_b = np.nansum((block - mean_b) ** 2, axis=0)
+                n = self.n_seen_ + n_b
+                delta = mean_b - self.mean_
+                self.mean_ = np.where(has, self.mean_ + delta * n_b / n, self.mean_)
+                self.m2_ = np.where(has, self.m2_ + m2_b + delta ** 2 * self.n_seen_ * n_b / n, self.m2_)
+            center, scale = self.mean_, np.sqrt(self.m2_ / np.maximum(n, 1))
+        elif self.method == "minmax":
+            self.min_ = np.minimum(self.min_, np.where(valid, block, np.inf).min(axis=0, initial=np.inf))
+            self.max_ = np.maximum(self.max_, np.where(valid, block, -np.inf).max(axis=0, initial=-np.inf))
+            n = self.n_seen_ + n_b
+            center = np.where(n > 0, self.min_, np.nan)
+            scale = self.max_ - self.min_
+        elif self.method == "robust":
+            for j, digest in enumerate(self.digests_):
+                digest.update(block[:, j])
+            n = self.n_seen_ + n_b
+            q1, center, q3 = np.array([d.quantile([0.25, 0.5, 0.75]) for d in self.digests_]).T.reshape(3, -1)
+            scale = q3 - q1
+        else:
+            raise ValueError(f"Unknown scaling method: {self.method}")
+
+        self.n_seen_ = n
+        self._set_stats(center, scale)
+        return self
+
+    def fit_stream(self, chunks):
+        """Fit from an iterable of DataFrame chunks (e.g. DataManager.iter_row_groups)."""
+        self._reset_stream()
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def _reset_stream(self):
+        for attr in ("n_seen_", "mean_", "m2_", "min_", "max_", "digests_"):
+            self.__dict__.pop(attr, None)
+
+    def _set_stats(self, center, scale):
+        # Constant columns keep scale 1 (same convention as sklearn)
+        scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        self.center_ = np.nan_to_num(center, nan=0.0)
+        self.scale_ = scale
+        self._inv_scale = 1.0 / scale
+
+    def transform_array(self, block: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Fast path: scale an (n x len(columns_)) NumPy block, optionally in place."""
+        block = np.asarray(block, dtype=self.dtype)
+        if out is None:
+            out = np.empty_like(block)
+        np.subtract(block, self.center_.astype(self.dtype, copy=False), out=out)
+        np.multiply(out, self._inv_scale.astype(self.dtype, copy=False), out=out)
+        return out
+
+    def inverse_transform_array(self, block: np.ndarray) -> np.ndarray:
+        return np.asarray(block, dtype=np.float64) * self.scale_ + self.center_
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        out = X.copy()
+        out[self.columns_] = self.transform_array(X[self.columns_].to_numpy(dtype=np.float64, na_value=np.nan))
+        return out
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray(self.columns_, dtype=object)
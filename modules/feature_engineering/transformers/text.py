@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# ---------------------------------------------------------
+# TEXT FEATURES
+# Free-text columns become TF-IDF n-gram matrices that stay in CSR
+# from tokenization to the model. Document frequencies are counted
+# per row chunk in parallel and merged, so the vocabulary (or the
+# IDF of hashed buckets) is fitted without one huge count matrix.
+# ---------------------------------------------------------
+TEXT_MODES = ["tfidf", "hashed"]
+CHUNK_ROWS = 50_000
+MAX_FEATURES = 20_000
+N_HASH_FEATURES = 2 ** 16
+TEXT_MIN_TOKENS = 3
+TEXT_SAMPLE = 1_000
+
+
+def text_columns(df: pd.DataFrame, min_tokens: float = TEXT_MIN_TOKENS) -> list:
+    """String columns that look like free text (several words per value on average)."""
+    cols = []
+    for col in df.select_dtypes(include=["object", "string"]).columns:
+        sample = df[col].dropna()
+        sample = sample.iloc[:TEXT_SAMPLE]
+        if len(sample) and sample.map(type).eq(str).all() and sample.str.split().str.len().mean() >= min_tokens:
+            cols.append(col)
+    return cols
+
+
+def _texts(values: pd.Series) -> np.ndarray:
+    return values.fillna("").astype(str).to_numpy()
+
+
+def _chunks(n: int, chunk_rows: int):
+    return [(start, min(start + chunk_rows, n)) for start in range(0, n, chunk_rows)] or [(0, 0)]
+
+
+def _chunk_vocab_df(texts, ngram_range) -> pd.Series:
+    """Document frequency of every n-gram in one chunk."""
+    cv = CountVectorizer(ngram_range=ngram_range, binary=True, dtype=np.int32)
+    try:
+        counts = cv.fit_transform(texts)
+    except ValueError:  # chunk with no tokens at all
+        return pd.Series(dtype=np.int64)
+    return pd.Series(np.asarray(counts.sum(axis=0)).ravel(), index=cv.get_feature_names_out())
+
+
+def _chunk_hashed_df(texts, hasher) -> np.ndarray:
+    counts = hasher.transform(texts)
+    return np.bincount(counts.indices, minlength=hasher.n_features)
+
+
+def _chunk_counts(texts, vectorizer) -> sp.csr_matrix:
+    return vectorizer.transform(texts).astype(np.float32).tocsr()
+
+
+class TextVectorizer(BaseEstimator, TransformerMixin):
+    """
+    TF-IDF n-grams per text column, returned as one CSR block.
+
+    mode="tfidf"  -> vocabulary of the max_features most frequent n-grams (df >= min_df)
+    mode="hashed" -> n_features hashed buckets (no vocabulary, IDF per bucket)
+    Rows are L2-normalised per column with smoothed IDF, as in sklearn's TfidfVectorizer;
+    the defaults here differ from sklearn's (sublinear_tf=True, ngram_range=(1, 2), min_df=2
+    against False, (1, 1) and 1), so pass those values to reproduce sklearn's output.
+    """
+
+    def __init__(self, columns=None, mode="tfidf", ngram_range=(1, 2), max_features=MAX_FEATURES, min_df=2,
+                 n_features=N_HASH_FEATURES, sublinear_tf=True, chunk_rows=CHUNK_ROWS, n_jobs=-1):
+        self.columns = columns
+        self.mode = mode
+        self.ngram_range = ngram_range
+        self.max_features = max_features
+        self.min_df = min_df
+        self.n_features = n_features
+        self.sublinear_tf = sublinear_tf
+        self.chunk_rows = chunk_rows
+        self.n_jobs = n_jobs
+
+    # ---------------------------
+    # FIT
+    # ---------------------------
+    def fit(self, X: pd.DataFrame, y=None):
+        if self.mode not in TEXT_MODES:
+            raise ValueError(f"Unknown text mode: {self.mode}")
+        self.columns_ = list(self.columns) if self.columns is not None else text_columns(X)
+        self.vectorizers_, self.idf_ = {}, {}
+        n = len(X)
+        chunks = _chunks(n, self.chunk_rows)
+        ngram = tuple(self.ngram_range)
+
+        for col in self.columns_:
+            texts = _texts(X[col])
+            if self.mode == "tfidf":
+                parts = Parallel(n_jobs=self.n_jobs)(
+                    delayed(_chunk_vocab_df)(texts[a:b], ngram) for a, b in chunks
+                )
+                doc_freq = pd.concat(parts).groupby(level=0).sum() if parts else pd.Series(dtype=np.int64)
+                doc_freq = doc_freq[doc_freq >= self.min_df]
+                # Most frequent first; ties broken alphabetically so the fit is deterministic
+                doc_freq = doc_freq.sort_index().sort_values(ascending=False, kind="stable").iloc[:self.max_features]
+                doc_freq = doc_freq.sort_index()
+                vectorizer = CountVectorizer(ngram_range=ngram, dtype=np.float32,
+                                             vocabulary={t: i for i, t in enumerate(doc_freq.index)})
+                df_values = doc_freq.to_numpy(dtype=np.float64)
+            else:
+                vectorizer = HashingVectorizer(n_features=self.n_features, ngram_range=ngram,
+                                               alternate_sign=False, norm=None, dtype=np.float32)
+                parts = Parallel(n_jobs=self.n_jobs)(
+                    delayed(_chunk_hashed_df)(texts[a:b], vectorizer) for a, b in chunks
+                )
+                df_values = np.sum(parts, axis=0).astype(np.float64)
+
+            self.vectorizers_[col] = vectorizer
+            # Smooth IDF (sklearn's default formula)
+            self.idf_[col] = (np.log((1 + n) / (1 + df_values)) + 1).astype(np.float32)
+        return self
+
+    # ---------------------------
+    # TRANSFORM
+    # ---------------------------
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        names = []
+        for col in self.columns_:
+            vec = self.vectorizers_[col]
+            if self.mode == "tfidf":
+                names.extend(f"{col}__{t}" for t in vec.get_feature_names_out())
+            else:
+                names.extend(f"{col}__h{i}" for i in range(vec.n_features))
+        return np.asarray(names, dtype=object)
+
+    def transform_sparse(self, X: pd.DataFrame) -> sp.csr_matrix:
+        """(n x total features) float32 CSR - never densified."""
+        blocks = []
+        chunks = _chunks(len(X), self.chunk_rows)
+        for col in self.columns_:
+            texts = _texts(X[col])
+            vec = self.vectorizers_[col]
+            parts = Parallel(n_jobs=self.n_jobs)(delayed(_chunk_counts)(texts[a:b], vec) for a, b in chunks)
+            M = sp.vstack(parts, format="csr")
+            if self.sublinear_tf:
+                np.log(M.data, out=M.data)
+                M.data += 1
+            M.data *= self.idf_[col][M.indices]
+            blocks.append(normalize(M, copy=False))
+        if not blocks:
+            return sp.csr_matrix((len(X), 0), dtype=np.float32)
+        return sp.hstack(blocks, format="csr", dtype=np.float32)
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Text columns replaced by sparse-backed TF-IDF columns (pandas SparseDtype)."""
+        feats = pd.DataFrame.sparse.from_spmatrix(self.transform_sparse(X), index=X.index,
+                                                  columns=self.get_feature_names_out())
+        return pd.concat([X.drop(columns=self.columns_), feats], axis=1, copy=False)
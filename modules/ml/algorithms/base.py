@@ -0,0 +1,245 @@
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+
+# ---------------------------------------------------------
+# UNIFORM MODEL WRAPPER
+# Every backend (sklearn, XGBoost, LightGBM, CatBoost) exposes the
+# same fit / predict / predict_proba / feature_importances_ surface,
+# so the ML, evaluation and export pages never branch on library.
+# ---------------------------------------------------------
+TASKS = ["Classification", "Regression"]
+
+
+class NativeDataCache:
+    """
+    Remembers the native training structure (DMatrix, lgb.Dataset, Pool) built
+    for a frame, so repeated fits on the same data (CV folds, tuning trials,
+    warm starts) skip the conversion. Entries die with the frame they describe.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def get(self, X, y, tag: str, build):
+        key = (id(X), id(y), tag)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is X and entry[1]() is y:
+            return entry[2]
+        value = build()
+        try:
+            refs = (weakref.ref(X), weakref.ref(y) if y is not None else (lambda: None))
+        except TypeError:  # plain ndarrays of some dtypes cannot be weak-referenced
+            return value
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (*refs, value)
+        return value
+
+
+class BaseModel(BaseEstimator):
+    """
+    Common surface for all registered algorithms.
+
+    task    -> "Classification" or "Regression"
+    params  -> library-specific hyperparameters (merged over the backend defaults)
+    Classification labels of any dtype are mapped to 0..k-1 internally; classes_
+    keeps the originals so predict() returns them unchanged.
+    Boosting backends set best_iteration_: 0-based index of the last round used
+    by predict() (the early-stopping optimum when an eval_set was given).
+    """
+
+    library = "sklearn"
+    native_categorical = False
+    default_params = {}
+    thread_param = None  # library parameter that sets its thread count
+    estimator_param = "n_estimators"  # parameter that counts trees / boosting rounds
+    supports_warm_start = False  # can add trees to a fitted model (grow)
+    supports_early_stopping = False  # honours eval_set / early_stopping_rounds
+    accepts_sparse = True  # trains on CSR / sparse-backed frames without densifying
+
+    def __init__(self, task="Classification", params=None):
+        self.task = task
+        self.params = params
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.task == "Classification"
+
+    def _params(self) -> dict:
+        return {**self.default_params, **(self.params or {})}
+
+    def set_threads(self, n_threads: int):
+        """Cap the library's own thread pool (used to split a global thread budget)."""
+        if self.thread_param:
+            self.params = {**(self.params or {}), self.thread_param: int(n_threads)}
+        return self
+
+    # ---------------------------
+    # LABELS
+    # ---------------------------
+    def _encode_y(self, y) -> np.ndarray:
+        if not self.is_classifier:
+            return np.asarray(y, dtype=np.float64)
+        y = np.asarray(y)
+        if not hasattr(self, "classes_"):
+            self.classes_, codes = np.unique(y, return_inverse=True)
+            return codes
+        codes = np.clip(np.searchsorted(self.classes_, y), 0, len(self.classes_) - 1)
+        unknown = self.classes_[codes] != y
+        if unknown.any():
+            raise ValueError(f"Labels not seen at fit time: {pd.unique(y[unknown])[:5].tolist()}")
+        return codes
+
+    def _encode_eval(self, eval_set):
+        """Encoded eval_set; rows labelled with a class the model never saw cannot be scored and are dropped."""
+        if eval_set is None:
+            return None
+        X, y = eval_set
+        if self.is_classifier:
+            y = np.asarray(y)
+            known = np.isin(y, self.classes_)
+            if not known.all():
+                X, y = (X.iloc[known] if hasattr(X, "iloc") else X[known]), y[known]
+        return X, self._encode_y(y)
+
+    @property
+    def n_classes_(self) -> int:
+        return len(self.classes_) if self.is_classifier else 0
+
+    # ---------------------------
+    # API
+    # ---------------------------
+    def fit(self, X, y, eval_set=None, early_stopping_rounds=None):
+        if hasattr(self, "classes_"):
+            del self.classes_
+        y_enc = self._encode_y(y)
+        eval_enc = self._encode_eval(eval_set)
+        self._fit(X, y_enc, eval_enc, early_stopping_rounds)
+        # An early-stopped model may hold fewer rounds than n_trees, so it is never grown
+        self.early_stopped_ = bool(early_stopping_rounds)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object) if hasattr(X, "columns") else None
+        self.fit_id_ = uuid.uuid4().hex  # identifies this fitted state for caches (explanations)
+        return self
+
+    @property
+    def n_trees(self) -> int:
+        """Configured tree / boosting-round count (0 for models without one)."""
+        return int(self._params().get(self.estimator_param, 0))
+
+    def can_grow(self, params: dict) -> bool:
+        """True when params differ from this fitted model's only by a larger tree count."""
+        if not self.supports_warm_start or not hasattr(self, "feature_names_in_") or getattr(self, "early_stopped_", False):
+            return False
+        old, new = self._params(), {**self.default_params, **(params or {})}
+        key = self.estimator_param
+        same = {k: v for k, v in old.items() if k != key} == {k: v for k, v in new.items() if k != key}
+        return same and int(new.get(key, 0)) >= int(old.get(key, 0))
+
+    def grow(self, X, y, n_estimators: int, eval_set=None, early_stopping_rounds=None):
+        """
+        Continue a fitted model on the same training data up to n_estimators trees,
+        training only the added ones. Anything else falls back to a full fit.
+        """
+        current = self.n_trees
+        self.params = {**(self.params or {}), self.estimator_param: int(n_estimators)}
+        if (not self.supports_warm_start or not hasattr(self, "feature_names_in_") or getattr(self, "early_stopped_", False)
+                or early_stopping_rounds or n_estimators < current):
+            return self.fit(X, y, eval_set, early_stopping_rounds)
+        if n_estimators > current:
+            y_enc = self._encode_y(y)
+            eval_enc = self._encode_eval(eval_set)
+            self._grow(X, y_enc, eval_enc, early_stopping_rounds, n_estimators - current)
+            self.fit_id_ = uuid.uuid4().hex
+        return self
+
+    def predict(self, X):
+        if self.is_classifier:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return np.asarray(self._predict_raw(X), dtype=np.float64).ravel()
+
+    def predict_proba(self, X) -> np.ndarray:
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classification")
+        proba = np.asarray(self._predict_raw(X), dtype=np.float64)
+        if proba.ndim == 1:
+            proba = np.column_stack([1.0 - proba, proba])
+        return proba
+
+    def score(self, X, y) -> float:
+        y = np.asarray(y)
+        pred = self.predict(X)
+        if self.is_classifier:
+            return float(np.mean(pred == y))
+        return float(1.0 - np.sum((y - pred) ** 2) / np.sum((y - y.mean()) ** 2))
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        imp = np.asarray(self._importances(), dtype=np.float64)
+        total = imp.sum()
+        return imp / total if total > 0 else imp
+
+    def contributions(self, X) -> tuple:
+        """
+        Exact per-row feature contributions (TreeSHAP) in the model's raw output space.
+        Returns (values (rows, outputs, features), base (outputs,)): one output for
+        regression and binary tasks (log-odds of classes_[1]), one per class otherwise.
+        Raises AttributeError when the backend has no native implementation.
+        """
+        values = np.asarray(self._contributions(X), dtype=np.float64)
+        if values.ndim == 2:
+            values = values[:, None, :]
+        # The last column is the bias term, identical on every row
+        return values[..., :-1], values[0, :, -1]
+
+    # Backend hooks
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        raise NotImplementedError
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra: int):
+        raise NotImplementedError
+
+    def _predict_raw(self, X):
+        raise NotImplementedError
+
+    def _importances(self):
+        # AttributeError keeps hasattr(model, "feature_importances_") False
+        raise AttributeError(f"{type(self).__name__} has no feature importances")
+
+    def _contributions(self, X):
+        raise AttributeError(f"{type(self).__name__} has no native SHAP values")
+
+
+def category_columns(X) -> list:
+    """Columns a native-categorical learner should treat as categories."""
+    if not isinstance(X, pd.DataFrame):
+        return []
+    return X.select_dtypes(include=["category", "object", "string"]).columns.tolist()
+
+
+def to_categorical(X, categories: dict = None):
+    """
+    object / string / category columns -> category dtype. Passing the categories
+    seen at fit time keeps the integer codes identical between training and scoring.
+    Returns (frame, {column: categories}).
+    """
+    cols = category_columns(X)
+    if not cols:
+        return X, {}
+    X = X.copy()
+    seen = {}
+    for c in cols:
+        if categories is not None and c in categories:
+            X[c] = pd.Categorical(X[c], categories=categories[c])
+        else:
+            X[c] = X[c].astype("category")
+        seen[c] = X[c].cat.categories
+    return X, seen
@@ -0,0 +1,90 @@
+import numpy as np
+
+from modules.ml.algorithms.base import BaseModel, NativeDataCache, category_columns
+
+try:
+    import catboost as cb
+except ImportError:  # optional backend
+    cb = None
+
+# ---------------------------------------------------------
+# CATBOOST BACKEND
+# Ordered target statistics on raw string categories (no encoding
+# step), symmetric trees, all cores. The string-cast training frame
+# is cached per frame so repeated fits only rebuild the Pool.
+# ---------------------------------------------------------
+_CACHE = NativeDataCache()
+
+
+def _cat_frame(X, cat_cols):
+    """CatBoost needs categorical values as strings (NaN as its own level)."""
+    if not cat_cols:
+        return X
+    X = X.copy()
+    for c in cat_cols:
+        X[c] = X[c].astype(str)
+    return X
+
+
+class CatBoostModel(BaseModel):
+    library = "catboost"
+    native_categorical = True
+    thread_param = "thread_count"
+    supports_warm_start = True
+    supports_early_stopping = True
+    default_params = {
+        "n_estimators": 300, "learning_rate": 0.1, "depth": 6,
+        "thread_count": -1, "border_count": 254, "verbose": 0, "allow_writing_files": False,
+    }
+
+    @classmethod
+    def available(cls) -> bool:
+        return cb is not None
+
+    def _train_params(self) -> dict:
+        params = self._params()
+        params["iterations"] = int(params.pop("n_estimators"))
+        if self.is_classifier:
+            params.setdefault("loss_function", "MultiClass" if self.n_classes_ > 2 else "Logloss")
+        else:
+            params.setdefault("loss_function", "RMSE")
+        return params
+
+    def _pool(self, X, y=None):
+        return cb.Pool(_cat_frame(X, self.cat_cols_), label=y, cat_features=self.cat_cols_)
+
+    @staticmethod
+    def _train_frame(X):
+        cat_cols = category_columns(X)
+        return _cat_frame(X, cat_cols), cat_cols
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        self.model_ = None
+        self._boost(X, y, eval_set, early_stopping_rounds, self._train_params()["iterations"])
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra):
+        self._boost(X, y, eval_set, early_stopping_rounds, extra)
+
+    def _boost(self, X, y, eval_set, early_stopping_rounds, rounds):
+        """Fit `rounds` more trees, continuing from model_ when it exists."""
+        params = {**self._train_params(), "iterations": rounds}
+        data, self.cat_cols_ = _CACHE.get(X, None, "cb", lambda: self._train_frame(X))
+        pool = cb.Pool(data, label=y, cat_features=self.cat_cols_)
+        model_cls = cb.CatBoostClassifier if self.is_classifier else cb.CatBoostRegressor
+        init_model, self.model_ = self.model_, model_cls(**params)
+        eval_pool = self._pool(*eval_set) if eval_set is not None else None
+        self.model_.fit(pool, eval_set=eval_pool, init_model=init_model,
+                        early_stopping_rounds=early_stopping_rounds if eval_pool is not None else None)
+        self.best_iteration_ = self.model_.tree_count_ - 1
+
+    def _predict_raw(self, X):
+        pool = self._pool(X)
+        if self.is_classifier:
+            return self.model_.predict_proba(pool)
+        return self.model_.predict(pool)
+
+    def _importances(self):
+        return np.asarray(self.model_.get_feature_importance(), dtype=np.float64)
+
+    def _contributions(self, X):
+        return self.model_.get_feature_importance(self._pool(X), type="ShapValues")
@@ -0,0 +1,254 @@
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier, SGDRegressor
+
+from modules.feature_engineering.transformers.encoding import N_HASH_FEATURES, HashingEncoder
+from modules.feature_engineering.transformers.scaling import ColumnScaler
+
+try:
+    import xgboost as xgb
+except ImportError:  # optional backend
+    xgb = None
+
+try:
+    import lightgbm as lgb
+except ImportError:  # optional backend
+    lgb = None
+
+# ---------------------------------------------------------
+# OUT-OF-CORE LEARNERS
+# Learners that only ever see one chunk of rows at a time:
+#   - SGD linear models through partial_fit,
+#   - XGBoost on an external-memory DMatrix fed by a DataIter (pages
+#     cached on disk, not in RAM),
+#   - LightGBM boosting a few rounds per chunk on top of the booster.
+# Every chunk is turned into the same fixed-width float32 CSR block by
+# StreamFeaturizer (streaming standardization + feature hashing), so
+# no vocabulary or one-hot layout has to be learned up front.
+# ---------------------------------------------------------
+
+
+class StreamFeaturizer:
+    """Numeric columns standardized with streaming moments, string columns hashed."""
+
+    def __init__(self, numeric_cols, categorical_cols, n_hash_features=N_HASH_FEATURES):
+        self.numeric_cols = list(numeric_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.scaler = ColumnScaler(columns=self.numeric_cols, method="standard") if self.numeric_cols else None
+        self.hasher = HashingEncoder(columns=self.categorical_cols, n_features=n_hash_features) \
+            if self.categorical_cols else None
+
+    @classmethod
+    def for_frame(cls, sample: pd.DataFrame, n_hash_features=N_HASH_FEATURES):
+        numeric = sample.select_dtypes(include=[np.number, "bool"]).columns.tolist()
+        return cls(numeric, [c for c in sample.columns if c not in numeric], n_hash_features)
+
+    def partial_fit(self, chunk: pd.DataFrame):
+        if self.scaler is not None:
+            self.scaler.partial_fit(chunk)
+        return self
+
+    @property
+    def feature_names(self) -> list:
+        hashed = list(self.hasher.get_feature_names_out()) if self.hasher is not None else []
+        return self.numeric_cols + hashed
+
+    def transform(self, chunk: pd.DataFrame) -> sp.csr_matrix:
+        blocks = []
+        if self.scaler is not None:
+            num = self.scaler.transform_array(chunk[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan))
+            # Missing values sit at the (scaled) mean
+            blocks.append(sp.csr_matrix(np.nan_to_num(num, nan=0.0), dtype=np.float32))
+        if self.hasher is not None:
+            blocks.append(self.hasher.transform_sparse(chunk))
+        return sp.hstack(blocks, format="csr", dtype=np.float32)
+
+
+class IncrementalLearner:
+    """
+    Common surface: set_target() with the classes / target moments from a first
+    pass, then fit_stream(make_batches), where make_batches() returns a fresh
+    iterator of (CSR block, labels) each time a learner needs another pass.
+    """
+
+    library = "sklearn"
+
+    def __init__(self, task="Classification", params=None):
+        self.task = task
+        self.params = params or {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.task == "Classification"
+
+    def set_target(self, classes=None, y_mean=0.0, y_std=1.0):
+        self.classes_ = np.asarray(classes) if classes is not None else None
+        self.y_mean_, self.y_std_ = float(y_mean), float(y_std) if y_std > 0 else 1.0
+        return self
+
+    def _codes(self, y) -> np.ndarray:
+        if self.is_classifier:
+            return np.searchsorted(self.classes_, np.asarray(y))
+        return (np.asarray(y, dtype=np.float64) - self.y_mean_) / self.y_std_
+
+    def predict(self, X) -> np.ndarray:
+        if self.is_classifier:
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self._predict_raw(X) * self.y_std_ + self.y_mean_
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = np.asarray(self._predict_raw(X), dtype=np.float64)
+        if proba.ndim == 1:
+            proba = np.column_stack([1.0 - proba, proba])
+        return proba
+
+    def fit_stream(self, make_batches, epochs: int = 1):
+        raise NotImplementedError
+
+    def _predict_raw(self, X):
+        raise NotImplementedError
+
+
+class SGDLearner(IncrementalLearner):
+    """Logistic / least-squares linear model trained with partial_fit."""
+
+    def fit_stream(self, make_batches, epochs: int = 1):
+        params = {"alpha": 1e-4, "random_state": 42, **self.params}
+        if self.is_classifier:
+            self.model_ = SGDClassifier(loss="log_loss", **params)
+        else:
+            self.model_ = SGDRegressor(**params)
+        classes = np.arange(len(self.classes_)) if self.is_classifier else None
+        for _ in range(epochs):
+            for X, y in make_batches():
+                if self.is_classifier:
+                    self.model_.partial_fit(X, self._codes(y), classes=classes)
+                else:
+                    self.model_.partial_fit(X, self._codes(y))
+        return self
+
+    def _predict_raw(self, X):
+        if self.is_classifier:
+            return self.model_.predict_proba(X)
+        return self.model_.predict(X)
+
+
+class _BatchIter(xgb.DataIter if xgb is not None else object):
+    """Feeds (X, y) batches to XGBoost; reset() starts a new pass over the file."""
+
+    def __init__(self, make_batches, encode, cache_prefix):
+        self._make_batches, self._encode, self._it = make_batches, encode, None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> int:
+        if self._it is None:
+            self._it = iter(self._make_batches())
+        try:
+            X, y = next(self._it)
+        except StopIteration:
+            return 0
+        input_data(data=X, label=self._encode(y))
+        return 1
+
+    def reset(self):
+        self._it = None
+
+
+class XGBoostStreamLearner(IncrementalLearner):
+    """Histogram boosting on an external-memory DMatrix (pages cached in a temp dir)."""
+
+    library = "xgboost"
+
+    @classmethod
+    def available(cls) -> bool:
+        return xgb is not None
+
+    def fit_stream(self, make_batches, epochs: int = 1):
+        params = {"tree_method": "hist", "eta": 0.1, "max_depth": 6, "max_bin": 256, **self.params}
+        rounds = int(params.pop("n_estimators", 200))
+        if self.is_classifier and len(self.classes_) > 2:
+            params.update(objective="multi:softprob", num_class=len(self.classes_))
+        elif self.is_classifier:
+            params.update(objective="binary:logistic")
+        else:
+            params.setdefault("objective", "reg:squarederror")
+        cache_dir = tempfile.mkdtemp(prefix="autods_xgb_")
+        try:
+            dtrain = xgb.DMatrix(_BatchIter(make_batches, self._codes, cache_dir + "/cache"))
+            # Every boosting round already streams over all cached pages; epochs do not apply
+            self.booster_ = xgb.train(params, dtrain, num_boost_round=rounds)
+            del dtrain  # releases the page files before the directory is removed
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        return self
+
+    def _predict_raw(self, X):
+        return self.booster_.predict(xgb.DMatrix(X))
+
+
+class LightGBMStreamLearner(IncrementalLearner):
+    """Continued boosting: each chunk adds rounds_per_chunk trees to the running booster."""
+
+    library = "lightgbm"
+
+    @classmethod
+    def available(cls) -> bool:
+        return lgb is not None
+
+    def fit_stream(self, make_batches, epochs: int = 1):
+        params = {"learning_rate": 0.1, "num_leaves": 31, "verbosity": -1, **self.params}
+        rounds = int(params.pop("rounds_per_chunk", 20))
+        if self.is_classifier and len(self.classes_) > 2:
+            params.update(objective="multiclass", num_class=len(self.classes_))
+        elif self.is_classifier:
+            params.update(objective="binary")
+        else:
+            params.setdefault("objective", "regression")
+        self.booster_ = None
+        for _ in range(epochs):
+            for X, y in make_batches():
+                data = lgb.Dataset(X, label=self._codes(y), params={"verbosity": -1})
+                self.booster_ = lgb.train(params, data, num_boost_round=rounds, init_model=self.booster_,
+                                          keep_training_booster=True)
+        return self
+
+    def _predict_raw(self, X):
+        return self.booster_.predict(X)
+
+
+class StreamModel:
+    """Fitted featurizer + learner: scores raw frames chunk by chunk."""
+
+    def __init__(self, featurizer: StreamFeaturizer, learner: IncrementalLearner, features: list):
+        self.featurizer = featurizer
+        self.learner = learner
+        self.features = list(features)
+
+    @property
+    def classes_(self):
+        return self.learner.classes_
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.learner.predict(self.featurizer.transform(df[self.features]))
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self.learner.predict_proba(self.featurizer.transform(df[self.features]))
+
+
+INCREMENTAL_LEARNERS = {
+    "SGD (linear)": SGDLearner,
+    "XGBoost (external memory)": XGBoostStreamLearner,
+    "LightGBM (chunked boosting)": LightGBMStreamLearner,
+}
+
+
+def available_incremental_learners() -> list:
+    return [name for name, cls in INCREMENTAL_LEARNERS.items() if cls.available()]
@@ -0,0 +1,88 @@
+import numpy as np
+
+from modules.ml.algorithms.base import BaseModel, NativeDataCache, to_categorical
+
+try:
+    import lightgbm as lgb
+except ImportError:  # optional backend
+    lgb = None
+
+# ---------------------------------------------------------
+# LIGHTGBM BACKEND
+# Native lgb.train() on a binned Dataset (histograms built once and
+# cached per frame), leaf-wise growth, all cores and native splits on
+# pandas category columns. Growing a fitted model continues from its
+# booster (init_model).
+# ---------------------------------------------------------
+_CACHE = NativeDataCache()
+
+
+class LightGBMModel(BaseModel):
+    library = "lightgbm"
+    native_categorical = True
+    thread_param = "num_threads"
+    supports_warm_start = True
+    supports_early_stopping = True
+    default_params = {
+        "n_estimators": 300, "learning_rate": 0.1, "num_leaves": 31,
+        "max_bin": 255, "num_threads": 0, "verbosity": -1,
+    }
+
+    @classmethod
+    def available(cls) -> bool:
+        return lgb is not None
+
+    def _train_params(self) -> tuple:
+        params = self._params()
+        rounds = int(params.pop("n_estimators"))
+        if self.is_classifier and self.n_classes_ > 2:
+            params.update(objective="multiclass", num_class=self.n_classes_)
+        elif self.is_classifier:
+            params.update(objective="binary")
+        else:
+            params.setdefault("objective", "regression")
+        return params, rounds
+
+    def _train_set(self, X):
+        data, categories = to_categorical(X)
+        # free_raw_data=False lets the cached Dataset be re-labelled and reused
+        return lgb.Dataset(data, free_raw_data=False, params={"max_bin": self._params()["max_bin"]}), categories
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        _, rounds = self._train_params()
+        self.booster_ = None
+        self._boost(X, y, eval_set, early_stopping_rounds, rounds)
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra):
+        self._boost(X, y, eval_set, early_stopping_rounds, extra)
+
+    def _boost(self, X, y, eval_set, early_stopping_rounds, rounds):
+        """Train `rounds` more boosting rounds, starting from booster_ when it exists."""
+        params, _ = self._train_params()
+        dtrain, self.categories_ = _CACHE.get(X, None, "lgb", lambda: self._train_set(X))
+        dtrain.set_label(y)
+
+        valid_sets, callbacks = [], []
+        if eval_set is not None:
+            data, _ = to_categorical(eval_set[0], self.categories_)
+            valid_sets = [lgb.Dataset(data, label=eval_set[1], reference=dtrain)]
+            if early_stopping_rounds:
+                callbacks.append(lgb.early_stopping(early_stopping_rounds, verbose=False))
+        self.booster_ = lgb.train(params, dtrain, num_boost_round=rounds, valid_sets=valid_sets,
+                                  callbacks=callbacks, init_model=self.booster_)
+        self.best_iteration_ = (self.booster_.best_iteration or self.booster_.current_iteration()) - 1
+
+    def _predict_raw(self, X):
+        data, _ = to_categorical(X, self.categories_)
+        return self.booster_.predict(data, num_iteration=self.best_iteration_ + 1)
+
+    def _importances(self):
+        return self.booster_.feature_importance(importance_type="gain")
+
+    def _contributions(self, X):
+        data, _ = to_categorical(X, self.categories_)
+        values = self.booster_.predict(data, num_iteration=self.best_iteration_ + 1, pred_contrib=True)
+        if self.n_classes_ > 2:
+            # class blocks side by side -> (rows, classes, features + 1)
+            values = np.asarray(values).reshape(len(data), self.n_classes_, -1)
+        return values
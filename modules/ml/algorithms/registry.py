@@ -0,0 +1,109 @@
+from modules.ml.algorithms.base import TASKS
+from modules.ml.algorithms.catboost_model import CatBoostModel
+from modules.ml.algorithms.lightgbm_model import LightGBMModel
+from modules.ml.algorithms.sklearn_models import (
+    ExtraTreesModel, GradientBoostingModel, HistGradientBoostingModel, LinearModel, RandomForestModel,
+)
+from modules.ml.algorithms.xgboost_model import XGBoostModel
+
+# ---------------------------------------------------------
+# ALGORITHM REGISTRY
+# name -> wrapper class and the hyperparameters the UI exposes.
+# Optional libraries that are not installed simply drop out of
+# available_algorithms(); nothing else has to check for them.
+# ---------------------------------------------------------
+ALGORITHM_CATALOG = {
+    "LightGBM": {
+        "cls": LightGBMModel,
+        "description": "Histogram boosting, leaf-wise trees, native categoricals. Fastest on large tables.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 50, "max": 2000, "default": 300},
+            "learning_rate": {"type": "float", "min": 0.01, "max": 0.5, "default": 0.1},
+            "num_leaves": {"type": "int", "min": 8, "max": 512, "default": 31},
+        },
+    },
+    "XGBoost": {
+        "cls": XGBoostModel,
+        "description": "Histogram boosting (tree_method=hist) with native categorical splits.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 50, "max": 2000, "default": 300},
+            "learning_rate": {"type": "float", "min": 0.01, "max": 0.5, "default": 0.1},
+            "max_depth": {"type": "int", "min": 2, "max": 16, "default": 6},
+        },
+    },
+    "CatBoost": {
+        "cls": CatBoostModel,
+        "description": "Ordered boosting on raw string categories; strong defaults.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 50, "max": 2000, "default": 300},
+            "learning_rate": {"type": "float", "min": 0.01, "max": 0.5, "default": 0.1},
+            "depth": {"type": "int", "min": 2, "max": 10, "default": 6},
+        },
+    },
+    "Hist Gradient Boosting": {
+        "cls": HistGradientBoostingModel,
+        "description": "scikit-learn's histogram boosting; always available.",
+        "params": {
+            "max_iter": {"type": "int", "min": 50, "max": 2000, "default": 200},
+            "learning_rate": {"type": "float", "min": 0.01, "max": 0.5, "default": 0.1},
+            "max_leaf_nodes": {"type": "int", "min": 8, "max": 512, "default": 31},
+        },
+    },
+    "Random Forest": {
+        "cls": RandomForestModel,
+        "description": "Bagged deep trees on all cores.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 10, "max": 500, "default": 100},
+            "max_depth": {"type": "int", "min": 1, "max": 50, "default": 10},
+        },
+    },
+    "Extra Trees": {
+        "cls": ExtraTreesModel,
+        "description": "Randomized split trees; faster than Random Forest.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 10, "max": 500, "default": 100},
+            "max_depth": {"type": "int", "min": 1, "max": 50, "default": 10},
+        },
+    },
+    "Gradient Boosting": {
+        "cls": GradientBoostingModel,
+        "description": "Classic single-threaded gradient boosting.",
+        "params": {
+            "n_estimators": {"type": "int", "min": 10, "max": 500, "default": 100},
+            "learning_rate": {"type": "float", "min": 0.01, "max": 0.5, "default": 0.1},
+        },
+    },
+    "Linear/Logistic Regression": {
+        "cls": LinearModel,
+        "description": "Linear baseline.",
+        "params": {},
+    },
+}
+
+# Tried by Auto-ML, fastest first
+AUTO_ML_CANDIDATES = ["LightGBM", "XGBoost", "CatBoost", "Hist Gradient Boosting", "Random Forest"]
+
+
+def available_algorithms() -> list:
+    """Registered algorithms whose library is installed."""
+    return [name for name, spec in ALGORITHM_CATALOG.items() if spec["cls"].available()]
+
+
+def create_model(name: str, task: str, params: dict = None):
+    """Unfitted wrapper for a registered algorithm."""
+    if task not in TASKS:
+        raise ValueError(f"Unknown task: {task}")
+    spec = ALGORITHM_CATALOG.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown algorithm: {name}")
+    if not spec["cls"].available():
+        raise ImportError(f"{name} is not installed ({spec['cls'].library}).")
+    return spec["cls"](task=task, params=params)
+
+
+def uses_native_categoricals(name: str) -> bool:
+    return ALGORITHM_CATALOG[name]["cls"].native_categorical
+
+
+def accepts_sparse(name: str) -> bool:
+    return ALGORITHM_CATALOG[name]["cls"].accepts_sparse
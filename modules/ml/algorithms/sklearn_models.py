@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.ensemble import (
+    ExtraTreesClassifier, ExtraTreesRegressor,
+    GradientBoostingClassifier, GradientBoostingRegressor,
+    HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+    RandomForestClassifier, RandomForestRegressor,
+)
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from modules.ml.algorithms.base import BaseModel
+
+# ---------------------------------------------------------
+# SCIKIT-LEARN BACKENDS
+# Thin wrappers that pick the estimator for the task and turn on
+# multithreading where sklearn supports it (n_jobs=-1). Ensembles
+# grow through warm_start instead of refitting.
+# ---------------------------------------------------------
+
+
+class SklearnModel(BaseModel):
+    """Wraps a (classifier, regressor) pair of sklearn estimators."""
+
+    estimators = (None, None)
+
+    def _build(self):
+        cls = self.estimators[0] if self.is_classifier else self.estimators[1]
+        return cls(**self._params())
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        self.model_ = self._build()
+        self.model_.fit(X, y)
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra):
+        # sklearn's warm_start keeps the fitted trees and only builds the new ones
+        self.model_.set_params(warm_start=True, **{self.estimator_param: self._params()[self.estimator_param]})
+        self.model_.fit(X, y)
+
+    def _predict_raw(self, X):
+        if self.is_classifier:
+            return self.model_.predict_proba(X)
+        return self.model_.predict(X)
+
+    def _importances(self):
+        if hasattr(self.model_, "feature_importances_"):
+            return self.model_.feature_importances_
+        if hasattr(self.model_, "coef_"):
+            coef = np.abs(np.atleast_2d(self.model_.coef_))
+            return coef.mean(axis=0)
+        return super()._importances()
+
+
+class RandomForestModel(SklearnModel):
+    estimators = (RandomForestClassifier, RandomForestRegressor)
+    thread_param = "n_jobs"
+    supports_warm_start = True
+    default_params = {"n_estimators": 100, "n_jobs": -1}
+
+
+class ExtraTreesModel(SklearnModel):
+    estimators = (ExtraTreesClassifier, ExtraTreesRegressor)
+    thread_param = "n_jobs"
+    supports_warm_start = True
+    default_params = {"n_estimators": 100, "n_jobs": -1}
+
+
+class GradientBoostingModel(SklearnModel):
+    estimators = (GradientBoostingClassifier, GradientBoostingRegressor)
+    supports_warm_start = True
+    supports_early_stopping = True
+    default_params = {"n_estimators": 100}
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        self.model_ = self._build()
+        if early_stopping_rounds:
+            # sklearn holds out its own validation_fraction rather than using eval_set
+            self.model_.set_params(n_iter_no_change=early_stopping_rounds, validation_fraction=0.1)
+        self.model_.fit(X, y)
+
+
+def _require_dense(X):
+    if sp.issparse(X) or (isinstance(X, pd.DataFrame) and any(isinstance(t, pd.SparseDtype) for t in X.dtypes)):
+        raise ValueError("Hist Gradient Boosting needs dense input, and this design is sparse (text or hashed "
+                         "columns). Use LightGBM, XGBoost, Random Forest or a linear model instead.")
+
+
+class HistGradientBoostingModel(SklearnModel):
+    """
+    Histogram-binned boosting (LightGBM-style) shipped with sklearn.
+    It only takes dense input, so sparse designs are refused rather than densified.
+    """
+
+    estimators = (HistGradientBoostingClassifier, HistGradientBoostingRegressor)
+    estimator_param = "max_iter"
+    supports_warm_start = True
+    supports_early_stopping = True
+    accepts_sparse = False
+    default_params = {"max_iter": 200}
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        _require_dense(X)
+        params = self._params()
+        if early_stopping_rounds:
+            params.update(early_stopping=True, n_iter_no_change=early_stopping_rounds)
+        cls = self.estimators[0] if self.is_classifier else self.estimators[1]
+        self.model_ = cls(**params)
+        self.model_.fit(X, y)
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra):
+        _require_dense(X)
+        super()._grow(X, y, eval_set, early_stopping_rounds, extra)
+
+
+class LinearModel(SklearnModel):
+    estimators = (LogisticRegression, LinearRegression)
+
+    def _build(self):
+        if self.is_classifier:
+            return LogisticRegression(**{"max_iter": 1000, **self._params()})
+        return LinearRegression(**self._params())
@@ -0,0 +1,88 @@
+import numpy as np
+
+from modules.ml.algorithms.base import BaseModel, NativeDataCache, to_categorical
+
+try:
+    import xgboost as xgb
+except ImportError:  # optional backend
+    xgb = None
+
+# ---------------------------------------------------------
+# XGBOOST BACKEND
+# Native train() API with the histogram tree method, all cores and
+# native categorical splits. The training DMatrix is cached per frame
+# so CV folds / tuning trials on the same data skip the conversion;
+# growing a fitted model continues boosting from its booster.
+# ---------------------------------------------------------
+_CACHE = NativeDataCache()
+
+
+class XGBoostModel(BaseModel):
+    library = "xgboost"
+    native_categorical = True
+    thread_param = "nthread"
+    supports_warm_start = True
+    supports_early_stopping = True
+    default_params = {
+        "n_estimators": 300, "learning_rate": 0.1, "max_depth": 6,
+        "tree_method": "hist", "max_bin": 256,
+    }
+
+    @classmethod
+    def available(cls) -> bool:
+        return xgb is not None
+
+    def _booster_params(self) -> tuple:
+        params = self._params()
+        rounds = int(params.pop("n_estimators"))
+        params["eta"] = params.pop("learning_rate")
+        if self.is_classifier and self.n_classes_ > 2:
+            params.update(objective="multi:softprob", num_class=self.n_classes_)
+        elif self.is_classifier:
+            params.update(objective="binary:logistic")
+        else:
+            params.setdefault("objective", "reg:squarederror")
+        return params, rounds
+
+    def _dmatrix(self, X, y=None):
+        # Category codes must match the ones seen at fit time
+        data, _ = to_categorical(X, self.categories_)
+        return xgb.DMatrix(data, label=y, enable_categorical=True, nthread=-1)
+
+    def _train_matrix(self, X):
+        data, categories = to_categorical(X)
+        return xgb.DMatrix(data, enable_categorical=True, nthread=-1), categories
+
+    def _fit(self, X, y, eval_set, early_stopping_rounds):
+        _, rounds = self._booster_params()
+        self.booster_ = None
+        self._boost(X, y, eval_set, early_stopping_rounds, rounds)
+
+    def _grow(self, X, y, eval_set, early_stopping_rounds, extra):
+        self._boost(X, y, eval_set, early_stopping_rounds, extra)
+
+    def _boost(self, X, y, eval_set, early_stopping_rounds, rounds):
+        """Train `rounds` more boosting rounds, on top of booster_ when it exists."""
+        params, _ = self._booster_params()
+        dtrain, self.categories_ = _CACHE.get(X, None, "xgb", lambda: self._train_matrix(X))
+        dtrain.set_label(y)
+        evals = []
+        if eval_set is not None:
+            evals = [(self._dmatrix(eval_set[0], eval_set[1]), "valid")]
+        stop = early_stopping_rounds if evals else None
+        self.booster_ = xgb.train(params, dtrain, num_boost_round=rounds, evals=evals,
+                                  early_stopping_rounds=stop, verbose_eval=False, xgb_model=self.booster_)
+        self.best_iteration_ = self.booster_.best_iteration if stop else self.booster_.num_boosted_rounds() - 1
+
+    def _predict_raw(self, X):
+        limit = (0, self.best_iteration_ + 1)
+        return self.booster_.predict(self._dmatrix(X), iteration_range=limit)
+
+    def _importances(self):
+        gain = self.booster_.get_score(importance_type="total_gain")
+        names = self.booster_.feature_names or [f"f{i}" for i in range(self.booster_.num_features())]
+        return np.array([gain.get(n, 0.0) for n in names])
+
+    def _contributions(self, X):
+        return self.booster_.predict(self._dmatrix(X), iteration_range=(0, self.best_iteration_ + 1),
+                                     pred_contribs=True)
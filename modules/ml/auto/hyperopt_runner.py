@@ -0,0 +1,230 @@
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+
+from core.data_manager import DATA_DIR
+from core.utils.caching import prune_disk_cache, touch_entry
+from modules.ml.algorithms.registry import ALGORITHM_CATALOG, create_model
+from modules.ml.auto.model_selector import higher_is_better, load_shared, plan_threads, score_predictions, shared_data
+
+# ---------------------------------------------------------
+# HYPERPARAMETER SEARCH (HYPERBAND / SUCCESSIVE HALVING)
+# Random configurations from the registry's parameter specs are
+# trained on a small resource (row sample or number of trees); only
+# the best 1/ETA of each rung is promoted to the next, larger one.
+# Trials of a rung run in parallel on a shared memory-mapped copy of
+# the data and everything stops at the wall-clock budget. Every
+# trial is appended to a JSON history per dataset version, so a
+# re-run reuses finished trials and seeds from the best past configs.
+# The MAX_HISTORIES most recently used histories are kept.
+# ---------------------------------------------------------
+ETA = 3
+MIN_ROWS = 500
+RESOURCES = ["rows", "n_estimators"]
+ESTIMATOR_PARAMS = ("n_estimators", "max_iter")
+HISTORY_DIR = os.path.join(DATA_DIR, "hyperopt")
+MAX_HISTORIES = 200
+
+
+# ---------------------------
+# SEARCH SPACE
+# ---------------------------
+def search_space(name: str) -> dict:
+    """Tunable parameters of an algorithm: {param: {type, min, max, default}}."""
+    return dict(ALGORITHM_CATALOG[name]["params"])
+
+
+def resource_param(name: str):
+    """Parameter that counts trees / boosting rounds, or None."""
+    return next((p for p in ESTIMATOR_PARAMS if p in ALGORITHM_CATALOG[name]["params"]), None)
+
+
+def sample_config(space: dict, rng: np.random.Generator) -> dict:
+    """One random configuration; wide positive ranges are sampled log-uniformly."""
+    config = {}
+    for param, spec in space.items():
+        lo, hi = spec["min"], spec["max"]
+        if lo > 0 and hi / lo >= 20:
+            value = math.exp(rng.uniform(math.log(lo), math.log(hi)))
+        else:
+            value = rng.uniform(lo, hi)
+        config[param] = int(round(value)) if spec["type"] == "int" else round(float(value), 4)
+    return config
+
+
+def _config_key(config: dict) -> str:
+    return json.dumps(config, sort_keys=True)
+
+
+# ---------------------------
+# TRIAL HISTORY
+# ---------------------------
+def history_path(version: str, name: str, context: dict = None) -> str:
+    """JSON history file for (dataset version, algorithm, context such as target/task)."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+    digest = hashlib.blake2b(json.dumps(context or {}, sort_keys=True).encode(), digest_size=6).hexdigest()
+    return os.path.join(HISTORY_DIR, f"{version}_{slug}_{digest}.json")
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    touch_entry(path)
+    with open(path) as f:
+        return json.load(f).get("trials", [])
+
+
+def save_history(path: str, trials: list, meta: dict = None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({**(meta or {}), "trials": trials}, f, indent=1)
+    os.replace(tmp, path)
+    prune_disk_cache(os.path.dirname(path), MAX_HISTORIES, keep=path)
+
+
+# ---------------------------
+# TRIALS
+# ---------------------------
+def _run_trial(path, name, task, config, resource, budget, n_threads, deadline):
+    if time.time() > deadline:
+        return None
+    X_train, y_train, X_val, y_val = load_shared(path)
+    params = dict(config)
+    if resource == "rows":
+        # Rows were shuffled once, so smaller samples are nested in larger ones
+        X_train, y_train = X_train.iloc[:budget], y_train.iloc[:budget]
+    else:
+        params[resource_param(name)] = budget
+    t0 = time.perf_counter()
+    try:
+        with threadpool_limits(limits=n_threads):
+            model = create_model(name, task, params).set_threads(n_threads)
+            model.fit(X_train, y_train)
+            # y_val is a read-only memmap, which sklearn's metrics cannot take as is
+            score = float(score_predictions(task, np.array(y_val), model.predict(X_val)))
+        error = None
+    except Exception as e:  # an invalid configuration is just a failed trial
+        score, error = float("nan"), str(e)
+    return {"params": config, "resource": budget, "score": score,
+            "fit_time": time.perf_counter() - t0, "error": error}
+
+
+def _loss(score: float, task: str) -> float:
+    if score is None or np.isnan(score):
+        return np.inf
+    return -score if higher_is_better(task) else score
+
+
+def _top(configs: list, results: dict, budget: int, k: int, task: str) -> list:
+    ranked = sorted(configs, key=lambda c: _loss(results[(_config_key(c), budget)]["score"], task))
+    return ranked[:k]
+
+
+def _warm_configs(trials: list, task: str, k: int) -> list:
+    """Best past configurations: largest resource reached first, then score."""
+    best = {}
+    for t in trials:
+        key = _config_key(t["params"])
+        rank = (-t["resource"], _loss(t["score"], task))
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, t["params"])
+    return [params for _, params in sorted(best.values(), key=lambda b: b[0])[:k]]
+
+
+# ---------------------------
+# SEARCH
+# ---------------------------
+def tune(X: pd.DataFrame, y: pd.Series, name: str, task: str, version: str = None, context: dict = None,
+         resource: str = "rows", method: str = "hyperband", time_budget: float = 60.0, max_resource: int = None,
+         n_jobs: int = -1, thread_budget: int = None, eta: int = ETA, val_size: float = 0.2,
+         random_state: int = 42) -> dict:
+    """
+    Tune one algorithm within time_budget seconds.
+
+    resource     -> "rows" (training sample size) or "n_estimators" (trees / rounds);
+                    falls back to rows when the algorithm has no such parameter
+    method       -> "hyperband" (several brackets) or "halving" (one successive-halving run)
+    version      -> dataset version; when given, trials are persisted and warm-start re-runs
+    Returns {"best_params", "best_score", "trials", "history_path", "completed"}.
+    """
+    space = search_space(name)
+    if resource == "n_estimators" and resource_param(name) is None:
+        resource = "rows"
+    if resource == "n_estimators":
+        space.pop(resource_param(name))
+
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=val_size, random_state=random_state)
+    order = np.random.default_rng(random_state).permutation(len(X_train))
+    X_train = X_train.iloc[order].reset_index(drop=True)
+    y_train = pd.Series(np.asarray(y_train)[order])
+
+    if resource == "rows":
+        max_r = min(max_resource or len(X_train), len(X_train))
+        min_r = min(MIN_ROWS, max_r)
+    else:
+        spec = ALGORITHM_CATALOG[name]["params"][resource_param(name)]
+        max_r, min_r = max_resource or spec["max"], spec["min"]
+    if max_r < max(min_r, 1):
+        raise ValueError(f"max_resource={max_resource} is below the smallest {resource} budget "
+                         f"({max(min_r, 1)}); no trial could run")
+    s_max = int(math.log(max_r / min_r) / math.log(eta) + 1e-9)
+
+    path = history_path(version, name, {**(context or {}), "resource": resource}) if version else None
+    past = load_history(path) if path else []
+    results = {(_config_key(t["params"]), t["resource"]): t for t in past}
+    # Re-runs draw fresh configurations rather than replaying the first run's
+    rng = np.random.default_rng(random_state + len(past))
+    new_trials = []
+    deadline = time.time() + time_budget
+    completed = True
+
+    brackets = range(s_max, -1, -1) if method == "hyperband" else [s_max]
+    with shared_data(X_train, y_train, X_val, y_val) as data_path:
+        for b, s in enumerate(brackets):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            configs = _warm_configs(past, task, n) if b == 0 else []
+            configs += [sample_config(space, rng) for _ in range(n - len(configs))]
+
+            for i in range(s + 1):
+                budget = int(round(max_r * eta ** (i - s)))
+                todo = [c for c in configs if (_config_key(c), budget) not in results]
+                workers, n_threads = plan_threads(max(1, len(todo)), n_jobs, thread_budget)
+                rows = Parallel(n_jobs=workers, backend="loky")(
+                    delayed(_run_trial)(data_path, name, task, c, resource, budget, n_threads, deadline)
+                    for c in todo
+                ) if todo else []
+                finished = [row for row in rows if row is not None]
+                for row in finished:
+                    results[(_config_key(row["params"]), budget)] = row
+                new_trials += finished
+                if path and finished:
+                    save_history(path, past + new_trials, {"algorithm": name, "task": task, "resource": resource})
+                if len(finished) < len(todo) or time.time() > deadline:
+                    completed = False
+                    break
+                configs = _top(configs, results, budget, max(1, len(configs) // eta), task)
+            if not completed:
+                break
+
+    trials = pd.DataFrame(list(results.values()), columns=["params", "resource", "score", "fit_time", "error"])
+    ok = trials[trials["score"].notna()]
+    if ok.empty:
+        return {"best_params": None, "best_score": None, "trials": trials, "history_path": path,
+                "completed": completed}
+    top = ok[ok["resource"] == ok["resource"].max()]
+    best = top.loc[top["score"].idxmax() if higher_is_better(task) else top["score"].idxmin()]
+    best_params = dict(best["params"])
+    if resource == "n_estimators":
+        best_params[resource_param(name)] = int(best["resource"])
+    return {"best_params": best_params, "best_score": float(best["score"]), "trials": trials,
+            "history_path": path, "completed": completed}
@@ -1,9 +1,16 @@
+import time
 import streamlit as st
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.metrics import accuracy_score, mean_squared_error
+from core.metrics import evaluate_model
+from core.sampling import extrapolate_time, time_curve
+from core.pipeline.design_matrix import get_design_matrix
+from modules.ml.algorithms.registry import (
+    AUTO_ML_CANDIDATES, accepts_sparse, available_algorithms, create_model, uses_native_categoricals,
+)
+from modules.utils import format_duration, render_sample_controls
+from modules.ml.auto.model_selector import (
+    N_FOLDS, cross_validate_models, higher_is_better, make_folds, score_predictions,
+)
 
 def render_auto_ml():
     st.header("⚡ Auto-ML")
@@ -21,49 +28,93 @@ def render_auto_ml():
     with col2:
         task_type = st.selectbox("Task Type (Auto-ML)", ["Classification", "Regression"])
 
+    # Large data: CV on a cached (stratified) sample, with an estimate for the full run
+    full_rows = len(df)
+    df = render_sample_controls(df, "auto_ml", by=target if task_type == "Classification" else None)
+
+    installed = available_algorithms()
+    candidates = [a for a in AUTO_ML_CANDIDATES if a in installed]
+    algo_names = st.multiselect("Algorithms to try", installed, default=candidates)
+    n_folds = st.number_input("Cross-validation folds", min_value=2, max_value=10, value=N_FOLDS)
+
     if st.button("🚀 Run Auto-ML"):
-        st.write("Training multiple models...")
-        X = df.drop(columns=[target])
-        y = df[target]
-        X = pd.get_dummies(X, drop_first=True)
+        if not algo_names:
+            st.warning("Select at least one algorithm.")
+            return
+        sampled = len(df) < full_rows
+        st.write(f"Cross-validating models on {len(df):,} sampled rows..." if sampled else "Cross-validating models...")
+        started = time.perf_counter()
+        features = [c for c in df.columns if c != target]
+        
+        # Same cached row split for every algorithm; native-categorical learners skip one-hot expansion
+        designs = {}
+        boards = []
+        
+        # One CV run per encoding, all sharing the same folds
+        for native in (True, False):
+            names = [n for n in algo_names if uses_native_categoricals(n) == native]
+            if not names:
+                continue
+            designs[native] = get_design_matrix(df, target, features, keep_categorical=native)
+            if designs[native].is_sparse:
+                # Dense-only learners would have to densify a text / hashed design
+                skipped = [n for n in names if not accepts_sparse(n)]
+                if skipped:
+                    st.info(f"Skipped {', '.join(skipped)}: the design is sparse (text or hashed columns).")
+                names = [n for n in names if accepts_sparse(n)]
+                if not names:
+                    continue
+            X_train, _, y_train, _ = designs[native].split()
+            folds = make_folds(y_train.reset_index(drop=True), task_type, int(n_folds))
+            cv = cross_validate_models(X_train, y_train, names, task_type, folds=folds)
+            boards.append(cv["leaderboard"])
+        
+        if not boards:
+            st.error("None of the selected algorithms can train on this sparse design.")
+            return
+        board = pd.concat(boards).sort_values("score", ascending=not higher_is_better(task_type))
+        board = board.drop(columns="rank").reset_index(drop=True)
+        board.insert(0, "rank", range(1, len(board) + 1))
+        st.dataframe(board, use_container_width=True)
+        
+        # Failed candidates sort last with a NaN score
+        if board["score"].isna().all():
+            st.error("Every candidate failed: " + "; ".join(f"{m}: {e}" for m, e in zip(board["model"], board["error"])))
+            return
         
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        best_name = board.loc[0, "model"]
+        st.success(f"Best Model: {best_name} with CV Score: {board.loc[0, 'score']:.4f}")
         
-        results = {}
-        models = {}
+        # Refit the winner on the full training split for the evaluation pages
+        design = designs[uses_native_categoricals(best_name)]
+        X_train, X_test, y_train, y_test = design.split()
+        model = create_model(best_name, task_type)
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        refit_seconds = time.perf_counter() - t0
+        elapsed = time.perf_counter() - started
+        preds = model.predict(X_test)
+        st.write(f"Hold-out score: {score_predictions(task_type, y_test, preds):.4f}")
         
-        if task_type == "Classification":
-            algos = {
-                "RandomForest": RandomForestClassifier(),
-                "GradientBoosting": GradientBoostingClassifier()
-            }
-            metric = accuracy_score
-        else:
-            algos = {
-                "RandomForest": RandomForestRegressor(),
-                "GradientBoosting": GradientBoostingRegressor()
-            }
-            metric = lambda y, p: mean_squared_error(y, p, squared=False)
-            
-        for name, algo in algos.items():
-            algo.fit(X_train, y_train)
-            preds = algo.predict(X_test)
-            score = metric(y_test, preds)
-            results[name] = score
-            models[name] = algo
-            st.write(f"Tested {name}: Score = {score:.4f}")
-            
-        # Pick best
-        if task_type == "Classification":
-            best_name = max(results, key=results.get)
-        else:
-            best_name = min(results, key=results.get) # Lower RMSE is better
-            
-        st.success(f"Best Model: {best_name} with Score: {results[best_name]:.4f}")
+        if sampled:
+            # Learning curve of the winner on 1/4 and 1/2 of the sample, extrapolated to all rows
+            fit_on = lambda m: create_model(best_name, task_type).fit(X_train.iloc[:m], y_train.iloc[:m])
+            points = time_curve(fit_on, [len(X_train) // 4, len(X_train) // 2]) + [(len(X_train), refit_seconds)]
+            full_train = int(len(X_train) * full_rows / len(df))
+            full_fit = extrapolate_time(points, full_train)
+            full_run = elapsed * full_fit / max(refit_seconds, 1e-9)
+            st.session_state["auto_ml_full_estimate"] = full_run
+            st.info(f"Fitting {best_name} on all {full_rows:,} rows: ~{format_duration(full_fit)}; "
+                    f"the whole Auto-ML run: ~{format_duration(full_run)}.")
         
         # Save best
-        st.session_state["trained_model"] = models[best_name]
+        st.session_state["trained_model"] = model
         st.session_state["model_X_test"] = X_test
         st.session_state["model_y_test"] = y_test
-        st.session_state["model_preds"] = models[best_name].predict(X_test)
+        st.session_state["model_preds"] = preds
+        st.session_state["model_evaluation"] = evaluate_model(model, X_test, y_test, task_type, preds=preds)
         st.session_state["model_task"] = task_type
+        st.session_state["model_encoder"] = design.encoder
+        st.session_state["model_target"] = target
+        st.session_state["model_design"] = design
+        st.session_state["model_leaderboard"] = board
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.metrics import accuracy_score, mean_squared_error
+from sklearn.model_selection import KFold, StratifiedKFold
+from threadpoolctl import threadpool_limits
+
+from modules.ml.algorithms.registry import create_model
+
+# ---------------------------------------------------------
+# CROSS-VALIDATED MODEL SELECTION
+# Every (algorithm, fold) fit is an independent task in a process
+# pool. X / y are dumped once to a joblib file and opened memory-
+# mapped by each worker (loaded once per worker, not pickled per
+# task). One global thread budget is split between workers, and
+# each fit is capped both through the library's own thread setting
+# and threadpoolctl (BLAS / OpenMP), so nested n_jobs never
+# oversubscribe the machine.
+# ---------------------------------------------------------
+N_FOLDS = 5
+
+# Per-worker memo of the memory-mapped data (one dataset at a time)
+_WORKER_DATA = {}
+
+
+@contextmanager
+def shared_data(*arrays):
+    """Dump arrays once to a temp joblib file; yields its path, removed on exit."""
+    tmp_dir = tempfile.mkdtemp(prefix="autods_cv_")
+    try:
+        path = os.path.join(tmp_dir, "data.joblib")
+        joblib.dump(arrays, path)
+        yield path
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_shared(path: str) -> tuple:
+    """Worker side of shared_data(): memory-mapped, loaded once per worker."""
+    if path not in _WORKER_DATA:
+        _WORKER_DATA.clear()
+        _WORKER_DATA[path] = joblib.load(path, mmap_mode="r")
+    return _WORKER_DATA[path]
+
+
+def score_predictions(task: str, y_true, y_pred) -> float:
+    """Accuracy for classification, RMSE for regression (same as the ML pages)."""
+    if task == "Classification":
+        return accuracy_score(y_true, y_pred)
+    return mean_squared_error(y_true, y_pred, squared=False)
+
+
+def higher_is_better(task: str) -> bool:
+    return task == "Classification"
+
+
+def _fit_fold(path, name, task, params, fold, train_idx, test_idx, n_threads):
+    X, y = load_shared(path)
+    try:
+        with threadpool_limits(limits=n_threads):
+            model = create_model(name, task, params).set_threads(n_threads)
+            X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+            t0 = time.perf_counter()
+            model.fit(X_train, y.iloc[train_idx])
+            t1 = time.perf_counter()
+            preds = model.predict(X_test)
+            t2 = time.perf_counter()
+        score = score_predictions(task, np.array(y.iloc[test_idx]), preds)
+    except Exception as e:
+        # One failing candidate becomes a NaN row instead of aborting the whole run
+        return {"model": name, "fold": fold, "score": np.nan, "fit_time": np.nan, "predict_time": np.nan,
+                "error": str(e)}
+    return {"model": name, "fold": fold, "score": score, "fit_time": t1 - t0, "predict_time": t2 - t1,
+            "error": None}
+
+
+def make_folds(y: pd.Series, task: str, n_folds: int = N_FOLDS, random_state: int = 42) -> list:
+    """(train_idx, test_idx) positional pairs; stratified when every class has n_folds rows."""
+    if task == "Classification" and y.value_counts().min() >= n_folds:
+        splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    else:
+        splitter = KFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def plan_threads(n_tasks: int, n_jobs: int = -1, thread_budget: int = None) -> tuple:
+    """(workers, threads per worker) so that workers * threads <= thread_budget."""
+    budget = thread_budget or os.cpu_count() or 1
+    workers = budget if n_jobs is None or n_jobs < 1 else min(n_jobs, budget)
+    workers = max(1, min(workers, n_tasks))
+    return workers, max(1, budget // workers)
+
+
+def cross_validate_models(X: pd.DataFrame, y: pd.Series, names: list, task: str, params: dict = None,
+                          n_folds: int = N_FOLDS, n_jobs: int = -1, thread_budget: int = None,
+                          folds: list = None, random_state: int = 42) -> dict:
+    """
+    K-fold CV of every algorithm in names (params: {name: hyperparameters}).
+    Returns {"leaderboard": per-model summary, "folds": per-fit rows}.
+    """
+    params = params or {}
+    X = X.reset_index(drop=True)
+    y = pd.Series(np.asarray(y)).reset_index(drop=True)
+    folds = folds if folds is not None else make_folds(y, task, n_folds, random_state)
+    tasks = [(name, f, tr, te) for name in names for f, (tr, te) in enumerate(folds)]
+    workers, n_threads = plan_threads(len(tasks), n_jobs, thread_budget)
+
+    with shared_data(X, y) as path:
+        rows = Parallel(n_jobs=workers, backend="loky")(
+            delayed(_fit_fold)(path, name, task, params.get(name), f, tr, te, n_threads)
+            for name, f, tr, te in tasks
+        )
+
+    fold_rows = pd.DataFrame(rows)
+    board = fold_rows.groupby("model", sort=False).agg(
+        score=("score", lambda s: s.mean(skipna=False)), score_std=("score", "std"),
+        fit_time=("fit_time", "mean"), predict_time=("predict_time", "mean"),
+        error=("error", "first"),
+    ).reset_index()
+    board = board.sort_values("score", ascending=not higher_is_better(task)).reset_index(drop=True)
+    board.insert(0, "rank", np.arange(1, len(board) + 1))
+    return {"leaderboard": board, "folds": fold_rows, "workers": workers, "threads_per_worker": n_threads}
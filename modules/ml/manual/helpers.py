@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+
+from core.data_manager import DataManager
+from core.metrics import ClassificationMetrics, RegressionMetrics, RunningMoments
+from modules.ml.algorithms.incremental import INCREMENTAL_LEARNERS, StreamFeaturizer, StreamModel
+
+# ---------------------------------------------------------
+# OUT-OF-CORE TRAINING
+# Parquet row groups are streamed from DataManager, so memory is
+# bounded by one row group plus the learner's state:
+#   pass 1  fit the featurizer (streaming moments), collect the
+#           classes or target moments,
+#   pass 2  train the incremental learner (more passes for epochs),
+#   pass 3  score the held-out rows into a metrics accumulator.
+# The held-out slice is a seeded random mask per row group, so every
+# pass agrees on which rows are held out without storing them.
+# ---------------------------------------------------------
+HOLDOUT_FRACTION = 0.1
+
+
+def holdout_mask(group: int, n_rows: int, fraction: float, seed: int = 42) -> np.ndarray:
+    return np.random.default_rng([seed, group]).random(n_rows) < fraction
+
+
+def _iter_split(file_path, target, features, holdout, seed, pipeline=None, held_out=False):
+    """Yield (group, rows) of the training (or held-out) part of every row group."""
+    columns = None if pipeline is not None else features + [target]
+    for g, chunk in enumerate(DataManager.iter_row_groups(file_path, columns=columns)):
+        mask = holdout_mask(g, len(chunk), holdout, seed)
+        chunk = chunk[mask] if held_out else chunk[~mask]
+        if pipeline is not None:
+            chunk = pipeline.transform(chunk)
+        chunk = chunk[chunk[target].notna()]
+        if len(chunk):
+            yield g, chunk
+
+
+def stream_train(file_path: str, target: str, features: list, task: str, learner_name: str,
+                 params: dict = None, holdout: float = HOLDOUT_FRACTION, epochs: int = 1,
+                 pipeline=None, progress=None, seed: int = 42) -> dict:
+    """
+    Train an incremental learner on a parquet file without loading it.
+    pipeline (optional) replays fitted feature transformers on every row group;
+    progress(fraction, message) is called as row groups are consumed.
+    Returns {"model", "metrics", "evaluation", "n_train", "n_holdout", "seconds"};
+    "evaluation" is the held-out metrics accumulator the evaluation pages render.
+    """
+    t0 = time.perf_counter()
+    n_groups = len(DataManager.row_group_sizes(file_path))
+    report = progress or (lambda fraction, message: None)
+    chunks = lambda held_out=False: _iter_split(file_path, target, features, holdout, seed, pipeline, held_out)
+
+    # Pass 1: featurizer statistics + target summary
+    featurizer, classes, n_train, y_moments = None, set(), 0, RunningMoments()
+    for g, chunk in chunks():
+        if featurizer is None:
+            featurizer = StreamFeaturizer.for_frame(chunk[features])
+        featurizer.partial_fit(chunk[features])
+        y = chunk[target]
+        n_train += len(y)
+        if task == "Classification":
+            classes.update(y.unique().tolist())
+        else:
+            y_moments.update(y.to_numpy(dtype=np.float64))
+        report((g + 1) / n_groups / 3, f"Pass 1: statistics, row group {g + 1}/{n_groups}")
+    if featurizer is None:
+        raise ValueError("No training rows found in the file.")
+
+    learner = INCREMENTAL_LEARNERS[learner_name](task=task, params=params)
+    if task == "Classification":
+        learner.set_target(classes=np.sort(np.asarray(list(classes), dtype=object)))
+    else:
+        learner.set_target(y_mean=y_moments.mean, y_std=y_moments.std)
+
+    # Pass 2: training
+    def batches():
+        for g, chunk in chunks():
+            # External-memory learners may walk the file several times
+            report(1 / 3 + (g + 1) / n_groups / 3, f"Pass 2: training, row group {g + 1}/{n_groups}")
+            yield featurizer.transform(chunk[features]), chunk[target].to_numpy()
+
+    learner.fit_stream(batches, epochs=epochs)
+    model = StreamModel(featurizer, learner, features)
+
+    # Pass 3: streaming evaluation on the held-out rows
+    if task == "Classification":
+        metrics = ClassificationMetrics(learner.classes_)
+    else:
+        metrics = RegressionMetrics()
+    for g, chunk in chunks(held_out=True):
+        if task == "Classification":
+            proba = model.predict_proba(chunk)
+            metrics.update(chunk[target].to_numpy(), learner.classes_[np.argmax(proba, axis=1)], proba)
+        else:
+            metrics.update(chunk[target].to_numpy(), model.predict(chunk))
+        report(2 / 3 + (g + 1) / n_groups / 3, f"Pass 3: evaluation, row group {g + 1}/{n_groups}")
+    report(1.0, "Done")
+    return {"model": model, "metrics": metrics.summary(), "evaluation": metrics, "n_train": n_train,
+            "n_holdout": metrics.n, "seconds": time.perf_counter() - t0}
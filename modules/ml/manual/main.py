@@ -1,9 +1,15 @@
+import time
 import streamlit as st
-import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.linear_model import LogisticRegression, LinearRegression
-from sklearn.metrics import accuracy_score, mean_squared_error
+from modules.ml.algorithms.registry import (
+    ALGORITHM_CATALOG, accepts_sparse, available_algorithms, create_model, uses_native_categoricals,
+)
+from core.metrics import evaluate_model
+from modules.ml.auto.hyperopt_runner import RESOURCES, tune
+from core.pipeline.design_matrix import get_design_matrix
+from modules.ml.manual.ui import render_stream_training
+from modules.utils import format_duration, render_sample_controls
+from core.sampling import extrapolate_time
 import pickle
 
 def render_manual_ml():
@@ -23,6 +29,10 @@ def render_manual_ml():
     
     with col2:
         task_type = st.selectbox("Task Type", ["Classification", "Regression"])
+    
+    # Large data: train on a cached (stratified) sample first
+    full_rows = len(df)
+    df = render_sample_controls(df, "manual_ml", by=target if task_type == "Classification" else None)
         
     features = st.multiselect("Select Features (Leave empty for all except target)", [c for c in df.columns if c != target])
     
@@ -36,44 +46,92 @@ def render_manual_ml():
             insight = st.session_state.chat_manager.generate_insight(prompt, summary)
             st.write(insight)
         
-    model_choice = st.selectbox("Select Algorithm", ["Random Forest", "Linear/Logistic Regression"])
+    model_choice = st.selectbox("Select Algorithm", available_algorithms())
+    st.caption(ALGORITHM_CATALOG[model_choice]["description"])
+    
+    with st.expander("🎯 Tune Hyperparameters"):
+        c1, c2, c3 = st.columns(3)
+        time_budget = c1.number_input("Time budget (s)", min_value=10, max_value=3600, value=60, step=10)
+        resource = c2.selectbox("Grow", RESOURCES, help="Resource given to promising configurations")
+        method = c3.selectbox("Search", ["hyperband", "halving"])
+        if st.button("Run Tuning"):
+            # Tune on the training rows only; the design key covers version, target, features and encoding
+            design = get_design_matrix(df, target, features, keep_categorical=uses_native_categoricals(model_choice))
+            X_tune, _, y_tune, _ = design.split()
+            with st.spinner("Tuning..."):
+                result = tune(X_tune, y_tune, model_choice, task_type, version=design.key,
+                              context={"task": task_type}, resource=resource, method=method,
+                              time_budget=time_budget)
+            if result["best_params"] is None and result["trials"].empty:
+                st.error("No trial finished within the budget.")
+            elif result["best_params"] is None:
+                st.error(f"All {len(result['trials'])} trials failed: {result['trials']['error'].iloc[0]}")
+                st.dataframe(result["trials"], use_container_width=True)
+            else:
+                st.session_state.setdefault("tuned_params", {})[model_choice] = result["best_params"]
+                st.success(f"Best validation score: {result['best_score']:.4f} "
+                           f"({len(result['trials'])} trials{'' if result['completed'] else ', budget reached'})")
+                st.dataframe(result["trials"].sort_values(["resource", "score"], ascending=False),
+                             use_container_width=True)
     
+    # Sliders start from the tuned values when tuning has run for this algorithm
+    tuned = st.session_state.get("tuned_params", {}).get(model_choice, {})
     params = {}
-    if model_choice == "Random Forest":
-        n_estimators = st.slider("n_estimators", 10, 500, 100)
-        max_depth = st.slider("max_depth", 1, 50, 10)
-        params = {"n_estimators": n_estimators, "max_depth": max_depth}
-        
-    if st.button("Train Model"):
-        X = df[features]
-        y = df[target]
+    for param, spec in ALGORITHM_CATALOG[model_choice]["params"].items():
+        default = min(max(tuned.get(param, spec["default"]), spec["min"]), spec["max"])
+        if spec["type"] == "int":
+            params[param] = st.slider(param, spec["min"], spec["max"], int(default))
+        else:
+            params[param] = st.slider(param, float(spec["min"]), float(spec["max"]), float(default))
         
-        # Handle non-numeric features basic
-        X = pd.get_dummies(X, drop_first=True)
+    model_cls = ALGORITHM_CATALOG[model_choice]["cls"]
+    early_stopping_rounds = None
+    if model_cls.supports_early_stopping:
+        c1, c2 = st.columns(2)
+        if c1.checkbox("Early stopping (10% validation split)"):
+            early_stopping_rounds = c2.number_input("Patience (rounds)", min_value=5, max_value=200, value=20)
         
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    if st.button("Train Model"):
+        # Encoded matrix + split cached on disk per dataset version; encoder kept for scoring new data
+        design = get_design_matrix(df, target, features, keep_categorical=uses_native_categoricals(model_choice))
+        if design.is_sparse and not accepts_sparse(model_choice):
+            st.error(f"{model_choice} needs dense input, and this design is sparse (text or hashed columns). "
+                     f"Pick LightGBM, XGBoost, Random Forest or a linear model.")
+            return
+        X_train, X_test, y_train, y_test = design.split()
+        encoder = design.encoder
+        eval_set = None
+        if early_stopping_rounds:
+            X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
+            eval_set = (X_val, y_val)
         
-        if task_type == "Classification":
-            if model_choice == "Random Forest":
-                model = RandomForestClassifier(**params)
-            else:
-                model = LogisticRegression()
-            metric_name = "Accuracy"
+        # Same data and settings with only more trees: keep the fitted ones and add the rest
+        fit_key = (design.key, task_type, model_choice, early_stopping_rounds)
+        previous = st.session_state.get("trained_model")
+        if st.session_state.get("model_fit_key") == fit_key and previous is not None and previous.can_grow(params):
+            model = previous
+            added = params[model.estimator_param] - model.n_trees
+            model.grow(X_train, y_train, params[model.estimator_param], eval_set, early_stopping_rounds)
+            st.info(f"Reused the previous fit: trained {added} additional trees only.")
         else:
-            if model_choice == "Random Forest":
-                model = RandomForestRegressor(**params)
-            else:
-                model = LinearRegression()
-            metric_name = "RMSE"
-            
-        model.fit(X_train, y_train)
+            model = create_model(model_choice, task_type, params)
+            t0 = time.perf_counter()
+            model.fit(X_train, y_train, eval_set=eval_set, early_stopping_rounds=early_stopping_rounds)
+            if len(df) < full_rows:
+                estimate = extrapolate_time([(len(X_train), time.perf_counter() - t0)], len(X_train) * full_rows / len(df))
+                st.session_state["manual_ml_full_estimate"] = estimate
+                st.caption(f"Trained on a {len(df):,}-row sample; the full data would take ~{format_duration(estimate)}.")
+        if early_stopping_rounds and hasattr(model, "best_iteration_"):
+            st.caption(f"Early stopping kept {model.best_iteration_ + 1} boosting rounds.")
         preds = model.predict(X_test)
+        # Metric summaries (confusion, score histograms, error moments) for the evaluation pages
+        evaluation = evaluate_model(model, X_test, y_test, task_type, preds=preds)
         
         if task_type == "Classification":
-            score = accuracy_score(y_test, preds)
+            score = evaluation.summary()["accuracy"]
             st.success(f"Model Trained! Accuracy: {score:.4f}")
         else:
-            score = mean_squared_error(y_test, preds, squared=False)
+            score = evaluation.summary()["rmse"]
             st.success(f"Model Trained! RMSE: {score:.4f}")
             
         # Save to session for Evaluation module
@@ -81,5 +139,12 @@ def render_manual_ml():
         st.session_state["model_X_test"] = X_test
         st.session_state["model_y_test"] = y_test
         st.session_state["model_preds"] = preds
+        st.session_state["model_evaluation"] = evaluation
         st.session_state["model_task"] = task_type
+        st.session_state["model_encoder"] = encoder
         st.session_state["model_target"] = target
+        st.session_state["model_fit_key"] = fit_key
+        st.session_state["model_design"] = design
+    
+    with st.expander("🌊 Out-of-core Training (parquet streaming)"):
+        render_stream_training(dataset_name)
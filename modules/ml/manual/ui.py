@@ -0,0 +1,69 @@
+import os
+
+import pyarrow.parquet as pq
+import streamlit as st
+
+from core.data_manager import DataManager
+from modules.ml.algorithms.incremental import available_incremental_learners
+from modules.ml.manual.helpers import HOLDOUT_FRACTION, stream_train
+
+
+def render_stream_training(dataset_name: str):
+    """Out-of-core training on one of the dataset's parquet versions (never loaded as a whole)."""
+    latest = DataManager.resolve_path(dataset_name)
+    if latest is None:
+        st.info("Out-of-core training needs the dataset saved as a parquet version.")
+        return
+    versions = DataManager.version_paths(dataset_name)
+    if latest not in versions:
+        versions.insert(0, latest)
+    file_path = st.selectbox("Parquet version", versions, format_func=os.path.basename, key="stream_version")
+
+    # The newest saved pipeline holds every fitted feature-engineering step; a version
+    # saved with a pipeline is already engineered, an earlier one needs it replayed
+    pipeline = next((p for p in (DataManager.load_pipeline(os.path.basename(v)) for v in versions)
+                     if p is not None), None) or DataManager.get_feature_pipeline(dataset_name)
+    replay = False
+    if len(pipeline):
+        engineered = DataManager.load_pipeline(os.path.basename(file_path)) is not None
+        replay = st.checkbox(f"Replay the feature pipeline ({len(pipeline)} steps) on every row group",
+                             value=not engineered, key="stream_replay",
+                             help="; ".join(pipeline.describe()))
+
+    sizes = DataManager.row_group_sizes(file_path)
+    st.caption(f"{sum(sizes):,} rows in {len(sizes)} row groups; one row group is held in memory at a time.")
+    columns = pq.ParquetFile(file_path).schema_arrow.names
+    if replay:
+        # Column names after the replayed steps, from a transformed first row group
+        columns = list(pipeline.transform(next(DataManager.iter_row_groups(file_path)).head(100)).columns)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        target = st.selectbox("Target", columns, key="stream_target")
+    with col2:
+        task_type = st.selectbox("Task", ["Classification", "Regression"], key="stream_task")
+    features = st.multiselect("Features (empty = all except target)", [c for c in columns if c != target],
+                              key="stream_features") or [c for c in columns if c != target]
+
+    col1, col2, col3 = st.columns(3)
+    learner = col1.selectbox("Learner", available_incremental_learners(), key="stream_learner")
+    epochs = col2.number_input("Epochs", min_value=1, max_value=20, value=1, key="stream_epochs")
+    holdout = col3.slider("Held-out share", 0.01, 0.5, HOLDOUT_FRACTION, key="stream_holdout")
+
+    if st.button("Stream Train"):
+        bar = st.progress(0.0)
+        result = stream_train(file_path, target, features, task_type, learner, epochs=int(epochs), holdout=holdout,
+                              pipeline=pipeline if replay else None,
+                              progress=lambda fraction, message: bar.progress(min(fraction, 1.0), text=message))
+        metrics = result["metrics"]
+        st.success(f"Trained on {result['n_train']:,} rows in {result['seconds']:.1f}s; "
+                   f"evaluated on {result['n_holdout']:,} held-out rows.")
+        if task_type == "Classification" and metrics:
+            st.metric("Held-out Accuracy", f"{metrics['accuracy']:.4f}")
+        elif metrics:
+            c1, c2, c3 = st.columns(3)
+            c1.metric("RMSE", f"{metrics['rmse']:.4f}")
+            c2.metric("MAE", f"{metrics['mae']:.4f}")
+            c3.metric("R2", f"{metrics['r2']:.4f}")
+        st.session_state["stream_model"] = result["model"]
+        st.session_state["stream_result"] = {**result, "task": task_type, "target": target}
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import io
+from core.sampling import DEFAULT_SAMPLE_ROWS, LARGE_DATASET_ROWS, get_sample
 
 def render_dataset_manager():
     """
@@ -73,3 +74,33 @@ def render_dataset_manager():
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         use_container_width=True
     )
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def render_sample_controls(df: pd.DataFrame, key: str, by: str = None) -> pd.DataFrame:
+    """
+    On large datasets, offer to work on a cached sample (stratified by `by`) first.
+    Pages store a full-data time estimate under f"{key}_full_estimate" to guide escalation.
+    Returns the frame the page should use.
+    """
+    if len(df) <= LARGE_DATASET_ROWS:
+        return df
+    c1, c2 = st.columns([2, 1])
+    use_sample = c1.checkbox(f"⚡ Work on a sample first (full data: {len(df):,} rows)", value=True,
+                             key=f"{key}_use_sample")
+    n = c2.number_input("Sample rows", min_value=1_000, max_value=len(df), value=min(DEFAULT_SAMPLE_ROWS, len(df)),
+                        step=10_000, key=f"{key}_sample_rows")
+    estimate = st.session_state.get(f"{key}_full_estimate")
+    if estimate is not None:
+        st.caption(f"⏱️ Estimated time on the full data: ~{format_duration(estimate)} "
+                   f"(untick the sample box to escalate).")
+    if not use_sample:
+        return df
+    return get_sample(df, n=int(n), by=by)